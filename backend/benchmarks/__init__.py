@@ -0,0 +1 @@
+"""Benchmarks and data generators for the backend."""
@@ -0,0 +1,102 @@
+"""
+Concurrency benchmark for the synchronous and asynchronous database layers.
+
+Two probe endpoints run the same query (``SELECT pg_sleep(:delay)``) from an
+``async def`` handler, one through ``SessionLocal`` and one through
+``AsyncSessionLocal``. Parallel clients drive both through the ASGI interface in
+process, so the only difference is whether the query blocks the event loop.
+
+Usage (from the ``backend`` directory, with the database running):
+    python -m benchmarks.async_db --clients 20 --requests 200 --delay 0.02
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from database import AsyncSessionLocal, SessionLocal, async_engine
+from fastapi import FastAPI
+from sqlalchemy import text
+
+QUERY = text("SELECT pg_sleep(:delay)")
+
+probe = FastAPI()
+
+
+@probe.get("/sync")
+async def sync_probe(delay: float) -> dict:
+    """Run the sleeping query on a pooled synchronous session."""
+    with SessionLocal() as db:
+        db.execute(QUERY, {"delay": delay})
+    return {"ok": True}
+
+
+@probe.get("/async")
+async def async_probe(delay: float) -> dict:
+    """Run the sleeping query on an async session."""
+    async with AsyncSessionLocal() as db:
+        await db.execute(QUERY, {"delay": delay})
+    return {"ok": True}
+
+
+async def run(path: str, clients: int, requests: int, delay: float) -> dict:
+    """
+    Send requests to one probe endpoint from parallel clients.
+
+    Args:
+        path (str): Probe path, ``/sync`` or ``/async``
+        clients (int): Number of concurrent clients
+        requests (int): Total number of requests
+        delay (float): Seconds each query spends in the database
+
+    Returns:
+        dict: Elapsed time, throughput and latency percentiles
+    """
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+    latencies = []
+
+    transport = httpx.ASGITransport(app=probe)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def worker() -> None:
+            while not queue.empty():
+                queue.get_nowait()
+                started = time.perf_counter()
+                response = await client.get(path, params={"delay": delay})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 1),
+    }
+
+
+async def main() -> None:
+    """Run both probes with the same load and print their results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    for path in ("/sync", "/async"):
+        result = await run(path, args.clients, args.requests, args.delay)
+        print(path, result)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
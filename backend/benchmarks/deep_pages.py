@@ -0,0 +1,80 @@
+"""
+Latency of deep pages with offset and keyset (cursor) pagination.
+
+Inserts ``--rows`` rooms inside a transaction that is rolled back at the end,
+then fetches pages at increasing depths with ``OFFSET`` and with the cursor of
+the preceding row, using the same queries as ``GET /rooms/``.
+
+Usage (from the ``backend`` directory, with the database migrated):
+    python -m benchmarks.deep_pages --rows 200000 --limit 50
+"""
+
+import argparse
+import time
+
+from database import SessionLocal
+from model import Room
+from pagination import encode_cursor, paginate
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+ORDER_BY = (Room.name, Room.id)
+
+
+def measure(
+    db: Session, cursor: str | None, skip: int, limit: int, repeat: int
+) -> float:
+    """
+    Fetch one page several times and return the best time.
+
+    Args:
+        db (Session): Database session
+        cursor (str | None): Cursor of the previous page, None for offset paging
+        skip (int): Offset used when no cursor is given
+        limit (int): Page size
+        repeat (int): Number of runs
+
+    Returns:
+        float: Fastest run in milliseconds
+    """
+    query = paginate(select(Room.id, Room.name), ORDER_BY, cursor, skip, limit)
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        db.execute(query).all()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    """Time offset and cursor paging at increasing depths."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        db.execute(
+            insert(Room),
+            [{"name": f"Bench {i:07d}", "capacity": 30} for i in range(args.rows)],
+        )
+        ordered = db.execute(select(Room.name, Room.id).order_by(*ORDER_BY)).all()
+
+        depth = args.limit
+        while depth < len(ordered):
+            previous = ordered[depth - 1]
+            offset_ms = measure(db, None, depth, args.limit, args.repeat)
+            keyset_ms = measure(
+                db, encode_cursor(list(previous)), 0, args.limit, args.repeat
+            )
+            print(
+                f"depth {depth:>9}: offset {offset_ms:8.2f} ms"
+                f"  keyset {keyset_ms:8.2f} ms"
+            )
+            depth *= 4
+        db.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,543 @@
+"""
+Synthetic university-scale data for load tests and benchmarks.
+
+Generates rooms with equipment, users, groups, courses, a semester of weekly
+course series without room conflicts, room unavailability, change requests with
+availability proposals and recommendations. Cancelled occurrences and the
+occurrences change requests refer to are stored as exceptions of their series,
+like the API stores them. Rows are built as plain
+dictionaries with explicit IDs and written with batched multi-row INSERTs, so
+millions of rows load in minutes. Output is deterministic for a given seed.
+
+IDs continue after the current maximum of every table, so the generator can
+also top up an existing database; ``--reset`` empties it first. On PostgreSQL
+the schema is migrated to head and the ID sequences are moved past the
+generated rows; on SQLite the tables are created from the models.
+The room utilization aggregates are rebuilt once the rows are written.
+
+Usage (from the ``backend`` directory):
+    python -m benchmarks.generate_data --reset
+    python -m benchmarks.generate_data --scale 0.01 --database-url sqlite:///bench.db
+"""
+
+import argparse
+import json
+import random
+import time
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta
+from datetime import time as clock
+
+from alembic import command
+from alembic.config import Config
+from database import DATABASE_URL
+from model import (
+    AvailabilityProposal,
+    Base,
+    CatalogVersion,
+    ChangeRecomendation,
+    ChangeRequest,
+    ChangeRequestStatus,
+    Course,
+    CourseEvent,
+    CourseSeries,
+    Equipment,
+    Group,
+    Room,
+    RoomType,
+    RoomUnavailability,
+    TimeSlots,
+    User,
+    UserRole,
+    room_equipment_association,
+)
+from routers.auth import get_password_hash
+from sqlalchemy import (
+    Connection,
+    Table,
+    create_engine,
+    func,
+    insert,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.orm import Session
+from utilization import rebuild
+
+# Counts at scale 1.0, roughly a large university; events counts occurrences
+DEFAULT_COUNTS = {
+    "rooms": 2_000,
+    "users": 50_000,
+    "groups": 5_000,
+    "courses": 20_000,
+    "events": 500_000,
+    "change_requests": 20_000,
+}
+PROPOSALS_PER_REQUEST = 6
+RECOMMENDATIONS_PER_REQUEST = 3
+UNAVAILABLE_ROOM_SHARE = 0.02
+SEMESTER_WEEKS = 15
+BATCH_SIZE = 10_000
+EQUIPMENT = (
+    "projector",
+    "whiteboard",
+    "computers",
+    "speakers",
+    "microphone",
+    "smartboard",
+    "video conferencing",
+    "lab bench",
+)
+SLOTS = (
+    (clock(8, 0), clock(9, 30)),
+    (clock(9, 45), clock(11, 15)),
+    (clock(11, 30), clock(13, 0)),
+    (clock(13, 15), clock(14, 45)),
+    (clock(15, 0), clock(16, 30)),
+    (clock(16, 45), clock(18, 15)),
+    (clock(18, 30), clock(20, 0)),
+)
+# Every synthetic user logs in with this password; it is hashed once, since
+# hashing 50k passwords would take hours
+PASSWORD = "password"
+
+
+def batches(rows: list[dict]) -> Iterator[list[dict]]:
+    """Split rows into chunks of ``BATCH_SIZE`` for executemany inserts."""
+    for start in range(0, len(rows), BATCH_SIZE):
+        yield rows[start : start + BATCH_SIZE]
+
+
+class Generator:
+    """
+    Build and insert the synthetic data set table by table.
+
+    Args:
+        conn (Connection): Connection inside an open transaction
+        counts (dict): Number of rows per entity
+        start (date): Monday of the first semester week
+        seed (int): Random seed
+    """
+
+    def __init__(self, conn: Connection, counts: dict, start: date, seed: int) -> None:
+        """Seed the random generator and list the teaching days of the semester."""
+        self.conn = conn
+        self.counts = counts
+        self.random = random.Random(seed)
+        self.days = [
+            start + timedelta(weeks=week, days=weekday)
+            for week in range(SEMESTER_WEEKS)
+            for weekday in range(5)
+        ]
+        self.inserted: dict[str, int] = {}
+
+    def next_id(self, table: Table) -> int:
+        """Return the first free ID of a table."""
+        return (self.conn.scalar(select(func.max(table.c.id))) or 0) + 1
+
+    def write(self, table: Table, rows: list[dict]) -> None:
+        """Insert rows in batches and count them per table."""
+        for batch in batches(rows):
+            self.conn.execute(insert(table), batch)
+        self.inserted[table.name] = self.inserted.get(table.name, 0) + len(rows)
+        print(f"{table.name}: {len(rows)} rows")
+
+    def run(self) -> dict:
+        """
+        Generate every table in dependency order.
+
+        Returns:
+            dict: Number of inserted rows per table
+        """
+        slot_ids = self.time_slots()
+        room_ids, room_capacity = self.rooms()
+        teacher_ids, leader_ids = self.users()
+        group_ids = self.groups(leader_ids)
+        course_teacher = self.courses(teacher_ids, group_ids)
+        occurrences = self.series(room_ids, slot_ids, list(course_teacher))
+        self.unavailability(room_ids)
+        self.change_requests(
+            occurrences, course_teacher, leader_ids, room_ids, room_capacity, slot_ids
+        )
+        return self.inserted
+
+    def time_slots(self) -> list[int]:
+        """Insert the default time slots unless some already exist."""
+        table = TimeSlots.__table__
+        existing = self.conn.scalars(select(table.c.id).order_by(table.c.id)).all()
+        if existing:
+            return existing
+        first = self.next_id(table)
+        self.write(
+            table,
+            [
+                {"id": first + i, "start_time": start, "end_time": end}
+                for i, (start, end) in enumerate(SLOTS)
+            ],
+        )
+        return list(range(first, first + len(SLOTS)))
+
+    def rooms(self) -> tuple[list[int], dict[int, int]]:
+        """Insert rooms with random equipment and return their capacities."""
+        rooms = Room.__table__
+        equipment = Equipment.__table__
+        names = dict(self.conn.execute(select(equipment.c.name, equipment.c.id)).all())
+        missing = [name for name in EQUIPMENT if name not in names]
+        if missing:
+            first = self.next_id(equipment)
+            rows = [{"id": first + i, "name": name} for i, name in enumerate(missing)]
+            self.write(equipment, rows)
+            names.update((row["name"], row["id"]) for row in rows)
+        equipment_ids = list(names.values())
+
+        first = self.next_id(rooms)
+        room_rows, links, capacity = [], [], {}
+        types = list(RoomType)
+        for room_id in range(first, first + self.counts["rooms"]):
+            capacity[room_id] = self.random.choice((15, 20, 30, 30, 40, 60, 120, 250))
+            room_rows.append(
+                {
+                    "id": room_id,
+                    "name": f"Sala {room_id:05d}",
+                    "capacity": capacity[room_id],
+                    "type": self.random.choice(types),
+                }
+            )
+            installed = self.random.sample(equipment_ids, self.random.randint(0, 4))
+            for equipment_id in installed:
+                links.append({"room_id": room_id, "equipment_id": equipment_id})
+        self.write(rooms, room_rows)
+        self.write(room_equipment_association, links)
+        return list(capacity), capacity
+
+    def users(self) -> tuple[list[int], list[int]]:
+        """Insert teachers and group leaders, all sharing ``PASSWORD``."""
+        table = User.__table__
+        first = self.next_id(table)
+        password_hash = get_password_hash(PASSWORD)
+        rows, teachers, leaders = [], [], []
+        for user_id in range(first, first + self.counts["users"]):
+            share = self.random.random()
+            if share < 0.002:
+                role = UserRole.ADMIN
+            elif share < 0.01:
+                role = UserRole.KOORDYNATOR
+            elif share < 0.15:
+                role = UserRole.PROWADZACY
+                teachers.append(user_id)
+            else:
+                role = UserRole.STAROSTA
+                leaders.append(user_id)
+            rows.append(
+                {
+                    "id": user_id,
+                    "email": f"user{user_id}@synthetic.agh.edu.pl",
+                    "password": password_hash,
+                    "name": f"Imie{user_id}",
+                    "surname": f"Nazwisko{user_id}",
+                    "role": role,
+                    "is_active": True,
+                }
+            )
+        self.write(table, rows)
+        return teachers, leaders
+
+    def groups(self, leader_ids: list[int]) -> list[int]:
+        """Insert student groups, each led by one of the leaders."""
+        table = Group.__table__
+        first = self.next_id(table)
+        ids = list(range(first, first + self.counts["groups"]))
+        self.write(
+            table,
+            [
+                {
+                    "id": group_id,
+                    "name": f"Grupa {group_id}",
+                    "year": self.random.randint(1, 5),
+                    "leader_id": self.random.choice(leader_ids),
+                }
+                for group_id in ids
+            ],
+        )
+        return ids
+
+    def courses(self, teacher_ids: list[int], group_ids: list[int]) -> dict[int, int]:
+        """Insert courses and return the teacher of every course."""
+        table = Course.__table__
+        first = self.next_id(table)
+        rows = [
+            {
+                "id": course_id,
+                "name": f"Kurs {course_id}",
+                "teacher_id": self.random.choice(teacher_ids),
+                "group_id": self.random.choice(group_ids),
+            }
+            for course_id in range(first, first + self.counts["courses"])
+        ]
+        self.write(table, rows)
+        return {row["id"]: row["teacher_id"] for row in rows}
+
+    def series(
+        self, room_ids: list[int], slot_ids: list[int], course_ids: list[int]
+    ) -> list[dict]:
+        """
+        Place weekly series on distinct (room, weekday, slot) cells.
+
+        No room is double booked. Every course meets weekly on the same
+        weekday, slot and room, as real timetables do; a course is moved to
+        another cell when its series collides. About one occurrence in a
+        hundred is cancelled by an exception.
+
+        Returns:
+            list[dict]: The occurrences that take place, without an ``id``
+        """
+        series_table = CourseSeries.__table__
+        events_table = CourseEvent.__table__
+        weekly_cells = len(room_ids) * 5 * len(slot_ids)
+        wanted = min(self.counts["events"], weekly_cells * SEMESTER_WEEKS)
+        taken: set[tuple[int, int, int]] = set()
+        series_rows: list[dict] = []
+        canceled: list[dict] = []
+        occurrences: list[dict] = []
+        placed = 0
+        series_id = self.next_id(series_table)
+        for course_id in self.random.sample(course_ids, len(course_ids)) * 8:
+            if placed >= wanted or len(taken) >= weekly_cells:
+                break
+            while True:
+                cell = (
+                    self.random.choice(room_ids),
+                    self.random.randrange(5),
+                    self.random.choice(slot_ids),
+                )
+                if cell not in taken:
+                    break
+            taken.add(cell)
+            room_id, weekday, slot_id = cell
+            weeks = min(SEMESTER_WEEKS, wanted - placed)
+            placed += weeks
+            series_rows.append(
+                {
+                    "id": series_id,
+                    "course_id": course_id,
+                    "room_id": room_id,
+                    "time_slot_id": slot_id,
+                    "weekday": weekday,
+                    "start_date": self.days[weekday],
+                    "end_date": self.days[(weeks - 1) * 5 + weekday],
+                }
+            )
+            for week in range(weeks):
+                day = self.days[week * 5 + weekday]
+                occurrence = {
+                    "course_id": course_id,
+                    "room_id": room_id,
+                    "time_slot_id": slot_id,
+                    "day": day,
+                    "canceled": self.random.random() < 0.01,
+                    "series_id": series_id,
+                    "series_day": day,
+                }
+                (canceled if occurrence["canceled"] else occurrences).append(occurrence)
+            series_id += 1
+        self.write(series_table, series_rows)
+        first = self.next_id(events_table)
+        self.write(
+            events_table,
+            [{"id": first + i, **row} for i, row in enumerate(canceled)],
+        )
+        return occurrences
+
+    def unavailability(self, room_ids: list[int]) -> None:
+        """Insert unavailability periods for a share of the rooms."""
+        table = RoomUnavailability.__table__
+        first = self.next_id(table)
+        rows = []
+        for offset, room_id in enumerate(
+            self.random.sample(room_ids, int(len(room_ids) * UNAVAILABLE_ROOM_SHARE))
+        ):
+            start = self.random.choice(self.days)
+            rows.append(
+                {
+                    "id": first + offset,
+                    "room_id": room_id,
+                    "start_datetime": start,
+                    "end_datetime": start + timedelta(days=self.random.randint(0, 14)),
+                }
+            )
+        self.write(table, rows)
+
+    def change_requests(
+        self,
+        occurrences: list[dict],
+        course_teacher: dict[int, int],
+        leader_ids: list[int],
+        room_ids: list[int],
+        room_capacity: dict[int, int],
+        slot_ids: list[int],
+    ) -> None:
+        """Insert change requests with proposals and recommendations."""
+        events_table = CourseEvent.__table__
+        requests_table = ChangeRequest.__table__
+        proposals_table = AvailabilityProposal.__table__
+        recommendations_table = ChangeRecomendation.__table__
+        event_id = self.next_id(events_table)
+        request_id = self.next_id(requests_table)
+        proposal_id = self.next_id(proposals_table)
+        recommendation_id = self.next_id(recommendations_table)
+        events, requests, proposals, recommendations = [], [], [], []
+        statuses = list(ChangeRequestStatus)
+
+        # A request refers to an event, so its occurrence is materialized as an
+        # unchanged exception of the series
+        sampled = min(self.counts["change_requests"], len(occurrences))
+        for occurrence in self.random.sample(occurrences, sampled):
+            event = {"id": event_id, **occurrence}
+            events.append(event)
+            event_id += 1
+            teacher_id = course_teacher[event["course_id"]]
+            leader_id = self.random.choice(leader_ids)
+            requirements = self.random.sample(EQUIPMENT, self.random.randint(0, 2))
+            requests.append(
+                {
+                    "id": request_id,
+                    "course_event_id": event["id"],
+                    "initiator_id": self.random.choice((teacher_id, leader_id)),
+                    "status": self.random.choices(statuses, weights=(6, 2, 1, 1))[0],
+                    "reason": "Konflikt terminów",
+                    "room_requirements": json.dumps(requirements),
+                    "minimum_capacity": room_capacity[event["room_id"]] // 2,
+                    "created_at": datetime.combine(event["day"], clock(12))
+                    - timedelta(days=self.random.randint(1, 14)),
+                }
+            )
+            for position in range(PROPOSALS_PER_REQUEST):
+                day = self.random.choice(self.days)
+                slot_id = self.random.choice(slot_ids)
+                # Half of the leader's proposals repeat the teacher's, so that
+                # common availability exists for most requests
+                if position % 2 == 1 and self.random.random() < 0.5:
+                    day, slot_id = proposals[-1]["day"], proposals[-1]["time_slot_id"]
+                proposals.append(
+                    {
+                        "id": proposal_id,
+                        "change_request_id": request_id,
+                        "user_id": teacher_id if position % 2 == 0 else leader_id,
+                        "day": day,
+                        "time_slot_id": slot_id,
+                        "accepted_by_leader": False,
+                        "accepted_by_representative": False,
+                    }
+                )
+                proposal_id += 1
+            for position in range(RECOMMENDATIONS_PER_REQUEST):
+                source = proposals[-PROPOSALS_PER_REQUEST + position * 2]
+                recommendations.append(
+                    {
+                        "id": recommendation_id,
+                        "change_request_id": request_id,
+                        "recommended_slot_id": source["time_slot_id"],
+                        "recommended_day": source["day"],
+                        "recommended_room_id": self.random.choice(room_ids),
+                        "source_proposal_id": source["id"],
+                    }
+                )
+                recommendation_id += 1
+            request_id += 1
+
+        self.write(events_table, events)
+        self.write(requests_table, requests)
+        self.write(proposals_table, proposals)
+        self.write(recommendations_table, recommendations)
+
+
+def prepare_schema(conn: Connection, url: str, reset: bool) -> None:
+    """
+    Create or migrate the schema and optionally delete all data.
+
+    Args:
+        conn (Connection): Connection to the target database
+        url (str): Database URL
+        reset (bool): Whether to delete existing rows first
+    """
+    if conn.dialect.name == "sqlite":
+        Base.metadata.create_all(conn)
+    else:
+        config = Config("alembic.ini")
+        config.set_main_option("sqlalchemy.url", url)
+        command.upgrade(config, "head")
+
+    if not reset:
+        return
+    # Catalog versions must keep counting, or clients could revalidate stale copies
+    tables = [
+        table
+        for table in Base.metadata.sorted_tables
+        if table is not CatalogVersion.__table__
+    ]
+    if conn.dialect.name == "postgresql":
+        names = ", ".join(table.name for table in tables)
+        conn.execute(text(f"TRUNCATE {names} RESTART IDENTITY CASCADE"))
+    else:
+        for table in reversed(tables):
+            conn.execute(table.delete())
+
+
+def sync_sequences(conn: Connection) -> None:
+    """
+    Move PostgreSQL ID sequences past the explicitly inserted IDs.
+
+    Args:
+        conn (Connection): Connection to the target database
+    """
+    if conn.dialect.name != "postgresql":
+        return
+    for table in Base.metadata.sorted_tables:
+        if "id" not in table.c:
+            continue
+        conn.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                f"COALESCE((SELECT max(id) FROM {table.name}), 0) + 1, false)"
+            )
+        )
+
+
+def main() -> None:
+    """Generate the data set into the configured database."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=2025)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2025, 10, 6))
+    parser.add_argument("--reset", action="store_true")
+    for name, count in DEFAULT_COUNTS.items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", type=int, help=f"{count} x scale by default"
+        )
+    args = parser.parse_args()
+
+    counts = {
+        name: getattr(args, name)
+        if getattr(args, name) is not None
+        else max(1, int(count * args.scale))
+        for name, count in DEFAULT_COUNTS.items()
+    }
+    engine = create_engine(args.database_url)
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        prepare_schema(conn, args.database_url, args.reset)
+    with engine.begin() as conn:
+        inserted = Generator(conn, counts, args.start, args.seed).run()
+        sync_sequences(conn)
+        conn.execute(update(CatalogVersion).values(version=CatalogVersion.version + 1))
+    with Session(engine) as db:
+        rebuild(db)
+        db.commit()
+    elapsed = round(time.perf_counter() - started, 1)
+    print(json.dumps({"inserted": inserted, "elapsed_s": elapsed}))
+
+
+if __name__ == "__main__":
+    main()
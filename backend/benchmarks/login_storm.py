@@ -0,0 +1,95 @@
+"""
+Load test: latency of a cheap endpoint while a burst of logins is in flight.
+
+Drives the application in process through the ASGI interface. ``--logins``
+clients post to ``/auth/token`` at the same time while a probe keeps calling
+``GET /`` and records its latency. With ``--inline`` bcrypt runs directly on the
+event loop, as it did before password hashing moved to a worker pool.
+
+Usage (from the ``backend`` directory, with the database seeded by
+``create_tables.py``):
+    python -m benchmarks.login_storm --logins 50
+    python -m benchmarks.login_storm --logins 50 --inline
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from main import app
+from routers import auth
+
+
+async def inline_verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password directly on the event loop."""
+    return auth.verify_password(plain_password, hashed_password)
+
+
+async def storm(email: str, password: str, logins: int) -> dict:
+    """
+    Run the login burst and the probe concurrently.
+
+    Args:
+        email (str): Email of an existing user
+        password (str): Password of that user
+        logins (int): Number of concurrent logins
+
+    Returns:
+        dict: Login throughput and probe latency percentiles
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        finished = asyncio.Event()
+        probe_latencies = []
+
+        async def login() -> int:
+            response = await client.post(
+                "/auth/token", data={"username": email, "password": password}
+            )
+            return response.status_code
+
+        async def probe() -> None:
+            while not finished.is_set():
+                started = time.perf_counter()
+                await client.get("/")
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.005)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        finished.set()
+        await probe_task
+
+    probe_latencies.sort()
+    return {
+        "logins": logins,
+        "succeeded": statuses.count(200),
+        "rejected": statuses.count(503),
+        "elapsed_s": round(elapsed, 3),
+        "probe_requests": len(probe_latencies),
+        "probe_p50_ms": round(probe_latencies[len(probe_latencies) // 2] * 1000, 1),
+        "probe_max_ms": round(probe_latencies[-1] * 1000, 1),
+    }
+
+
+async def main() -> None:
+    """Run the login storm and print its results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--email", default="admin@example.com")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--inline", action="store_true")
+    args = parser.parse_args()
+
+    if args.inline:
+        auth.verify_password_async = inline_verify_password
+    print(await storm(args.email, args.password, args.logins))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
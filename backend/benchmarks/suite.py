@@ -0,0 +1,426 @@
+"""
+End-to-end benchmark suite for the scheduling hot paths.
+
+Drives the application in process through the ASGI interface, including its
+lifespan, against a database seeded by ``benchmarks.generate_data``. Every
+scenario samples its parameters from the data set, sends a few unmeasured
+warm-up requests and then ``--requests`` requests from ``--clients``
+concurrent clients. Latency percentiles, throughput and status codes are
+written as JSON, so runs can be kept and compared; ``--compare`` prints the
+change against an earlier result file.
+
+Recommendations created by the common availability scenario are deleted when
+the run ends, so repeated runs see the same data.
+
+Usage (from the ``backend`` directory):
+    python -m benchmarks.generate_data --reset
+    python -m benchmarks.suite
+    python -m benchmarks.suite --only related --compare benchmarks/results/base.json
+
+The database is taken from the ``DATABASE_URL`` environment variable.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import subprocess
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+from benchmarks.generate_data import PASSWORD
+from database import SessionLocal, async_engine, engine
+from main import app
+from model import (
+    AvailabilityProposal,
+    Base,
+    ChangeRecomendation,
+    ChangeRequest,
+    Course,
+    CourseSeries,
+    RoomType,
+    User,
+    UserRole,
+)
+from routers.auth import create_access_token
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session, aliased
+
+RESULTS_DIR = Path(__file__).parent / "results"
+SAMPLE_SIZE = 200
+
+
+@dataclass
+class Fixtures:
+    """Parameters sampled from the seeded database."""
+
+    admin_token: str
+    user_tokens: list[str]
+    emails: list[str]
+    group_ids: list[int]
+    common_requests: list[tuple[int, int, int]]
+    first_day: str
+    last_day: str
+
+
+# A scenario turns the fixtures and a random generator into one request:
+# method, URL and keyword arguments for ``httpx.AsyncClient.request``
+Scenario = Callable[[Fixtures, random.Random], tuple[str, str, dict]]
+
+
+def _bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def check_availability(fixtures: Fixtures, rng: random.Random) -> tuple[str, str, dict]:
+    """Search free rooms of a random type and size over the semester."""
+    params = {
+        "seats": rng.choice((10, 30, 60)),
+        "room_type": rng.choice(list(RoomType)).value,
+        "start": fixtures.first_day,
+        "end": fixtures.last_day,
+    }
+    return (
+        "GET",
+        "/rooms/check-availability",
+        {
+            "params": params,
+            "headers": _bearer(fixtures.admin_token),
+        },
+    )
+
+
+def common_availability(
+    fixtures: Fixtures, rng: random.Random
+) -> tuple[str, str, dict]:
+    """Compute the common availability of a change request."""
+    request_id, user1_id, user2_id = rng.choice(fixtures.common_requests)
+    params = {
+        "user1_id": user1_id,
+        "user2_id": user2_id,
+        "change_request_id": request_id,
+    }
+    return (
+        "POST",
+        "/change_recommendation/common-availability",
+        {
+            "params": params,
+            "headers": _bearer(fixtures.admin_token),
+        },
+    )
+
+
+def related_requests(fixtures: Fixtures, rng: random.Random) -> tuple[str, str, dict]:
+    """List the change requests related to a random user."""
+    return (
+        "GET",
+        "/change_requests/related",
+        {
+            "params": {"limit": 20},
+            "headers": _bearer(rng.choice(fixtures.user_tokens)),
+        },
+    )
+
+
+def group_events(fixtures: Fixtures, rng: random.Random) -> tuple[str, str, dict]:
+    """List the events of a random group."""
+    group_id = rng.choice(fixtures.group_ids)
+    return (
+        "GET",
+        f"/courses/group/{group_id}/events",
+        {
+            "headers": _bearer(fixtures.admin_token),
+        },
+    )
+
+
+def login(fixtures: Fixtures, rng: random.Random) -> tuple[str, str, dict]:
+    """Log in as a random synthetic user."""
+    data = {"username": rng.choice(fixtures.emails), "password": PASSWORD}
+    return "POST", "/auth/token", {"data": data}
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "check_availability": check_availability,
+    "common_availability": common_availability,
+    "related": related_requests,
+    "group_events": group_events,
+    "login": login,
+}
+
+
+def _token(email: str) -> str:
+    return create_access_token({"sub": email}, expires_delta=timedelta(hours=2))
+
+
+def load_fixtures(db: Session, rng: random.Random) -> Fixtures:
+    """
+    Sample scenario parameters from the seeded database.
+
+    Args:
+        db (Session): Database session
+        rng (random.Random): Random generator used for sampling
+
+    Raises:
+        SystemExit: If the database holds no generated data
+
+    Returns:
+        Fixtures: Sampled parameters
+    """
+    admin_email = db.scalar(
+        select(User.email).where(User.role == UserRole.ADMIN).order_by(User.id)
+    )
+    initiators = db.scalars(
+        select(User.email)
+        .join(ChangeRequest, ChangeRequest.initiator_id == User.id)
+        .distinct()
+        .limit(SAMPLE_SIZE)
+    ).all()
+    group_ids = db.scalars(
+        select(Course.group_id)
+        .join(CourseSeries, CourseSeries.course_id == Course.id)
+        .distinct()
+        .limit(SAMPLE_SIZE)
+    ).all()
+
+    # Change requests where the two users proposed at least one common term
+    first, second = aliased(AvailabilityProposal), aliased(AvailabilityProposal)
+    common_requests = db.execute(
+        select(first.change_request_id, first.user_id, second.user_id)
+        .join(
+            second,
+            (second.change_request_id == first.change_request_id)
+            & (second.user_id != first.user_id)
+            & (second.day == first.day)
+            & (second.time_slot_id == first.time_slot_id),
+        )
+        .distinct()
+        .limit(SAMPLE_SIZE)
+    ).all()
+    first_day, last_day = db.execute(
+        select(func.min(CourseSeries.start_date), func.max(CourseSeries.end_date))
+    ).one()
+
+    if not (admin_email or initiators) or not group_ids or first_day is None:
+        raise SystemExit("No generated data found, run benchmarks.generate_data first")
+    admin_email = admin_email or initiators[0]
+    week_start = first_day + timedelta(weeks=rng.randint(0, 4))
+    return Fixtures(
+        admin_token=_token(admin_email),
+        user_tokens=[_token(email) for email in initiators] or [_token(admin_email)],
+        emails=list(initiators) or [admin_email],
+        group_ids=list(group_ids),
+        common_requests=[tuple(row) for row in common_requests],
+        first_day=week_start.isoformat(),
+        last_day=min(week_start + timedelta(days=6), last_day).isoformat(),
+    )
+
+
+def summarize(latencies: list[float], statuses: Counter, elapsed: float) -> dict:
+    """
+    Reduce the measurements of one scenario to numbers.
+
+    Args:
+        latencies (list[float]): Latency of every request in seconds
+        statuses (Counter): Number of responses per status code
+        elapsed (float): Wall time of the measured phase in seconds
+
+    Returns:
+        dict: Throughput, latency percentiles and status codes
+    """
+    latencies = sorted(latencies)
+
+    def percentile(share: float) -> float:
+        # Nearest rank; the tolerance keeps 0.07 * 100 from ranking as 8
+        rank = math.ceil(len(latencies) * share - 1e-9)
+        return round(latencies[max(rank, 1) - 1] * 1000, 2)
+
+    return {
+        "requests": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(latencies[-1] * 1000, 2),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    fixtures: Fixtures,
+    clients: int,
+    requests: int,
+    warmup: int,
+    seed: int,
+) -> dict:
+    """
+    Measure one scenario with parallel clients.
+
+    Args:
+        client (httpx.AsyncClient): Client bound to the application
+        scenario (Scenario): Request factory
+        fixtures (Fixtures): Sampled parameters
+        clients (int): Number of concurrent clients
+        requests (int): Number of measured requests
+        warmup (int): Number of unmeasured requests sent first
+        seed (int): Random seed for parameter choice
+
+    Returns:
+        dict: Summary of the measured requests
+    """
+    rng = random.Random(seed)
+    for _ in range(warmup):
+        method, url, options = scenario(fixtures, rng)
+        await client.request(method, url, **options)
+
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(scenario(fixtures, rng))
+    latencies = []
+    statuses = Counter()
+
+    async def worker() -> None:
+        while not queue.empty():
+            method, url, options = queue.get_nowait()
+            started = time.perf_counter()
+            response = await client.request(method, url, **options)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    return summarize(latencies, statuses, time.perf_counter() - started)
+
+
+def dataset_size(db: Session) -> dict:
+    """Count the rows of every table."""
+    return {
+        table.name: db.scalar(select(func.count()).select_from(table))
+        for table in Base.metadata.sorted_tables
+    }
+
+
+def git_revision() -> str | None:
+    """Return the short hash of the checked out commit, if any."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict) -> None:
+    """
+    Print the change of every scenario against a baseline run.
+
+    Args:
+        results (dict): Current results
+        baseline (dict): Results of an earlier run
+    """
+    for name, current in results["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        changes = {
+            key: f"{(current[key] / previous[key] - 1) * 100:+.1f}%"
+            for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+            if previous[key]
+        }
+        print(name, changes)
+
+
+async def main() -> None:
+    """Run every scenario and write the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--login-requests", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=2025)
+    parser.add_argument("--only", nargs="+", choices=SCENARIOS)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path, help="earlier result file")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        fixtures = load_fixtures(db, random.Random(args.seed))
+        size = dataset_size(db)
+        last_recommendation = db.scalar(select(func.max(ChangeRecomendation.id))) or 0
+
+    results = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "database": engine.url.render_as_string(hide_password=True),
+        "dataset": size,
+        "settings": {
+            "clients": args.clients,
+            "requests": args.requests,
+            "login_requests": args.login_requests,
+            "warmup": args.warmup,
+            "seed": args.seed,
+        },
+        "scenarios": {},
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with (
+            app.router.lifespan_context(app),
+            httpx.AsyncClient(transport=transport, base_url="http://bench") as client,
+        ):
+            for name in args.only or SCENARIOS:
+                if name == "common_availability" and not fixtures.common_requests:
+                    print(name, "skipped, no change request with common proposals")
+                    continue
+                # bcrypt makes logins orders of magnitude slower than the rest
+                requests = args.login_requests if name == "login" else args.requests
+                result = await run_scenario(
+                    client,
+                    SCENARIOS[name],
+                    fixtures,
+                    args.clients,
+                    requests,
+                    min(args.warmup, requests),
+                    args.seed,
+                )
+                results["scenarios"][name] = result
+                print(name, result)
+    finally:
+        with SessionLocal() as db:
+            db.execute(
+                delete(ChangeRecomendation).where(
+                    ChangeRecomendation.id > last_recommendation
+                )
+            )
+            db.commit()
+        await async_engine.dispose()
+
+    output = args.output or RESULTS_DIR / (
+        datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ") + ".json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"results written to {output}")
+
+    if args.compare:
+        compare(results, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""In-process caching of computed values with a size bound and expiry."""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Generic, TypeVar
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[V]):
+    """
+    Bounded, thread-safe LRU cache whose entries expire after a fixed time.
+
+    The cache is local to the process: entries invalidated in one worker stay
+    cached in the others until their time to live runs out.
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        """
+        Create an empty cache.
+
+        Args:
+            max_size (int): Number of entries kept before evicting
+            ttl (float): Time to live of an entry in seconds
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: V | None = None) -> V | None:
+        """
+        Return a cached value and mark it as recently used.
+
+        Args:
+            key (Hashable): Cache key
+            default (V | None, optional): Value returned on a miss. Defaults to None.
+
+        Returns:
+            V | None: The cached value or ``default``
+        """
+        with self._lock:
+            expires_at, value = self._entries.get(key, (0.0, _MISSING))
+            if value is _MISSING or expires_at < time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        """
+        Store a value, evicting the least recently used entry when full.
+
+        Args:
+            key (Hashable): Cache key
+            value (V): Value to cache
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Remove a single entry.
+
+        Args:
+            key (Hashable): Cache key
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Return the cache size and hit/miss counters.
+
+        Returns:
+            dict: Current size, capacity, hits, misses and hit ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_s": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
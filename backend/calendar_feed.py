@@ -0,0 +1,327 @@
+"""
+iCalendar (RFC 5545) rendering and change tracking for schedule feeds.
+
+Every group carries a ``schedule_version`` that is bumped in the same
+transaction as any change to its events. Feeds derive their ETag and
+Last-Modified from those versions, so a conditional request can be answered
+without reading a single event.
+
+Weekly series are rendered as one recurring VEVENT each, with their exceptions
+excluded by EXDATE and rendered as ordinary events, so clients expand them.
+"""
+
+import hashlib
+from collections.abc import AsyncIterable, Iterable, Sequence
+from datetime import date, datetime, timezone
+from datetime import time as clock
+from email.utils import format_datetime, parsedate_to_datetime
+
+from model import Course, CourseEvent, CourseSeries, Group
+from sqlalchemy import select, union, update
+from sqlalchemy.orm import Session
+
+# Part of every ETag, so changing the rendering invalidates cached feeds
+FEED_FORMAT = 2
+PRODUCT_ID = "-//AGH//Booking System//PL"
+
+
+def touch_groups(db: Session, group_ids: Iterable[int | None]) -> None:
+    """
+    Mark the schedules of groups as changed.
+
+    Call it before committing a change to events, courses or rooms so the new
+    version is committed together with the change.
+
+    Args:
+        db (Session): Database session
+        group_ids (Iterable[int | None]): IDs of the affected groups
+    """
+    ids = {group_id for group_id in group_ids if group_id is not None}
+    if not ids:
+        return
+    db.execute(
+        update(Group)
+        .where(Group.id.in_(ids))
+        .values(
+            schedule_version=Group.schedule_version + 1,
+            schedule_updated_at=datetime.now(timezone.utc),
+        )
+    )
+
+
+def touch_groups_using_room(db: Session, room_id: int) -> None:
+    """
+    Mark the schedules of all groups with events in a room as changed.
+
+    Args:
+        db (Session): Database session
+        room_id (int): ID of the room
+    """
+    group_ids = db.scalars(
+        union(
+            select(Course.group_id)
+            .join(CourseEvent)
+            .where(CourseEvent.room_id == room_id),
+            select(Course.group_id)
+            .join(CourseSeries)
+            .where(CourseSeries.room_id == room_id),
+        )
+    )
+    touch_groups(db, group_ids.all())
+
+
+def feed_validators(
+    name: str, title: str, versions: Sequence[tuple[int, int, datetime]]
+) -> tuple[str, datetime | None]:
+    """
+    Build the ETag and Last-Modified of a feed from the versions of its groups.
+
+    Args:
+        name (str): Feed identifier, e.g. ``group-3``
+        title (str): Calendar name, part of the ETag since it is not versioned
+        versions (Sequence[tuple[int, int, datetime]]): (group ID, schedule
+            version, schedule update time) of every group in the feed
+
+    Returns:
+        tuple[str, datetime | None]: Quoted ETag and the latest update time
+    """
+    state = ",".join(
+        f"{group_id}:{version}" for group_id, version, _ in sorted(versions)
+    )
+    digest = hashlib.sha1(f"{FEED_FORMAT}|{title}|{state}".encode()).hexdigest()[:16]
+    updated = [updated_at for _, _, updated_at in versions]
+    last_modified = max(updated) if updated else None
+    if last_modified is not None and last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return f'"{name}-{digest}"', last_modified
+
+
+def is_not_modified(
+    if_none_match: str | None,
+    if_modified_since: str | None,
+    etag: str,
+    last_modified: datetime | None,
+) -> bool:
+    """
+    Evaluate the conditional request headers of a feed request.
+
+    ``If-None-Match`` takes precedence; ``If-Modified-Since`` is only used
+    when it is absent.
+
+    Args:
+        if_none_match (str | None): Value of the If-None-Match header
+        if_modified_since (str | None): Value of the If-Modified-Since header
+        etag (str): Current ETag of the feed
+        last_modified (datetime | None): Current Last-Modified of the feed
+
+    Returns:
+        bool: Whether a 304 response can be sent
+    """
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def http_date(moment: datetime) -> str:
+    """
+    Format a timestamp for the Last-Modified header.
+
+    Args:
+        moment (datetime): Timezone-aware timestamp
+
+    Returns:
+        str: IMF-fixdate in GMT
+    """
+    return format_datetime(moment.astimezone(timezone.utc), usegmt=True)
+
+
+def escape_text(value: str) -> str:
+    """
+    Escape a TEXT property value.
+
+    Args:
+        value (str): Raw value
+
+    Returns:
+        str: Value with backslashes, separators and newlines escaped
+    """
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line: str) -> str:
+    """
+    Fold a content line at 75 octets and terminate it with CRLF.
+
+    Args:
+        line (str): Unfolded content line
+
+    Returns:
+        str: Folded line
+    """
+    if len(line.encode()) <= 75:
+        return line + "\r\n"
+    parts, current, size = [], "", 0
+    for char in line:
+        width = len(char.encode())
+        if size + width > 75:
+            parts.append(current)
+            # Continuation lines start with a space that counts towards the limit
+            current, size = " ", 1
+        current += char
+        size += width
+    parts.append(current)
+    return "\r\n".join(parts) + "\r\n"
+
+
+def _local(day: date, moment: clock) -> str:
+    return datetime.combine(day, moment).strftime("%Y%m%dT%H%M%S")
+
+
+def render_header(name: str) -> str:
+    """
+    Render the beginning of a calendar.
+
+    Args:
+        name (str): Calendar name shown by clients
+
+    Returns:
+        str: VCALENDAR header lines
+    """
+    return (
+        fold("BEGIN:VCALENDAR")
+        + fold("VERSION:2.0")
+        + fold(f"PRODID:{PRODUCT_ID}")
+        + fold("CALSCALE:GREGORIAN")
+        + fold(f"X-WR-CALNAME:{escape_text(name)}")
+    )
+
+
+def render_event(
+    event_id: int,
+    day: date,
+    start: clock,
+    end: clock,
+    summary: str,
+    location: str | None,
+    canceled: bool,
+    stamp: datetime,
+) -> str:
+    """
+    Render one course event as a VEVENT.
+
+    Args:
+        event_id (int): ID of the course event
+        day (date): Day of the event
+        start (clock): Start time of its slot
+        end (clock): End time of its slot
+        summary (str): Course name
+        location (str | None): Room name
+        canceled (bool): Whether the event is canceled
+        stamp (datetime): DTSTAMP of the event
+
+    Returns:
+        str: VEVENT lines
+    """
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:event-{event_id}@booking-system-agh",
+        f"DTSTAMP:{stamp.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}",
+        f"DTSTART:{_local(day, start)}",
+        f"DTEND:{_local(day, end)}",
+        f"SUMMARY:{escape_text(summary)}",
+    ]
+    if location:
+        lines.append(f"LOCATION:{escape_text(location)}")
+    if canceled:
+        lines.append("STATUS:CANCELLED")
+    lines.append("END:VEVENT")
+    return "".join(fold(line) for line in lines)
+
+
+def render_series(
+    series_id: int,
+    first_day: date,
+    last_day: date,
+    start: clock,
+    end: clock,
+    summary: str,
+    location: str | None,
+    exception_days: Sequence[date],
+    stamp: datetime,
+) -> str:
+    """
+    Render a weekly series as one recurring VEVENT.
+
+    Args:
+        series_id (int): ID of the series
+        first_day (date): Day of the first occurrence
+        last_day (date): Day of the last occurrence
+        start (clock): Start time of its slot
+        end (clock): End time of its slot
+        summary (str): Course name
+        location (str | None): Room name
+        exception_days (Sequence[date]): Days of occurrences replaced by an
+            exception, which the feed lists as separate events
+        stamp (datetime): DTSTAMP of the event
+
+    Returns:
+        str: VEVENT lines
+    """
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:series-{series_id}@booking-system-agh",
+        f"DTSTAMP:{stamp.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}",
+        f"DTSTART:{_local(first_day, start)}",
+        f"DTEND:{_local(first_day, end)}",
+        f"RRULE:FREQ=WEEKLY;UNTIL={_local(last_day, start)}",
+    ]
+    if exception_days:
+        lines.append("EXDATE:" + ",".join(_local(day, start) for day in exception_days))
+    lines.append(f"SUMMARY:{escape_text(summary)}")
+    if location:
+        lines.append(f"LOCATION:{escape_text(location)}")
+    lines.append("END:VEVENT")
+    return "".join(fold(line) for line in lines)
+
+
+async def stream_calendar(
+    name: str,
+    partitions: AsyncIterable[Sequence],
+    stamp: datetime,
+    series: Sequence[Sequence] = (),
+) -> AsyncIterable[str]:
+    """
+    Render a calendar chunk by chunk.
+
+    Args:
+        name (str): Calendar name
+        partitions (AsyncIterable[Sequence]): Batches of rows with the
+            arguments of ``render_event`` except ``stamp``
+        stamp (datetime): DTSTAMP of every event
+        series (Sequence[Sequence], optional): Rows with the arguments of
+            ``render_series`` except ``stamp``. Defaults to ().
+
+    Returns:
+        AsyncIterable[str]: Calendar text, one chunk per batch of events
+    """
+    yield render_header(name)
+    if series:
+        yield "".join(render_series(*row, stamp=stamp) for row in series)
+    async for rows in partitions:
+        yield "".join(render_event(*row, stamp=stamp) for row in rows)
+    yield fold("END:VCALENDAR")
@@ -0,0 +1,160 @@
+"""
+Versioned HTTP caching of the catalog endpoints.
+
+Rooms, equipment, groups and courses change rarely but are read on nearly
+every page load. Each of them has a counter in ``catalog_versions`` that write
+endpoints bump in the transaction of their change. Read endpoints derive their
+ETag from the counters of the tables they show, so a matching
+``If-None-Match`` is answered with 304 after one primary-key lookup and
+before any catalog row is loaded. Bodies are kept in an in-process cache keyed
+by URL and counters: a bump makes every cached body of the table unreachable
+in all workers at once, without any cross-process invalidation.
+"""
+
+import threading
+from collections.abc import Awaitable, Callable, Sequence
+from functools import cache
+from typing import Any
+
+from cache import TTLCache
+from calendar_feed import is_not_modified
+from fastapi import Request, Response
+from model import CatalogVersion
+from pydantic import TypeAdapter
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.status import HTTP_304_NOT_MODIFIED
+
+RESPONSE_CACHE_SIZE = 1024
+RESPONSE_CACHE_TTL = 600.0
+
+
+def bump_versions(db: Session, *tables: str) -> None:
+    """
+    Mark catalog tables as changed.
+
+    Call it before committing a write so the new version is committed together
+    with the change.
+
+    Args:
+        db (Session): Database session
+        *tables (str): Names of the changed tables, see ``CATALOG_TABLES``
+    """
+    db.execute(
+        update(CatalogVersion)
+        .where(CatalogVersion.name.in_(tables))
+        .values(version=CatalogVersion.version + 1)
+    )
+
+
+@cache
+def _adapter(schema: object) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+class CatalogCache:
+    """Conditional responses and a body cache for catalog read endpoints."""
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        """
+        Create an empty cache.
+
+        Args:
+            max_size (int): Number of response bodies kept
+            ttl (float): Time to live of a body in seconds
+        """
+        self.responses: TTLCache[tuple[bytes, dict[str, str]]] = TTLCache(
+            max_size, ttl
+        )
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+
+    async def respond(
+        self,
+        request: Request,
+        db: AsyncSession,
+        tables: Sequence[str],
+        schema: object,
+        load: Callable[[], Awaitable[Any]],
+        response: Response | None = None,
+    ) -> Response:
+        """
+        Answer a catalog read from its versions, the body cache or the database.
+
+        Args:
+            request (Request): Incoming request, its URL is the cache key
+            db (AsyncSession): Database session
+            tables (Sequence[str]): Catalog tables the response is built from
+            schema (object): Response model used to serialize the loaded objects
+            load (Callable[[], Awaitable[Any]]): Loads the objects on a cache miss;
+                exceptions it raises, e.g. a 404, are passed on uncached
+            response (Response | None, optional): Response injected into the
+                endpoint; headers ``load`` sets on it are cached with the body.
+                Defaults to None.
+
+        Returns:
+            Response: 304, or the JSON body with its ETag
+        """
+        versions = dict(
+            (
+                await db.execute(
+                    select(CatalogVersion.name, CatalogVersion.version).where(
+                        CatalogVersion.name.in_(tables)
+                    )
+                )
+            ).all()
+        )
+        state = tuple(versions.get(table, 0) for table in tables)
+        etag = '"' + "-".join(f"{t}.{v}" for t, v in zip(tables, state)) + '"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        with self._lock:
+            self.requests += 1
+        if is_not_modified(request.headers.get("if-none-match"), None, etag, None):
+            with self._lock:
+                self.not_modified += 1
+            return Response(status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+
+        key = (request.url.path, request.url.query, state)
+        cached = self.responses.get(key)
+        if cached is None:
+            adapter = _adapter(schema)
+            body = adapter.dump_json(
+                adapter.validate_python(await load(), from_attributes=True)
+            )
+            extra = dict(response.headers) if response is not None else {}
+            cached = (body, extra)
+            self.responses.set(key, cached)
+        body, extra = cached
+        return Response(
+            content=body, media_type="application/json", headers={**extra, **headers}
+        )
+
+    def clear(self) -> None:
+        """Remove every cached body and reset the counters."""
+        self.responses.clear()
+        with self._lock:
+            self.requests = 0
+            self.not_modified = 0
+
+    def stats(self) -> dict:
+        """
+        Return the body cache statistics and the share of 304 answers.
+
+        Returns:
+            dict: Request and 304 counters and the body cache hit/miss counters
+        """
+        with self._lock:
+            requests, not_modified = self.requests, self.not_modified
+        return {
+            "requests": requests,
+            "not_modified": not_modified,
+            "not_modified_ratio": (
+                round(not_modified / requests, 4) if requests else None
+            ),
+            "bodies": self.responses.stats(),
+        }
+
+
+catalog_cache = CatalogCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
@@ -21,6 +21,7 @@ from model import (
 from routers.auth import get_password_hash
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from utilization import rebuild
 
 
 def add_data(DATABASE_URL):
@@ -242,6 +243,10 @@ def add_data(DATABASE_URL):
         # No need to flush here if this is the last set of adds before commit
         # session.flush()
 
+        # --- Room utilization aggregates ---
+        session.flush()
+        rebuild(session)
+
         # --- Commit Transaction ---
         session.commit()
         print("DB has been populated with mock data.")
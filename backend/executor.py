@@ -0,0 +1,112 @@
+"""Bounded thread pool that runs blocking calls on behalf of async handlers."""
+
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+from metrics import Histogram
+
+T = TypeVar("T")
+
+
+class ExecutorFullError(RuntimeError):
+    """Raised when a bounded executor already has its maximum number of queued calls."""
+
+
+class BoundedExecutor:
+    """
+    Thread pool for blocking calls made from async handlers.
+
+    At most ``workers`` calls run at the same time and at most ``max_queue``
+    wait for a free worker; further calls are rejected with
+    ``ExecutorFullError`` instead of piling up. Queue depth, rejections and
+    queue/run time histograms are kept for monitoring.
+    """
+
+    def __init__(self, workers: int, max_queue: int, name: str) -> None:
+        """
+        Start the worker threads.
+
+        Args:
+            workers (int): Number of calls running at the same time
+            max_queue (int): Number of calls waiting for a free worker
+            name (str): Prefix of the worker thread names
+        """
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix=name
+        )
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.peak_queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_times = Histogram()
+        self.run_times = Histogram()
+
+    async def run(self, func: Callable[..., T], *args: object) -> T:
+        """
+        Run a blocking function on the pool and await its result.
+
+        Args:
+            func (Callable): Function to call
+            *args (object): Positional arguments for the function
+
+        Raises:
+            ExecutorFullError: If the queue is already full
+
+        Returns:
+            T: The value returned by the function
+        """
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise ExecutorFullError(f"More than {self.max_queue} calls are queued")
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+        submitted = time.perf_counter()
+
+        def call() -> T:
+            started = time.perf_counter()
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+            self.wait_times.observe(started - submitted)
+            try:
+                return func(*args)
+            finally:
+                self.run_times.observe(time.perf_counter() - started)
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, call)
+
+    def stats(self) -> dict:
+        """
+        Return the current load of the executor.
+
+        Returns:
+            dict: Limits, queue depth, counters and wait/run time histograms
+        """
+        with self._lock:
+            counters = {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": self.running,
+                "queued": self.queued,
+                "peak_queued": self.peak_queued,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+        return {
+            **counters,
+            "wait_ms": self.wait_times.snapshot(),
+            "run_ms": self.run_times.snapshot(),
+        }
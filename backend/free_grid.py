@@ -0,0 +1,117 @@
+"""
+Room × day × slot free/busy grid.
+
+The grid is a NumPy boolean array of shape (rooms, days, slots) built from the
+occupancy rows of the requested window in a handful of vectorized operations:
+course events clear single cells, unavailability periods clear the cells whose
+slot times they overlap. Every room row is then encoded as a bitstring,
+day-major, with ``1`` for a free slot, so a month for a thousand rooms stays a
+few hundred kilobytes of JSON.
+"""
+
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+
+FREE, BUSY = ord("1"), ord("0")
+MINUTES_PER_DAY = 24 * 60
+
+
+def _offsets(days: list[date], start: date) -> np.ndarray:
+    return (np.array(days, dtype="datetime64[D]") - np.datetime64(start, "D")).astype(
+        np.int64
+    )
+
+
+def _minutes(moments: list[datetime], start: date) -> np.ndarray:
+    return (
+        np.array(moments, dtype="datetime64[m]") - np.datetime64(start, "m")
+    ).astype(np.int64)
+
+
+def _of_day(moment: time) -> int:
+    return moment.hour * 60 + moment.minute
+
+
+def _bounds(first: date | datetime, last: date | datetime) -> tuple[datetime, datetime]:
+    # A bare date stands for the whole day, so the end moves to the next midnight
+    if not isinstance(first, datetime):
+        first = datetime.combine(first, time())
+    if not isinstance(last, datetime):
+        last = datetime.combine(last + timedelta(days=1), time())
+    return first, last
+
+
+def free_grid(
+    room_ids: list[int],
+    slots: list[tuple[int, time, time]],
+    start: date,
+    days: int,
+    events: list[tuple[int, date, int]],
+    periods: list[tuple[int, date | datetime, date | datetime]],
+) -> np.ndarray:
+    """
+    Compute which slots of which rooms are free.
+
+    Args:
+        room_ids (list[int]): Room IDs in ascending order, one grid row each
+        slots (list[tuple[int, time, time]]): (slot ID, start time, end time) of
+            every time slot, in ascending ID order
+        start (date): First day of the grid
+        days (int): Number of days in the grid
+        events (list[tuple[int, date, int]]): (room ID, day, slot ID) of every
+            non-cancelled event in the window
+        periods (list[tuple[int, date | datetime, date | datetime]]): (room ID,
+            start, end) of every unavailability period overlapping the window.
+            A date bound covers its whole day; a datetime bound blocks only the
+            slots the period overlaps.
+
+    Returns:
+        np.ndarray: Boolean array of shape (rooms, days, slots), True when free
+    """
+    rooms = np.asarray(room_ids, dtype=np.int64)
+    slot_ids = np.asarray([slot[0] for slot in slots], dtype=np.int64)
+    free = np.ones((len(rooms), days, len(slot_ids)), dtype=bool)
+    if not len(rooms) or not days:
+        return free
+
+    if events:
+        event_rooms, event_days, event_slots = zip(*events)
+        free[
+            np.searchsorted(rooms, event_rooms),
+            _offsets(event_days, start),
+            np.searchsorted(slot_ids, event_slots),
+        ] = False
+
+    if periods and len(slot_ids):
+        period_rooms, firsts, lasts = zip(
+            *((room_id, *_bounds(first, last)) for room_id, first, last in periods)
+        )
+        # (days, slots) start and end of every cell, in minutes since the grid start
+        day_minutes = np.arange(days)[:, None] * MINUTES_PER_DAY
+        cell_starts = day_minutes + [_of_day(slot_start) for _, slot_start, _ in slots]
+        cell_ends = day_minutes + [_of_day(slot_end) for _, _, slot_end in slots]
+        # (periods, days, slots) mask of the cells every period overlaps
+        covered = (_minutes(firsts, start)[:, None, None] < cell_ends) & (
+            _minutes(lasts, start)[:, None, None] > cell_starts
+        )
+        blocked = np.zeros(free.shape, dtype=bool)
+        np.logical_or.at(blocked, np.searchsorted(rooms, period_rooms), covered)
+        free &= ~blocked
+
+    return free
+
+
+def encode_rows(grid: np.ndarray) -> list[str]:
+    """
+    Encode every room of a grid as a bitstring.
+
+    Args:
+        grid (np.ndarray): Boolean array of shape (rooms, days, slots)
+
+    Returns:
+        list[str]: One string of ``days * slots`` characters per room, ``1`` for
+            a free slot, ordered by day and then by slot
+    """
+    codes = np.where(grid.reshape(len(grid), -1), FREE, BUSY).astype(np.uint8)
+    return [row.tobytes().decode("ascii") for row in codes]
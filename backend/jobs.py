@@ -0,0 +1,330 @@
+"""
+Persistent background jobs run on an in-process worker pool.
+
+A handler that would hold a request and a database connection for seconds
+stores a ``Job`` row with ``JobRunner.enqueue`` and answers with its ID right
+away. At most ``workers`` jobs run at the same time, each on its own session;
+the others wait in the pool's queue, so a burst of requests is worked off in
+order instead of exhausting the connection pool. Clients poll ``/jobs/{id}``
+for the status and the result.
+
+The table is the source of truth: a worker only runs a job it moved from
+QUEUED to RUNNING itself, and on startup ``start`` resubmits the queued jobs.
+While a process runs, a sweeper thread refreshes ``heartbeat_at`` of the jobs
+it is running and requeues RUNNING jobs whose heartbeat stopped, i.e. whose
+process died, no matter how long they had been running.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from database import SessionLocal
+from metrics import Histogram
+from model import Job, JobStatus
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Seconds between heartbeats of running jobs and sweeps for dead ones
+JOB_HEARTBEAT = float(os.getenv("JOB_HEARTBEAT", "30"))
+# A RUNNING job without a heartbeat for longer lost its process and runs again
+JOB_STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", "120"))
+
+logger = logging.getLogger("booking.jobs")
+
+
+class JobError(Exception):
+    """
+    Expected failure of a job, stored as its error.
+
+    Handlers that also run inside a request carry the HTTP status code the
+    request fails with.
+    """
+
+    def __init__(self, message: str, status_code: int = 400) -> None:
+        """
+        Create the error.
+
+        Args:
+            message (str): Error stored on the job or sent as the detail
+            status_code (int, optional): Status of a failing request.
+                Defaults to 400.
+        """
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class JobRunner:
+    """
+    Worker pool for jobs stored in the ``jobs`` table.
+
+    Handlers are registered per job kind and called as
+    ``handler(db, **job.params)``; the dict they return is stored as the
+    result. A ``JobError`` fails the job with its message as the error.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        session_factory: sessionmaker = SessionLocal,
+        stale_after: float = JOB_STALE_AFTER,
+        heartbeat: float = JOB_HEARTBEAT,
+    ) -> None:
+        """
+        Create the worker pool; no job runs before :meth:`start`.
+
+        Args:
+            workers (int): Number of jobs running at the same time
+            session_factory (sessionmaker, optional): Creates the session of
+                every job. Defaults to SessionLocal.
+            stale_after (float, optional): Seconds without a heartbeat after
+                which a running job is requeued. Defaults to JOB_STALE_AFTER.
+            heartbeat (float, optional): Seconds between heartbeats of the
+                running jobs and sweeps for dead ones. Defaults to JOB_HEARTBEAT.
+        """
+        self.workers = workers
+        self.session_factory = session_factory
+        self.stale_after = stale_after
+        self.heartbeat = heartbeat
+        self.handlers: dict[str, Callable[..., dict]] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="jobs"
+        )
+        self._lock = threading.Lock()
+        # IDs of the jobs this process is running, kept alive by the sweeper
+        self._running_ids: set[int] = set()
+        self._stopped = threading.Event()
+        self._sweeper: threading.Thread | None = None
+        self.queued = 0
+        self.running = 0
+        self.peak_queued = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.wait_times = Histogram()
+        self.run_times = Histogram()
+
+    def register(self, kind: str) -> Callable:
+        """
+        Register the handler of a job kind, used as a decorator.
+
+        Args:
+            kind (str): Job kind stored in ``Job.kind``
+
+        Returns:
+            Callable: Decorator returning the handler unchanged
+        """
+
+        def decorator(handler: Callable[..., dict]) -> Callable[..., dict]:
+            self.handlers[kind] = handler
+            return handler
+
+        return decorator
+
+    def enqueue(self, db: Session, kind: str, params: dict, user_id: int | None) -> Job:
+        """
+        Store a job and submit it to the pool.
+
+        The job is committed before it is submitted, so a worker always finds it.
+
+        Args:
+            db (Session): Database session of the request
+            kind (str): Registered job kind
+            params (dict): JSON-serializable keyword arguments of the handler
+            user_id (int | None): ID of the user the job belongs to
+
+        Raises:
+            KeyError: If no handler is registered for the kind
+
+        Returns:
+            Job: The queued job
+        """
+        if kind not in self.handlers:
+            raise KeyError(f"No handler for job kind {kind!r}")
+        job = Job(kind=kind, params=params, user_id=user_id)
+        db.add(job)
+        db.commit()
+        self.submit(job.id)
+        return job
+
+    def submit(self, job_id: int) -> Future:
+        """
+        Queue a stored job for a worker.
+
+        Args:
+            job_id (int): ID of a QUEUED job
+
+        Returns:
+            Future: Completes once the worker is done with the job
+        """
+        with self._lock:
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+        return self._executor.submit(self._run, job_id, time.perf_counter())
+
+    def resume(self, db: Session) -> int:
+        """
+        Submit the queued jobs and the jobs whose process died.
+
+        Args:
+            db (Session): Database session
+
+        Returns:
+            int: Number of jobs submitted
+        """
+        self._requeue_dead(db)
+        job_ids = db.scalars(
+            select(Job.id).where(Job.status == JobStatus.QUEUED).order_by(Job.id)
+        ).all()
+        for job_id in job_ids:
+            self.submit(job_id)
+        return len(job_ids)
+
+    def sweep(self, db: Session) -> int:
+        """
+        Refresh the heartbeat of the running jobs and requeue dead ones.
+
+        Args:
+            db (Session): Database session
+
+        Returns:
+            int: Number of jobs requeued and submitted
+        """
+        with self._lock:
+            running = list(self._running_ids)
+        if running:
+            db.execute(
+                update(Job)
+                .where(Job.id.in_(running), Job.status == JobStatus.RUNNING)
+                .values(heartbeat_at=datetime.now(timezone.utc))
+            )
+            db.commit()
+        job_ids = self._requeue_dead(db)
+        for job_id in job_ids:
+            self.submit(job_id)
+        return len(job_ids)
+
+    def start(self, db: Session) -> int:
+        """
+        Resume the stored jobs and start sweeping for dead ones.
+
+        Args:
+            db (Session): Database session
+
+        Returns:
+            int: Number of jobs submitted
+        """
+        submitted = self.resume(db)
+        self._sweeper = threading.Thread(
+            target=self._sweep_periodically, name="jobs-sweeper", daemon=True
+        )
+        self._sweeper.start()
+        return submitted
+
+    def shutdown(self) -> None:
+        """
+        Stop sweeping and accepting jobs without waiting for running ones.
+
+        Jobs that have not started stay QUEUED and are resumed by the next
+        process; interrupted ones are requeued once their heartbeat is stale.
+        """
+        self._stopped.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _requeue_dead(self, db: Session) -> list[int]:
+        stale = datetime.now(timezone.utc) - timedelta(seconds=self.stale_after)
+        job_ids = db.scalars(
+            update(Job)
+            .where(
+                Job.status == JobStatus.RUNNING,
+                func.coalesce(Job.heartbeat_at, Job.started_at) < stale,
+            )
+            .values(status=JobStatus.QUEUED, started_at=None, heartbeat_at=None)
+            .returning(Job.id)
+        ).all()
+        db.commit()
+        return sorted(job_ids)
+
+    def _sweep_periodically(self) -> None:
+        while not self._stopped.wait(self.heartbeat):
+            try:
+                with self.session_factory() as db:
+                    self.sweep(db)
+            except Exception:
+                logger.exception("Job sweep failed")
+
+    def _run(self, job_id: int, submitted: float) -> None:
+        started = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        self.wait_times.observe(started - submitted)
+        try:
+            with self.session_factory() as db:
+                self._execute(db, job_id)
+        finally:
+            self.run_times.observe(time.perf_counter() - started)
+            with self._lock:
+                self.running -= 1
+                self._running_ids.discard(job_id)
+
+    def _execute(self, db: Session, job_id: int) -> None:
+        # Claim the job so that no other worker or process runs it as well
+        now = datetime.now(timezone.utc)
+        claimed = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JobStatus.QUEUED)
+            .values(status=JobStatus.RUNNING, started_at=now, heartbeat_at=now)
+        ).rowcount
+        db.commit()
+        if not claimed:
+            return
+        with self._lock:
+            self._running_ids.add(job_id)
+        job = db.get(Job, job_id)
+        try:
+            result = self.handlers[job.kind](db, **job.params)
+        except JobError as error:
+            db.rollback()
+            status, job.error = JobStatus.FAILED, str(error)
+        except Exception as error:
+            db.rollback()
+            status, job.error = JobStatus.FAILED, f"{type(error).__name__}: {error}"
+        else:
+            status, job.result = JobStatus.SUCCEEDED, result
+        job.status, job.finished_at = status, datetime.now(timezone.utc)
+        db.commit()
+        with self._lock:
+            if status == JobStatus.SUCCEEDED:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+
+    def stats(self) -> dict:
+        """
+        Return the current load of the runner.
+
+        Returns:
+            dict: Worker limit, queue depth, counters and wait/run time histograms
+        """
+        with self._lock:
+            counters = {
+                "workers": self.workers,
+                "running": self.running,
+                "queued": self.queued,
+                "peak_queued": self.peak_queued,
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+            }
+        return {
+            **counters,
+            "wait_ms": self.wait_times.snapshot(),
+            "run_ms": self.run_times.snapshot(),
+        }
+
+
+job_runner = JobRunner(workers=JOB_WORKERS)
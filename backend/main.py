@@ -1,20 +1,48 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from database import SessionLocal, async_engine, engine
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from jobs import job_runner
+from occupancy import occupancy_index
+from pagination import NEXT_CURSOR_HEADER
+from sql_timing import SQLTimingMiddleware, instrument
 
 from routers import (
+    admin,
     auth,
+    calendar,
     change_recommendation,
     change_request,
     courses,
     group,
+    jobs,
+    notifications,
     proposal,
     room,
     room_unavailability,
+    reports,
     user,
     equipment,
 )
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Load the in-memory indexes before serving and stop the workers after."""
+    with SessionLocal() as db:
+        occupancy_index.load(db)
+        job_runner.start(db)
+    yield
+    job_runner.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+
+instrument(engine)
+instrument(async_engine.sync_engine)
+app.add_middleware(SQLTimingMiddleware)
 
 app.include_router(auth.router)
 app.include_router(group.router)
@@ -26,6 +54,11 @@ app.include_router(courses.router)
 app.include_router(change_recommendation.router)
 app.include_router(room_unavailability.router)
 app.include_router(equipment.router)
+app.include_router(admin.router)
+app.include_router(calendar.router)
+app.include_router(reports.router)
+app.include_router(jobs.router)
+app.include_router(notifications.router)
 
 origins = ["http://localhost:3000", "http://127.0.0.1:3000"]
 
@@ -35,6 +68,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 
@@ -0,0 +1,74 @@
+"""Lightweight in-process metrics for the monitoring endpoints."""
+
+import threading
+
+DEFAULT_BOUNDS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class Histogram:
+    """
+    Thread-safe histogram of durations, reported in milliseconds.
+
+    Buckets are cumulative: the count under a bound includes every observation
+    less than or equal to it, the ``+Inf`` bucket equals the total count.
+    """
+
+    def __init__(self, bounds_ms: tuple[float, ...] = DEFAULT_BOUNDS_MS) -> None:
+        """
+        Create an empty histogram.
+
+        Args:
+            bounds_ms (tuple[float, ...], optional): Upper bounds of the buckets in
+                milliseconds. Defaults to DEFAULT_BOUNDS_MS.
+        """
+        self._lock = threading.Lock()
+        self.bounds_ms = bounds_ms
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all observations."""
+        with self._lock:
+            self._counts = [0] * (len(self.bounds_ms) + 1)
+            self.count = 0
+            self.sum_ms = 0.0
+            self.max_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """
+        Record one duration.
+
+        Args:
+            seconds (float): Observed duration in seconds
+        """
+        value = seconds * 1000
+        with self._lock:
+            position = len(self.bounds_ms)
+            for index, bound in enumerate(self.bounds_ms):
+                if value <= bound:
+                    position = index
+                    break
+            self._counts[position] += 1
+            self.count += 1
+            self.sum_ms += value
+            self.max_ms = max(self.max_ms, value)
+
+    def snapshot(self) -> dict:
+        """
+        Return the current state of the histogram.
+
+        Returns:
+            dict: Count, sum and maximum in milliseconds and cumulative buckets
+        """
+        with self._lock:
+            buckets = {}
+            running = 0
+            for bound, count in zip(self.bounds_ms, self._counts):
+                running += count
+                buckets[str(bound)] = running
+            buckets["+Inf"] = self.count
+            return {
+                "count": self.count,
+                "sum_ms": round(self.sum_ms, 3),
+                "max_ms": round(self.max_ms, 3),
+                "buckets": buckets,
+            }
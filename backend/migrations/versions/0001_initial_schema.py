@@ -0,0 +1,245 @@
+"""initial schema.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:20:15.684375
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: str | Sequence[str] | None = None
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "equipment",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.create_index(op.f("ix_equipment_id"), "equipment", ["id"], unique=False)
+    op.create_table(
+        "rooms",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("capacity", sa.Integer(), nullable=True),
+        sa.Column(
+            "type",
+            sa.Enum(
+                "LECTURE_HALL",
+                "LABORATORY",
+                "SEMINAR_ROOM",
+                "CONFERENCE_ROOM",
+                "OTHER",
+                name="roomtype",
+            ),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "time_slots",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("start_time", sa.Time(), nullable=False),
+        sa.Column("end_time", sa.Time(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(length=150), nullable=False),
+        sa.Column("password", sa.String(length=150), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("surname", sa.String(length=100), nullable=False),
+        sa.Column(
+            "role",
+            sa.Enum("ADMIN", "KOORDYNATOR", "PROWADZACY", "STAROSTA", name="userrole"),
+            nullable=False,
+        ),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("email"),
+    )
+    op.create_table(
+        "groups",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=True),
+        sa.Column("leader_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["leader_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "room_equipment",
+        sa.Column("room_id", sa.Integer(), nullable=True),
+        sa.Column("equipment_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["equipment_id"],
+            ["equipment.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["room_id"],
+            ["rooms.id"],
+        ),
+    )
+    op.create_table(
+        "room_unavailability",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("room_id", sa.Integer(), nullable=False),
+        sa.Column("start_datetime", sa.Date(), nullable=False),
+        sa.Column("end_datetime", sa.Date(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["room_id"],
+            ["rooms.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "courses",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=150), nullable=False),
+        sa.Column("teacher_id", sa.Integer(), nullable=False),
+        sa.Column("group_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["group_id"],
+            ["groups.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["teacher_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "course_events",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("course_id", sa.Integer(), nullable=False),
+        sa.Column("room_id", sa.Integer(), nullable=True),
+        sa.Column("time_slot_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("canceled", sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["course_id"],
+            ["courses.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["room_id"],
+            ["rooms.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["time_slot_id"],
+            ["time_slots.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "change_requests",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("course_event_id", sa.Integer(), nullable=False),
+        sa.Column("initiator_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "PENDING",
+                "ACCEPTED",
+                "REJECTED",
+                "CANCELLED",
+                name="changerequeststatus",
+            ),
+            nullable=False,
+        ),
+        sa.Column("reason", sa.Text(), nullable=False),
+        sa.Column("room_requirements", sa.Text(), nullable=True),
+        sa.Column("minimum_capacity", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["course_event_id"],
+            ["course_events.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["initiator_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "availability_proposals",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("change_request_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("time_slot_id", sa.Integer(), nullable=False),
+        sa.Column("accepted_by_leader", sa.Boolean(), nullable=True),
+        sa.Column("accepted_by_representative", sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["change_request_id"],
+            ["change_requests.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["time_slot_id"],
+            ["time_slots.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "change_recommendations",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("change_request_id", sa.Integer(), nullable=False),
+        sa.Column("recommended_slot_id", sa.Integer(), nullable=False),
+        sa.Column("recommended_day", sa.Date(), nullable=False),
+        sa.Column("recommended_room_id", sa.Integer(), nullable=False),
+        sa.Column("source_proposal_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["change_request_id"],
+            ["change_requests.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["recommended_room_id"],
+            ["rooms.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["recommended_slot_id"],
+            ["time_slots.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["source_proposal_id"],
+            ["availability_proposals.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("change_recommendations")
+    op.drop_table("availability_proposals")
+    op.drop_table("change_requests")
+    op.drop_table("course_events")
+    op.drop_table("courses")
+    op.drop_table("room_unavailability")
+    op.drop_table("room_equipment")
+    op.drop_table("groups")
+    op.drop_table("users")
+    op.drop_table("time_slots")
+    op.drop_table("rooms")
+    op.drop_index(op.f("ix_equipment_id"), table_name="equipment")
+    op.drop_table("equipment")
+    for enum_name in ("changerequeststatus", "userrole", "roomtype"):
+        sa.Enum(name=enum_name).drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,75 @@
+"""add hot query indexes.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:20:24.698271
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: str | Sequence[str] | None = "0001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_availability_proposals_request_user",
+        "availability_proposals",
+        ["change_request_id", "user_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_change_requests_course_event_id",
+        "change_requests",
+        ["course_event_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_change_requests_initiator_status",
+        "change_requests",
+        ["initiator_id", "status"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_course_events_course_id", "course_events", ["course_id"], unique=False
+    )
+    op.create_index(
+        "ix_course_events_room_day_slot",
+        "course_events",
+        ["room_id", "day", "time_slot_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_room_equipment_equipment_id",
+        "room_equipment",
+        ["equipment_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_room_unavailability_room_period",
+        "room_unavailability",
+        ["room_id", "start_datetime", "end_datetime"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_room_unavailability_room_period", table_name="room_unavailability"
+    )
+    op.drop_index("ix_room_equipment_equipment_id", table_name="room_equipment")
+    op.drop_index("ix_course_events_room_day_slot", table_name="course_events")
+    op.drop_index("ix_course_events_course_id", table_name="course_events")
+    op.drop_index("ix_change_requests_initiator_status", table_name="change_requests")
+    op.drop_index("ix_change_requests_course_event_id", table_name="change_requests")
+    op.drop_index(
+        "ix_availability_proposals_request_user", table_name="availability_proposals"
+    )
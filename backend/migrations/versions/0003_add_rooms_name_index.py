@@ -0,0 +1,27 @@
+"""add rooms name index for keyset pagination.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 11:02:47.315904
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: str | Sequence[str] | None = "0002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_rooms_name_id", "rooms", ["name", "id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_rooms_name_id", table_name="rooms")
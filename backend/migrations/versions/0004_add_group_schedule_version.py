@@ -0,0 +1,41 @@
+"""add group schedule version.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 12:14:05.902113
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: str | Sequence[str] | None = "0003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "groups",
+        sa.Column("schedule_version", sa.Integer(), server_default="1", nullable=False),
+    )
+    op.add_column(
+        "groups",
+        sa.Column(
+            "schedule_updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("groups", "schedule_updated_at")
+    op.drop_column("groups", "schedule_version")
@@ -0,0 +1,91 @@
+"""make active course event slots unique per room.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 16:12:05.418203
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: str | Sequence[str] | None = "0004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Snapshots of the tables as of this revision, independent of model.py
+course_events = sa.table(
+    "course_events",
+    sa.column("id", sa.Integer),
+    sa.column("course_id", sa.Integer),
+    sa.column("room_id", sa.Integer),
+    sa.column("time_slot_id", sa.Integer),
+    sa.column("day", sa.Date),
+    sa.column("canceled", sa.Boolean),
+)
+courses = sa.table(
+    "courses", sa.column("id", sa.Integer), sa.column("group_id", sa.Integer)
+)
+groups = sa.table(
+    "groups", sa.column("id", sa.Integer), sa.column("schedule_version", sa.Integer)
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Double bookings made before the constraint would fail the index. Keep the
+    # oldest active event of every room slot and cancel the others, so change
+    # requests pointing at them stay valid; their groups' feeds change too
+    conn = op.get_bind()
+    active = sa.and_(
+        sa.not_(course_events.c.canceled), course_events.c.room_id.is_not(None)
+    )
+    kept = (
+        sa.select(sa.func.min(course_events.c.id))
+        .where(active)
+        .group_by(
+            course_events.c.room_id, course_events.c.day, course_events.c.time_slot_id
+        )
+    )
+    duplicates = conn.execute(
+        sa.select(course_events.c.id, course_events.c.course_id).where(
+            active, course_events.c.id.not_in(kept)
+        )
+    ).all()
+    if duplicates:
+        conn.execute(
+            sa.update(course_events)
+            .where(course_events.c.id.in_([row.id for row in duplicates]))
+            .values(canceled=True)
+        )
+        group_ids = sa.select(courses.c.group_id).where(
+            courses.c.id.in_({row.course_id for row in duplicates})
+        )
+        conn.execute(
+            sa.update(groups)
+            .where(groups.c.id.in_(group_ids))
+            .values(schedule_version=groups.c.schedule_version + 1)
+        )
+    op.create_index(
+        "uq_course_events_room_day_slot",
+        "course_events",
+        ["room_id", "day", "time_slot_id"],
+        unique=True,
+        postgresql_where=sa.text("NOT canceled"),
+        sqlite_where=sa.text("NOT canceled"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The cancelled double bookings stay cancelled, as they would clash again
+    op.drop_index(
+        "uq_course_events_room_day_slot",
+        table_name="course_events",
+        postgresql_where=sa.text("NOT canceled"),
+        sqlite_where=sa.text("NOT canceled"),
+    )
@@ -0,0 +1,82 @@
+"""add course series.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 09:45:21.977895
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: str | Sequence[str] | None = "0005"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "course_series",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("course_id", sa.Integer(), nullable=False),
+        sa.Column("room_id", sa.Integer(), nullable=False),
+        sa.Column("time_slot_id", sa.Integer(), nullable=False),
+        sa.Column("weekday", sa.Integer(), nullable=False),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["course_id"],
+            ["courses.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["room_id"],
+            ["rooms.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["time_slot_id"],
+            ["time_slots.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_course_series_course_id", "course_series", ["course_id"], unique=False
+    )
+    op.create_index(
+        "ix_course_series_room_weekday_slot",
+        "course_series",
+        ["room_id", "weekday", "time_slot_id"],
+        unique=False,
+    )
+    op.add_column("course_events", sa.Column("series_id", sa.Integer(), nullable=True))
+    op.add_column("course_events", sa.Column("series_day", sa.Date(), nullable=True))
+    op.create_index(
+        "uq_course_events_series_day",
+        "course_events",
+        ["series_id", "series_day"],
+        unique=True,
+    )
+    op.create_foreign_key(
+        "course_events_series_id_fkey",
+        "course_events",
+        "course_series",
+        ["series_id"],
+        ["id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(
+        "course_events_series_id_fkey", "course_events", type_="foreignkey"
+    )
+    op.drop_index("uq_course_events_series_day", table_name="course_events")
+    op.drop_column("course_events", "series_day")
+    op.drop_column("course_events", "series_id")
+    op.drop_index("ix_course_series_room_weekday_slot", table_name="course_series")
+    op.drop_index("ix_course_series_course_id", table_name="course_series")
+    op.drop_table("course_series")
@@ -0,0 +1,42 @@
+"""add room week usage.
+
+The table starts empty, run ``python -m utilization`` to fill it.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 09:54:06.201895
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: str | Sequence[str] | None = "0007"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "room_week_usage",
+        sa.Column("room_id", sa.Integer(), nullable=False),
+        sa.Column("week", sa.Date(), nullable=False),
+        sa.Column("booked_slots", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("canceled_slots", sa.Integer(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["room_id"], ["rooms.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("room_id", "week"),
+    )
+    op.create_index(
+        "ix_room_week_usage_week", "room_week_usage", ["week"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_room_week_usage_week", table_name="room_week_usage")
+    op.drop_table("room_week_usage")
@@ -0,0 +1,30 @@
+"""add change recommendation score.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 09:57:32.883855
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: str | Sequence[str] | None = "0008"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "change_recommendations", sa.Column("score", sa.Float(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("change_recommendations", "score")
@@ -0,0 +1,46 @@
+"""unique change recommendations.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 09:59:06.659807
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: str | Sequence[str] | None = "0009"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Earlier runs of common-availability appended duplicates, keep the oldest
+    op.execute(
+        "DELETE FROM change_recommendations WHERE id NOT IN ("
+        "SELECT min(id) FROM change_recommendations GROUP BY change_request_id,"
+        " recommended_day, recommended_slot_id, recommended_room_id)"
+    )
+    op.create_index(
+        "uq_change_recommendations_request_day_slot_room",
+        "change_recommendations",
+        [
+            "change_request_id",
+            "recommended_day",
+            "recommended_slot_id",
+            "recommended_room_id",
+        ],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "uq_change_recommendations_request_day_slot_room",
+        table_name="change_recommendations",
+    )
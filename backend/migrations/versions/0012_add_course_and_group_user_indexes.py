@@ -0,0 +1,31 @@
+"""add course and group user indexes.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18 10:06:16.007612
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0012"
+down_revision: str | Sequence[str] | None = "0011"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_courses_group_id", "courses", ["group_id"], unique=False)
+    op.create_index("ix_courses_teacher_id", "courses", ["teacher_id"], unique=False)
+    op.create_index("ix_groups_leader_id", "groups", ["leader_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_groups_leader_id", table_name="groups")
+    op.drop_index("ix_courses_teacher_id", table_name="courses")
+    op.drop_index("ix_courses_group_id", table_name="courses")
@@ -0,0 +1,184 @@
+"""fold weekly events into series.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18 11:02:41.318204
+
+"""
+
+from collections import defaultdict
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import date, timedelta
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0013"
+down_revision: str | Sequence[str] | None = "0012"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+BATCH_SIZE = 1000
+WEEK = timedelta(weeks=1)
+
+# Snapshots of the tables as of this revision, independent of model.py
+course_events = sa.table(
+    "course_events",
+    sa.column("id", sa.Integer),
+    sa.column("course_id", sa.Integer),
+    sa.column("room_id", sa.Integer),
+    sa.column("time_slot_id", sa.Integer),
+    sa.column("day", sa.Date),
+    sa.column("canceled", sa.Boolean),
+    sa.column("series_id", sa.Integer),
+    sa.column("series_day", sa.Date),
+)
+course_series = sa.table(
+    "course_series",
+    sa.column("id", sa.Integer),
+    sa.column("course_id", sa.Integer),
+    sa.column("room_id", sa.Integer),
+    sa.column("time_slot_id", sa.Integer),
+    sa.column("weekday", sa.Integer),
+    sa.column("start_date", sa.Date),
+    sa.column("end_date", sa.Date),
+)
+change_requests = sa.table("change_requests", sa.column("course_event_id", sa.Integer))
+courses = sa.table(
+    "courses", sa.column("id", sa.Integer), sa.column("group_id", sa.Integer)
+)
+groups = sa.table(
+    "groups", sa.column("id", sa.Integer), sa.column("schedule_version", sa.Integer)
+)
+
+
+def _runs(days: Iterable[date]) -> list[list[date]]:
+    # Consecutive weeks of one weekday; the days share a weekday already
+    runs = []
+    for day in sorted(days):
+        if runs and runs[-1][-1] + WEEK == day:
+            runs[-1].append(day)
+        else:
+            runs.append([day])
+    return runs
+
+
+def _batches(ids: Iterable[int]) -> Iterator[list[int]]:
+    ids = list(ids)
+    for start in range(0, len(ids), BATCH_SIZE):
+        yield ids[start : start + BATCH_SIZE]
+
+
+def _bump(conn: sa.Connection, course_ids: list[int]) -> None:
+    group_ids = sa.select(courses.c.group_id).where(courses.c.id.in_(course_ids))
+    conn.execute(
+        sa.update(groups)
+        .where(groups.c.id.in_(group_ids))
+        .values(schedule_version=groups.c.schedule_version + 1)
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Weekly classes imported one row per date become one series each. The
+    # rows of an active occurrence are dropped unless a change request refers
+    # to them, then they stay as an unchanged exception; a cancelled-only date
+    # keeps one cancelled row as the exception that cancels the occurrence.
+    conn = op.get_bind()
+    referenced = set(
+        conn.scalars(sa.select(change_requests.c.course_event_id).distinct()).all()
+    )
+    cells = defaultdict(lambda: defaultdict(list))
+    for row in conn.execute(
+        sa.select(course_events)
+        .where(
+            course_events.c.series_id.is_(None), course_events.c.room_id.is_not(None)
+        )
+        .order_by(course_events.c.id)
+    ):
+        key = (row.course_id, row.room_id, row.time_slot_id, row.day.weekday())
+        cells[key][row.day].append(row)
+
+    deleted, linked, course_ids = [], {}, set()
+    for (course_id, room_id, slot_id, weekday), by_day in cells.items():
+        for run in _runs(by_day):
+            active = [
+                day for day in run if any(not row.canceled for row in by_day[day])
+            ]
+            if len(active) < 2:
+                continue
+            series_id = conn.execute(
+                sa.insert(course_series)
+                .values(
+                    course_id=course_id,
+                    room_id=room_id,
+                    time_slot_id=slot_id,
+                    weekday=weekday,
+                    start_date=run[0],
+                    end_date=run[-1],
+                )
+                .returning(course_series.c.id)
+            ).scalar_one()
+            course_ids.add(course_id)
+            for day in run:
+                event = next(
+                    (row for row in by_day[day] if not row.canceled), by_day[day][0]
+                )
+                if event.canceled or event.id in referenced:
+                    linked[event.id] = series_id
+                else:
+                    deleted.append(event.id)
+
+    for batch in _batches(deleted):
+        conn.execute(sa.delete(course_events).where(course_events.c.id.in_(batch)))
+    for event_id, series_id in linked.items():
+        conn.execute(
+            sa.update(course_events)
+            .where(course_events.c.id == event_id)
+            .values(series_id=series_id, series_day=course_events.c.day)
+        )
+    for batch in _batches(course_ids):
+        _bump(conn, batch)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Every occurrence becomes a dated event again, exceptions turn plain
+    conn = op.get_bind()
+    exceptions = {
+        (row.series_id, row.series_day)
+        for row in conn.execute(
+            sa.select(course_events.c.series_id, course_events.c.series_day).where(
+                course_events.c.series_id.is_not(None)
+            )
+        )
+    }
+    rows, course_ids = [], set()
+    for series in conn.execute(sa.select(course_series)):
+        course_ids.add(series.course_id)
+        day = series.start_date + timedelta(
+            days=(series.weekday - series.start_date.weekday()) % 7
+        )
+        while day <= series.end_date:
+            if (series.id, day) not in exceptions:
+                rows.append(
+                    {
+                        "course_id": series.course_id,
+                        "room_id": series.room_id,
+                        "time_slot_id": series.time_slot_id,
+                        "day": day,
+                        "canceled": False,
+                    }
+                )
+            day += WEEK
+    for start in range(0, len(rows), BATCH_SIZE):
+        conn.execute(sa.insert(course_events), rows[start : start + BATCH_SIZE])
+    conn.execute(
+        sa.update(course_events)
+        .where(course_events.c.series_id.is_not(None))
+        .values(series_id=None, series_day=None)
+    )
+    conn.execute(sa.delete(course_series))
+    for batch in _batches(course_ids):
+        _bump(conn, batch)
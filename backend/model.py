@@ -1,17 +1,25 @@
 import enum
+from datetime import datetime, timezone
 
 from sqlalchemy import (
     Boolean,
     Column,
+    Connection,
     Date,
     DateTime,
     Enum,
+    Float,
     ForeignKey,
+    Index,
     Integer,
+    JSON,
     String,
     Text,
     Time,
     Table,
+    event,
+    func,
+    text,
 )
 from sqlalchemy.orm import declarative_base, relationship
 
@@ -32,6 +40,15 @@ class ChangeRequestStatus(enum.Enum):
     CANCELLED = "CANCELLED"
 
 
+class JobStatus(enum.Enum):
+    """Lifecycle of a background job."""
+
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
 class RoomType(enum.Enum):
     LECTURE_HALL = "LECTURE_HALL"
     LABORATORY = "LABORATORY"
@@ -42,11 +59,20 @@ class RoomType(enum.Enum):
 
 class Group(Base):
     __tablename__ = "groups"
+    __table_args__ = (Index("ix_groups_leader_id", "leader_id"),)
 
     id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False)
     year = Column(Integer, nullable=True)
     leader_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Bumped whenever an event of the group changes, used to validate calendar feeds
+    schedule_version = Column(Integer, nullable=False, default=1, server_default="1")
+    schedule_updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+    )
 
     leader = relationship("User", foreign_keys=[leader_id])
     courses = relationship(
@@ -79,6 +105,7 @@ room_equipment_association = Table(
     Base.metadata,
     Column("room_id", Integer, ForeignKey("rooms.id")),
     Column("equipment_id", Integer, ForeignKey("equipment.id")),
+    Index("ix_room_equipment_equipment_id", "equipment_id"),
 )
 
 class Equipment(Base):
@@ -91,6 +118,7 @@ class Equipment(Base):
 
 class Room(Base):
     __tablename__ = "rooms"
+    __table_args__ = (Index("ix_rooms_name_id", "name", "id"),)
 
     id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False)
@@ -106,6 +134,14 @@ class Room(Base):
 
 class RoomUnavailability(Base):
     __tablename__ = "room_unavailability"
+    __table_args__ = (
+        Index(
+            "ix_room_unavailability_room_period",
+            "room_id",
+            "start_datetime",
+            "end_datetime",
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     room_id = Column(Integer, ForeignKey("rooms.id"), nullable=False)
@@ -117,6 +153,10 @@ class RoomUnavailability(Base):
 
 class Course(Base):
     __tablename__ = "courses"
+    __table_args__ = (
+        Index("ix_courses_teacher_id", "teacher_id"),
+        Index("ix_courses_group_id", "group_id"),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String(150), nullable=False)
@@ -128,6 +168,41 @@ class Course(Base):
     events = relationship(
         "CourseEvent", back_populates="course", cascade="all, delete-orphan"
     )
+    series = relationship(
+        "CourseSeries", back_populates="course", cascade="all, delete-orphan"
+    )
+
+
+class CourseSeries(Base):
+    """
+    A class held every week in the same room and slot.
+
+    Occurrences are not stored; one that is cancelled or moved becomes a
+    CourseEvent with series_id/series_day.
+    """
+
+    __tablename__ = "course_series"
+    __table_args__ = (
+        Index(
+            "ix_course_series_room_weekday_slot", "room_id", "weekday", "time_slot_id"
+        ),
+        Index("ix_course_series_course_id", "course_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
+    room_id = Column(Integer, ForeignKey("rooms.id"), nullable=False)
+    time_slot_id = Column(Integer, ForeignKey("time_slots.id"), nullable=False)
+    # 0 is Monday, as in date.weekday()
+    weekday = Column(Integer, nullable=False)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+
+    course = relationship("Course", back_populates="series")
+    room = relationship("Room")
+    exceptions = relationship(
+        "CourseEvent", back_populates="series", cascade="all, delete-orphan"
+    )
 
 
 class TimeSlots(Base):
@@ -150,6 +225,21 @@ class TimeSlots(Base):
 
 class CourseEvent(Base):
     __tablename__ = "course_events"
+    __table_args__ = (
+        Index("ix_course_events_room_day_slot", "room_id", "day", "time_slot_id"),
+        Index("ix_course_events_course_id", "course_id"),
+        # A room holds at most one non-cancelled event per day and slot
+        Index(
+            "uq_course_events_room_day_slot",
+            "room_id",
+            "day",
+            "time_slot_id",
+            unique=True,
+            postgresql_where=text("NOT canceled"),
+            sqlite_where=text("NOT canceled"),
+        ),
+        Index("uq_course_events_series_day", "series_id", "series_day", unique=True),
+    )
 
     id = Column(Integer, primary_key=True)
     course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
@@ -157,8 +247,12 @@ class CourseEvent(Base):
     time_slot_id = Column(Integer, ForeignKey("time_slots.id"), nullable=False)
     day = Column(Date, nullable=False)
     canceled = Column(Boolean, default=False)
+    # Set on exceptions: the series and the day of the occurrence replaced
+    series_id = Column(Integer, ForeignKey("course_series.id"), nullable=True)
+    series_day = Column(Date, nullable=True)
 
     course = relationship("Course", back_populates="events")
+    series = relationship("CourseSeries", back_populates="exceptions")
     room = relationship("Room", back_populates="course_events")
     slot_id = relationship("TimeSlots", back_populates="course_events")
     change_requests = relationship(
@@ -166,8 +260,32 @@ class CourseEvent(Base):
     )
 
 
+class RoomWeekUsage(Base):
+    """
+    Weekly totals of the events and series occurrences held in a room.
+
+    Kept in step with every write by utilization.record_usage and rebuilt by
+    utilization.rebuild.
+    """
+
+    __tablename__ = "room_week_usage"
+    __table_args__ = (Index("ix_room_week_usage_week", "week"),)
+
+    room_id = Column(
+        Integer, ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True
+    )
+    # Monday of the week
+    week = Column(Date, primary_key=True)
+    booked_slots = Column(Integer, nullable=False, default=0, server_default="0")
+    canceled_slots = Column(Integer, nullable=False, default=0, server_default="0")
+
+
 class ChangeRequest(Base):
     __tablename__ = "change_requests"
+    __table_args__ = (
+        Index("ix_change_requests_initiator_status", "initiator_id", "status"),
+        Index("ix_change_requests_course_event_id", "course_event_id"),
+    )
 
     id = Column(Integer, primary_key=True)
     course_event_id = Column(Integer, ForeignKey("course_events.id"), nullable=False)
@@ -199,6 +317,11 @@ class ChangeRequest(Base):
 
 class AvailabilityProposal(Base):
     __tablename__ = "availability_proposals"
+    __table_args__ = (
+        Index(
+            "ix_availability_proposals_request_user", "change_request_id", "user_id"
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     change_request_id = Column(
@@ -220,6 +343,17 @@ class AvailabilityProposal(Base):
 
 class ChangeRecomendation(Base):
     __tablename__ = "change_recommendations"
+    # One recommendation per room and interval, re-runs update it in place
+    __table_args__ = (
+        Index(
+            "uq_change_recommendations_request_day_slot_room",
+            "change_request_id",
+            "recommended_day",
+            "recommended_slot_id",
+            "recommended_room_id",
+            unique=True,
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     change_request_id = Column(
@@ -228,6 +362,8 @@ class ChangeRecomendation(Base):
     recommended_slot_id = Column(Integer, ForeignKey("time_slots.id"), nullable=False)
     recommended_day = Column(Date, nullable=False)
     recommended_room_id = Column(Integer, ForeignKey("rooms.id"), nullable=False)
+    # Weighted score of the recommendation, see ranking; higher is better
+    score = Column(Float, nullable=True)
 
     recommended_room = relationship("Room")
     recommended_interval = relationship(
@@ -242,3 +378,50 @@ class ChangeRecomendation(Base):
     source_proposal = relationship(
         "AvailabilityProposal",
     )
+
+
+# Tables whose read endpoints are cached by version, see catalog_cache
+CATALOG_TABLES = ("rooms", "equipment", "groups", "courses")
+
+
+class CatalogVersion(Base):
+    """One row per catalog table, bumped in the transaction of every write to it."""
+
+    __tablename__ = "catalog_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+
+@event.listens_for(CatalogVersion.__table__, "after_create")
+def _seed_catalog_versions(
+    table: Table, connection: Connection, **kwargs: object
+) -> None:
+    # Bumps only update existing rows, so every table starts with one
+    connection.execute(table.insert(), [{"name": name} for name in CATALOG_TABLES])
+
+
+class Job(Base):
+    """Background work queued by request handlers, see jobs."""
+
+    __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_status_created_at", "status", "created_at"),)
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(50), nullable=False)
+    # Keyword arguments of the handler registered for the kind
+    params = Column(JSON, nullable=False)
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+    )
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    # Refreshed by the process running the job; stops when the process dies
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
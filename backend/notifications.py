@@ -0,0 +1,306 @@
+"""
+In-process publish/subscribe of change request and proposal status changes.
+
+Write handlers call ``notify_change_request`` and ``notify_proposal`` before
+committing, like ``touch_groups``; the messages are kept on the session and
+only published once the transaction commits, so clients never hear of a
+change that was rolled back. Every connected client of an affected user
+(initiator, teacher, group leader and the proposal's author) receives them on
+its ``/notifications/stream`` server-sent events stream instead of polling
+``/change_requests/related`` and ``/proposals``. The stream is opened with a
+short-lived token from ``/notifications/token``, since ``EventSource`` cannot
+send the Authorization header.
+
+Subscribers are kept per process, so only clients connected to the process
+that made the change are notified.
+"""
+
+import asyncio
+import json
+import os
+import threading
+from collections import defaultdict
+from collections.abc import AsyncIterator, Iterable, Iterator
+from contextlib import contextmanager
+
+from model import AvailabilityProposal, ChangeRequest, Course, CourseEvent, Group
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+# Messages waiting for a slow client; beyond that it is told to resync
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "100"))
+# Comment lines keep idle connections open through proxies
+SSE_KEEPALIVE = float(os.getenv("SSE_KEEPALIVE", "15"))
+
+
+class Subscription:
+    """Queue of the messages of one connected client, owned by its event loop."""
+
+    def __init__(self, user_id: int, max_size: int) -> None:
+        """
+        Create the queue on the running event loop.
+
+        Args:
+            user_id (int): ID of the subscribed user
+            max_size (int): Number of messages kept for a slow client
+        """
+        self.user_id = user_id
+        self.queue: asyncio.Queue[tuple[str, dict]] = asyncio.Queue(max_size)
+        self.loop = asyncio.get_running_loop()
+        # Set when a message was dropped because the queue was full
+        self.lagged = False
+
+    def put(self, message: tuple[str, dict]) -> None:
+        """
+        Queue a message, marking the subscription as lagged when it is full.
+
+        Must be called on the subscription's event loop.
+
+        Args:
+            message (tuple[str, dict]): Event name and data
+        """
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.lagged = True
+
+
+class Broker:
+    """
+    Fan-out of messages to the subscriptions of users.
+
+    ``publish`` may be called from any thread, e.g. from the thread pool that
+    runs sync handlers; messages are handed over to each subscriber's loop.
+    """
+
+    def __init__(self, max_queue: int) -> None:
+        """
+        Create a broker without subscriptions.
+
+        Args:
+            max_queue (int): Queue size of every subscription
+        """
+        self.max_queue = max_queue
+        self._subscriptions: dict[int, set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+
+    @contextmanager
+    def subscribe(self, user_id: int) -> Iterator[Subscription]:
+        """
+        Receive the messages of a user until the context exits.
+
+        Must be entered on the event loop that reads the subscription.
+
+        Args:
+            user_id (int): ID of the user
+
+        Returns:
+            Iterator[Subscription]: The subscription of the connected client
+        """
+        subscription = Subscription(user_id, self.max_queue)
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                subscriptions = self._subscriptions[user_id]
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[user_id]
+
+    def publish(self, user_ids: Iterable[int], name: str, data: dict) -> int:
+        """
+        Send a message to every subscription of the given users.
+
+        Args:
+            user_ids (Iterable[int]): IDs of the recipients
+            name (str): Event name
+            data (dict): JSON-serializable event data
+
+        Returns:
+            int: Number of subscriptions the message was handed to
+        """
+        with self._lock:
+            subscriptions = [
+                subscription
+                for user_id in set(user_ids)
+                for subscription in self._subscriptions.get(user_id, ())
+            ]
+            self.published += 1
+            self.delivered += len(subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, (name, data))
+            except RuntimeError:
+                # The client's loop is closed, its subscription is going away
+                pass
+        return len(subscriptions)
+
+    def stats(self) -> dict:
+        """
+        Return the number of connected clients and published messages.
+
+        Returns:
+            dict: Subscriber and message counters
+        """
+        with self._lock:
+            return {
+                "users": len(self._subscriptions),
+                "subscriptions": sum(map(len, self._subscriptions.values())),
+                "published": self.published,
+                "delivered": self.delivered,
+            }
+
+
+broker = Broker(max_queue=SSE_QUEUE_SIZE)
+
+
+def format_event(name: str, data: dict) -> str:
+    """
+    Format a message as a server-sent event.
+
+    Args:
+        name (str): Event name
+        data (dict): JSON-serializable event data
+
+    Returns:
+        str: ``event`` and ``data`` lines terminated by a blank line
+    """
+    return f"event: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def stream(
+    subscription: Subscription, keepalive: float = SSE_KEEPALIVE
+) -> AsyncIterator[str]:
+    """
+    Yield the messages of a subscription as server-sent events.
+
+    After messages were dropped for a slow client, a ``resync`` event tells it
+    to reload the lists it shows.
+
+    Args:
+        subscription (Subscription): Subscription of the client
+        keepalive (float, optional): Seconds of silence before a comment line is
+            sent. Defaults to ``SSE_KEEPALIVE``.
+
+    Returns:
+        AsyncIterator[str]: Event stream chunks
+    """
+    yield ": connected\n\n"
+    while True:
+        if subscription.lagged and subscription.queue.empty():
+            subscription.lagged = False
+            yield format_event("resync", {})
+        try:
+            name, data = await asyncio.wait_for(subscription.queue.get(), keepalive)
+        except asyncio.TimeoutError:
+            yield ": keepalive\n\n"
+            continue
+        yield format_event(name, data)
+
+
+def _pending(db: Session) -> list[tuple[set[int], str, dict]]:
+    return db.info.setdefault("notifications", [])
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(db: Session) -> None:
+    for user_ids, name, data in db.info.pop("notifications", ()):
+        broker.publish(user_ids, name, data)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(db: Session) -> None:
+    db.info.pop("notifications", None)
+
+
+def change_request_audience(
+    db: Session, course_event_id: int, initiator_id: int
+) -> set[int]:
+    """
+    Find the users a change request is related to.
+
+    Args:
+        db (Session): Database session
+        course_event_id (int): ID of the event the request moves
+        initiator_id (int): ID of the user who created the request
+
+    Returns:
+        set[int]: IDs of the initiator, the teacher and the group leader
+    """
+    row = db.execute(
+        select(Course.teacher_id, Group.leader_id)
+        .select_from(CourseEvent)
+        .join(Course, CourseEvent.course_id == Course.id)
+        .join(Group, Course.group_id == Group.id)
+        .where(CourseEvent.id == course_event_id)
+    ).one_or_none()
+    return {initiator_id, *(row or ())} - {None}
+
+
+def notify_change_request(
+    db: Session, change_request: ChangeRequest, deleted: bool = False
+) -> None:
+    """
+    Queue a ``change_request`` event for the users related to a request.
+
+    Call it before committing; the event is published after the commit.
+
+    Args:
+        db (Session): Database session
+        change_request (ChangeRequest): Flushed request, in its new state
+        deleted (bool, optional): Send ``change_request_deleted`` instead.
+            Defaults to False.
+    """
+    audience = change_request_audience(
+        db, change_request.course_event_id, change_request.initiator_id
+    )
+    if deleted:
+        _pending(db).append(
+            (audience, "change_request_deleted", {"id": change_request.id})
+        )
+        return
+    status = change_request.status
+    data = {
+        "id": change_request.id,
+        "course_event_id": change_request.course_event_id,
+        "status": getattr(status, "value", status),
+    }
+    _pending(db).append((audience, "change_request", data))
+
+
+def notify_proposal(
+    db: Session, proposal: AvailabilityProposal, deleted: bool = False
+) -> None:
+    """
+    Queue a ``proposal`` event for its author and the users of its request.
+
+    Call it before committing; the event is published after the commit.
+
+    Args:
+        db (Session): Database session
+        proposal (AvailabilityProposal): Flushed proposal, in its new state
+        deleted (bool, optional): Send ``proposal_deleted`` instead. Defaults
+            to False.
+    """
+    change_request = db.get(ChangeRequest, proposal.change_request_id)
+    audience = {proposal.user_id}
+    if change_request is not None:
+        audience |= change_request_audience(
+            db, change_request.course_event_id, change_request.initiator_id
+        )
+    data = {"id": proposal.id, "change_request_id": proposal.change_request_id}
+    if deleted:
+        _pending(db).append((audience, "proposal_deleted", data))
+        return
+    data.update(
+        user_id=proposal.user_id,
+        day=proposal.day.isoformat(),
+        time_slot_id=proposal.time_slot_id,
+        accepted_by_leader=bool(proposal.accepted_by_leader),
+        accepted_by_representative=bool(proposal.accepted_by_representative),
+    )
+    _pending(db).append((audience, "proposal", data))
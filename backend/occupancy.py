@@ -0,0 +1,358 @@
+"""In-memory room occupancy, kept in sync with the write paths."""
+
+import threading
+from bisect import insort
+from collections.abc import Collection
+from datetime import date, datetime
+from typing import NamedTuple
+
+from model import CourseEvent, CourseSeries, RoomUnavailability
+from series import exceptions_query, expand, series_query
+from sqlalchemy import Row
+from sqlalchemy.orm import Session
+
+
+class EventSlot(NamedTuple):
+    """Snapshot of the fields of a course event that occupy a room."""
+
+    room_id: int | None
+    day: date
+    time_slot_id: int
+    canceled: bool | None
+
+    @classmethod
+    def of(cls, event: CourseEvent) -> "EventSlot":
+        """
+        Take a snapshot of an event before it is modified.
+
+        Args:
+            event (CourseEvent): The event to snapshot
+
+        Returns:
+            EventSlot: Immutable copy of the occupancy fields
+        """
+        return cls(event.room_id, event.day, event.time_slot_id, event.canceled)
+
+
+def _as_datetime(value: date | datetime) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.combine(value, datetime.min.time())
+
+
+class OccupancyIndex:
+    """
+    Process-local index of room occupancy.
+
+    Every room has one bitset over days (bit ``n`` set means the room has at least
+    one non-cancelled event ``n`` days after the index epoch) and, for every busy
+    day, a bitmask over ``TimeSlots.id``. Unavailability periods are kept per room
+    as a sorted interval list. The index is loaded once at startup and kept in sync
+    by the write paths of the courses, rooms and room unavailability routers, so
+    availability checks are answered without touching the database. Occurrences
+    of weekly series are expanded into the same structures.
+
+    The index lives in a single process; with several workers each one loads and
+    maintains its own copy and only sees the writes it served itself.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty index; call :meth:`load` to fill it."""
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._epoch: date | None = None
+        self._day_bits: dict[int, int] = {}
+        self._slot_bits: dict[int, dict[date, int]] = {}
+        self._counts: dict[tuple[int, date, int], int] = {}
+        self._unavailability: dict[int, list[tuple[date, date, int]]] = {}
+        self._unavailability_rooms: dict[int, int] = {}
+        self.loaded = False
+
+    def load(self, db: Session) -> None:
+        """
+        Rebuild the index from the database.
+
+        Args:
+            db (Session): Database session
+        """
+        events = (
+            db.query(CourseEvent.room_id, CourseEvent.day, CourseEvent.time_slot_id)
+            .filter(~CourseEvent.canceled, CourseEvent.room_id.isnot(None))
+            .all()
+        )
+        periods = db.query(
+            RoomUnavailability.id,
+            RoomUnavailability.room_id,
+            RoomUnavailability.start_datetime,
+            RoomUnavailability.end_datetime,
+        ).all()
+        series = db.execute(series_query()).all()
+        exceptions = set(db.execute(exceptions_query()).all())
+
+        with self._lock:
+            self._reset()
+            for room_id, day, time_slot_id in events:
+                self._occupy(room_id, day, time_slot_id)
+            for occurrence in expand(series, exceptions):
+                self._occupy(
+                    occurrence.room_id, occurrence.day, occurrence.time_slot_id
+                )
+            for unavailability_id, room_id, start, end in periods:
+                self._block(unavailability_id, room_id, start, end)
+            self.loaded = True
+
+    # Course events
+
+    def add_event(self, event: CourseEvent | EventSlot) -> None:
+        """
+        Mark the room, day and slot of an event as occupied.
+
+        Cancelled events and events without a room are ignored.
+
+        Args:
+            event (CourseEvent | EventSlot): The event or its snapshot
+        """
+        if event.canceled or event.room_id is None:
+            return
+        with self._lock:
+            self._occupy(event.room_id, event.day, event.time_slot_id)
+
+    def remove_event(self, event: CourseEvent | EventSlot) -> None:
+        """
+        Release the room, day and slot previously occupied by an event.
+
+        Args:
+            event (CourseEvent | EventSlot): The event or its snapshot
+        """
+        if event.canceled or event.room_id is None:
+            return
+        with self._lock:
+            self._release(event.room_id, event.day, event.time_slot_id)
+
+    def add_series(
+        self, series: CourseSeries | Row, exceptions: Collection[date] = ()
+    ) -> None:
+        """
+        Mark every occurrence of a weekly series as occupied.
+
+        Args:
+            series (CourseSeries | Row): The series or a snapshot of its fields
+            exceptions (Collection[date], optional): Days replaced by an
+                exception, which are skipped. Defaults to ().
+        """
+        with self._lock:
+            for occurrence in expand(
+                [series], {(series.id, day) for day in exceptions}
+            ):
+                self._occupy(
+                    occurrence.room_id, occurrence.day, occurrence.time_slot_id
+                )
+
+    def _day_offset(self, day: date) -> int:
+        if self._epoch is None:
+            self._epoch = day
+        elif day < self._epoch:
+            shift = (self._epoch - day).days
+            self._day_bits = {
+                room_id: bits << shift for room_id, bits in self._day_bits.items()
+            }
+            self._epoch = day
+        return (day - self._epoch).days
+
+    def _occupy(self, room_id: int, day: date, time_slot_id: int) -> None:
+        key = (room_id, day, time_slot_id)
+        self._counts[key] = self._counts.get(key, 0) + 1
+        if self._counts[key] > 1:
+            return
+        offset = self._day_offset(day)
+        days = self._slot_bits.setdefault(room_id, {})
+        days[day] = days.get(day, 0) | (1 << time_slot_id)
+        self._day_bits[room_id] = self._day_bits.get(room_id, 0) | (1 << offset)
+
+    def _release(self, room_id: int, day: date, time_slot_id: int) -> None:
+        key = (room_id, day, time_slot_id)
+        count = self._counts.get(key, 0)
+        if count > 1:
+            self._counts[key] = count - 1
+            return
+        if count == 0:
+            return
+        del self._counts[key]
+        days = self._slot_bits[room_id]
+        days[day] &= ~(1 << time_slot_id)
+        if not days[day]:
+            del days[day]
+            offset = (day - self._epoch).days
+            self._day_bits[room_id] &= ~(1 << offset)
+
+    # Unavailability
+
+    def add_unavailability(self, unavailability: RoomUnavailability) -> None:
+        """
+        Register a room unavailability period.
+
+        Args:
+            unavailability (RoomUnavailability): The committed unavailability period
+        """
+        with self._lock:
+            self._block(
+                unavailability.id,
+                unavailability.room_id,
+                unavailability.start_datetime,
+                unavailability.end_datetime,
+            )
+
+    def remove_unavailability(self, unavailability_id: int) -> None:
+        """
+        Forget a room unavailability period.
+
+        Args:
+            unavailability_id (int): ID of the removed unavailability period
+        """
+        with self._lock:
+            room_id = self._unavailability_rooms.pop(unavailability_id, None)
+            if room_id is None:
+                return
+            self._unavailability[room_id] = [
+                period
+                for period in self._unavailability[room_id]
+                if period[2] != unavailability_id
+            ]
+
+    def _block(
+        self, unavailability_id: int, room_id: int, start: date, end: date
+    ) -> None:
+        if unavailability_id in self._unavailability_rooms:
+            self.remove_unavailability(unavailability_id)
+        insort(
+            self._unavailability.setdefault(room_id, []),
+            (start, end, unavailability_id),
+        )
+        self._unavailability_rooms[unavailability_id] = room_id
+
+    def remove_room(self, room_id: int) -> None:
+        """
+        Drop everything the index knows about a deleted room.
+
+        Args:
+            room_id (int): ID of the deleted room
+        """
+        with self._lock:
+            self._day_bits.pop(room_id, None)
+            self._slot_bits.pop(room_id, None)
+            self._counts = {
+                key: count for key, count in self._counts.items() if key[0] != room_id
+            }
+            for period in self._unavailability.pop(room_id, []):
+                self._unavailability_rooms.pop(period[2], None)
+
+    # Queries
+
+    def is_busy(self, room_id: int, start: date, end: date) -> bool:
+        """
+        Check whether a room has any event between two days, both inclusive.
+
+        Args:
+            room_id (int): ID of the room
+            start (date): First day of the interval
+            end (date): Last day of the interval
+
+        Returns:
+            bool: True if at least one non-cancelled event falls in the interval
+        """
+        with self._lock:
+            bits = self._day_bits.get(room_id, 0)
+            if not bits:
+                return False
+            first = max((start - self._epoch).days, 0)
+            last = (end - self._epoch).days
+            if last < first:
+                return False
+            window = (1 << (last - first + 1)) - 1
+            return bool((bits >> first) & window)
+
+    def is_slot_busy(self, room_id: int, day: date, time_slot_id: int) -> bool:
+        """
+        Check whether a room is taken in a given slot on a given day.
+
+        Args:
+            room_id (int): ID of the room
+            day (date): Day of the slot
+            time_slot_id (int): ID of the time slot
+
+        Returns:
+            bool: True if a non-cancelled event occupies the slot
+        """
+        with self._lock:
+            mask = self._slot_bits.get(room_id, {}).get(day, 0)
+            return bool(mask & (1 << time_slot_id))
+
+    def is_unavailable(
+        self, room_id: int, start: date | datetime, end: date | datetime
+    ) -> bool:
+        """
+        Check whether an unavailability period overlaps the given interval.
+
+        Periods that merely touch the interval boundaries do not count.
+
+        Args:
+            room_id (int): ID of the room
+            start (date | datetime): Start of the interval
+            end (date | datetime): End of the interval
+
+        Returns:
+            bool: True if the room is blocked for part of the interval
+        """
+        start, end = _as_datetime(start), _as_datetime(end)
+        with self._lock:
+            for period_start, period_end, _ in self._unavailability.get(room_id, []):
+                if _as_datetime(period_start) >= end:
+                    break
+                if _as_datetime(period_end) > start:
+                    return True
+            return False
+
+    def is_unavailable_on(self, room_id: int, day: date) -> bool:
+        """
+        Check whether an unavailability period covers a day.
+
+        Both bounds of a period count as blocked, as in ``create_event``, so a
+        one-day period and a period starting or ending on the day block it.
+
+        Args:
+            room_id (int): ID of the room
+            day (date): Day of the event
+
+        Returns:
+            bool: True if the room cannot be booked on the day
+        """
+        moment = _as_datetime(day)
+        with self._lock:
+            for period_start, period_end, _ in self._unavailability.get(room_id, []):
+                if _as_datetime(period_start) > moment:
+                    break
+                if _as_datetime(period_end) >= moment:
+                    return True
+            return False
+
+    def is_available(self, room_id: int, start: date, end: date) -> bool:
+        """
+        Check whether a room is free of events and unavailability in an interval.
+
+        Args:
+            room_id (int): ID of the room
+            start (date): First day of the interval
+            end (date): Last day of the interval
+
+        Returns:
+            bool: True if the room can be booked for the whole interval
+        """
+        return not (
+            self.is_busy(room_id, start, end)
+            or self.is_unavailable(room_id, start, end)
+        )
+
+
+occupancy_index = OccupancyIndex()
@@ -0,0 +1,128 @@
+"""
+Keyset pagination for list endpoints.
+
+Besides the offset, a page can be selected by the sort key of the last row of
+the previous page, passed as an opaque cursor, which stays fast however deep
+the page is. The cursor of the next page is returned in the ``X-Next-Cursor``
+header.
+"""
+
+import base64
+import json
+from collections.abc import Sequence
+
+from fastapi import HTTPException, Response
+from sqlalchemy import ColumnElement, Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+from starlette.status import HTTP_400_BAD_REQUEST
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence) -> str:
+    """
+    Encode the sort key of the last row of a page as an opaque cursor.
+
+    Args:
+        values (Sequence): Values of the ordering columns, ID last
+
+    Returns:
+        str: URL-safe cursor
+    """
+    payload = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def _matches(value: object, column: ColumnElement) -> bool:
+    python_type = column.type.python_type
+    # true decodes to True, which Python also counts as an int
+    if isinstance(value, bool):
+        return python_type is bool
+    if python_type is float:
+        return isinstance(value, int | float)
+    return isinstance(value, python_type)
+
+
+def decode_cursor(cursor: str, order_by: Sequence[ColumnElement]) -> list:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Args:
+        cursor (str): Cursor received from the client
+        order_by (Sequence[ColumnElement]): Ordering columns the cursor was made
+            for; each value must have the Python type of its column
+
+    Raises:
+        HTTPException: If the cursor is malformed or was made for another ordering
+
+    Returns:
+        list: Values of the ordering columns
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if (
+        not isinstance(values, list)
+        or len(values) != len(order_by)
+        or not all(map(_matches, values, order_by))
+    ):
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+
+def paginate(
+    query: Select,
+    order_by: Sequence[InstrumentedAttribute],
+    cursor: str | None,
+    skip: int,
+    limit: int,
+) -> Select:
+    """
+    Apply keyset pagination when a cursor is given, offset pagination otherwise.
+
+    Args:
+        query (Select): Query to paginate
+        order_by (Sequence[InstrumentedAttribute]): Non-nullable ordering columns,
+            the last one unique (normally the primary key)
+        cursor (str | None): Cursor of the previous page
+        skip (int): Number of records to skip, ignored when a cursor is given
+        limit (int): Maximum number of records to return
+
+    Raises:
+        HTTPException: If the cursor is invalid
+
+    Returns:
+        Select: The paginated query
+    """
+    query = query.order_by(*order_by)
+    if cursor is None:
+        return query.offset(skip).limit(limit)
+    values = decode_cursor(cursor, order_by)
+    return query.where(tuple_(*order_by) > tuple_(*values)).limit(limit)
+
+
+def set_next_cursor(
+    response: Response,
+    items: Sequence,
+    order_by: Sequence[InstrumentedAttribute],
+    limit: int,
+) -> None:
+    """
+    Expose the cursor of the next page in the ``X-Next-Cursor`` header.
+
+    The header is omitted once a page comes back shorter than ``limit``.
+
+    Args:
+        response (Response): Outgoing response
+        items (Sequence): Rows of the current page
+        order_by (Sequence[InstrumentedAttribute]): Ordering columns passed to
+            ``paginate``
+        limit (int): Page size
+    """
+    if items and len(items) >= limit:
+        last = items[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            [getattr(last, column.key) for column in order_by]
+        )
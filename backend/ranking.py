@@ -0,0 +1,137 @@
+"""
+Scoring and top-k selection of room change recommendations.
+
+Every candidate is one (common interval, free room) pair. The candidates of a
+change request are scored together as NumPy arrays on three criteria, each
+between 0 and 1:
+
+* capacity fit: the needed seats over the seats of the room, so the smallest
+  room that is large enough scores 1;
+* early end: 1 when the slot ends no later than ``LATEST_END``;
+* adjacency: 1 when the group has a class in the slot right before or after
+  on that day.
+
+The weighted sum ranks the candidates and only the best ``k`` are kept.
+"""
+
+import heapq
+import os
+from datetime import date, time
+from typing import NamedTuple
+
+import numpy as np
+
+LATEST_END = time(18)
+
+
+class Weights(NamedTuple):
+    """Weight of every criterion in the score."""
+
+    capacity_fit: float = 1.0
+    early_end: float = 0.5
+    adjacency: float = 1.0
+
+
+DEFAULT_WEIGHTS = Weights(
+    capacity_fit=float(os.getenv("RECOMMENDATION_WEIGHT_CAPACITY_FIT", "1.0")),
+    early_end=float(os.getenv("RECOMMENDATION_WEIGHT_EARLY_END", "0.5")),
+    adjacency=float(os.getenv("RECOMMENDATION_WEIGHT_ADJACENCY", "1.0")),
+)
+DEFAULT_TOP_K = int(os.getenv("RECOMMENDATION_TOP_K", "10"))
+
+
+def capacity_fit(capacities: np.ndarray, minimum_capacity: int) -> np.ndarray:
+    """
+    Score how closely every room matches the needed number of seats.
+
+    Args:
+        capacities (np.ndarray): Float capacity of every candidate's room, NaN
+            when unknown
+        minimum_capacity (int): Seats required by the change request; when 0,
+            the smallest candidate room counts as the need
+
+    Returns:
+        np.ndarray: Needed seats over room seats, 0 for rooms of unknown size
+    """
+    known = capacities[np.isfinite(capacities) & (capacities > 0)]
+    need = minimum_capacity or (known.min() if len(known) else 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fit = np.where(capacities > 0, need / capacities, 0.0)
+    return np.clip(np.nan_to_num(fit), 0.0, 1.0)
+
+
+def adjacency(
+    days: list[date],
+    slot_ranks: np.ndarray,
+    busy: list[tuple[date, int]],
+) -> np.ndarray:
+    """
+    Mark candidates next to a class of the group on the same day.
+
+    Args:
+        days (list[date]): Day of every candidate
+        slot_ranks (np.ndarray): Position of every candidate's slot in the day,
+            slots ordered by start time
+        busy (list[tuple[date, int]]): (day, slot position) of the group's classes
+
+    Returns:
+        np.ndarray: True for candidates directly before or after a class
+    """
+    if not busy:
+        return np.zeros(len(days), dtype=bool)
+    # One integer per (day, slot position); neighbours differ by exactly one.
+    # The stride leaves a gap after the last slot of either side, so the last
+    # class of a day is never next to the first candidate of the following day
+    last_rank = max(int(slot_ranks.max(initial=0)), max(rank for _, rank in busy))
+    stride = last_rank + 2
+    keys = np.array([day.toordinal() for day in days], dtype=np.int64) * stride
+    keys += slot_ranks
+    busy_keys = np.array(
+        [day.toordinal() * stride + rank for day, rank in busy], dtype=np.int64
+    )
+    return np.isin(keys - 1, busy_keys) | np.isin(keys + 1, busy_keys)
+
+
+def score(
+    capacities: np.ndarray,
+    minimum_capacity: int,
+    ends: list[time],
+    adjacent: np.ndarray,
+    weights: Weights = DEFAULT_WEIGHTS,
+) -> np.ndarray:
+    """
+    Compute the weighted score of every candidate.
+
+    Args:
+        capacities (np.ndarray): Float capacity of every candidate's room, NaN
+            when unknown
+        minimum_capacity (int): Seats required by the change request
+        ends (list[time]): End time of every candidate's slot
+        adjacent (np.ndarray): Output of ``adjacency``
+        weights (Weights, optional): Criterion weights. Defaults to
+            ``DEFAULT_WEIGHTS``.
+
+    Returns:
+        np.ndarray: Score of every candidate, higher is better
+    """
+    early = np.array([end <= LATEST_END for end in ends], dtype=bool)
+    return (
+        weights.capacity_fit * capacity_fit(capacities, minimum_capacity)
+        + weights.early_end * early
+        + weights.adjacency * adjacent
+    )
+
+
+def top_k(scores: np.ndarray, k: int) -> list[int]:
+    """
+    Pick the best candidates.
+
+    Args:
+        scores (np.ndarray): Score of every candidate
+        k (int): Number of candidates to keep
+
+    Returns:
+        list[int]: Indices of the ``k`` best candidates, best first; ties keep
+            the candidate order
+    """
+    return heapq.nlargest(k, range(len(scores)), key=scores.__getitem__)
@@ -0,0 +1,113 @@
+"""Monitoring endpoints for administrators: pools, caches, streams and jobs."""
+
+from catalog_cache import catalog_cache
+from database import async_engine, engine, pool_status
+from fastapi import APIRouter, Depends
+from jobs import job_runner
+from model import User, UserRole
+from notifications import broker
+from routers.auth import password_executor, principal_cache, role_required
+from starlette.status import HTTP_200_OK
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/pool", status_code=HTTP_200_OK)
+async def get_pool_statistics(
+    current_user: User = Depends(role_required([UserRole.ADMIN])),
+) -> dict:
+    """
+    Report the state of the database connection pools.
+
+    Args:
+        current_user (User): Current authenticated user (must be ADMIN)
+
+    Returns:
+        dict: Connection counts and checkout wait-time histograms of the sync and
+            async engines
+    """
+    return {
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine.sync_engine),
+    }
+
+
+@router.get("/auth-cache", status_code=HTTP_200_OK)
+async def get_auth_cache_statistics(
+    current_user: User = Depends(role_required([UserRole.ADMIN])),
+) -> dict:
+    """
+    Report the hit and miss counters of the authenticated user cache.
+
+    Args:
+        current_user (User): Current authenticated user (must be ADMIN)
+
+    Returns:
+        dict: Size, capacity and hit/miss counters of the cache
+    """
+    return principal_cache.stats()
+
+
+@router.get("/catalog-cache", status_code=HTTP_200_OK)
+async def get_catalog_cache_statistics(
+    current_user: User = Depends(role_required([UserRole.ADMIN])),
+) -> dict:
+    """
+    Report how catalog reads were answered: 304, cached body or database.
+
+    Args:
+        current_user (User): Current authenticated user (must be ADMIN)
+
+    Returns:
+        dict: Request and 304 counters and the hit/miss counters of the body cache
+    """
+    return catalog_cache.stats()
+
+
+@router.get("/notifications", status_code=HTTP_200_OK)
+async def get_notification_statistics(
+    current_user: User = Depends(role_required([UserRole.ADMIN])),
+) -> dict:
+    """
+    Report the connected notification streams and published messages.
+
+    Args:
+        current_user (User): Current authenticated user (must be ADMIN)
+
+    Returns:
+        dict: Connected users and streams, published and delivered messages
+    """
+    return broker.stats()
+
+
+@router.get("/password-hashing", status_code=HTTP_200_OK)
+async def get_password_hashing_statistics(
+    current_user: User = Depends(role_required([UserRole.ADMIN])),
+) -> dict:
+    """
+    Report the load of the password hashing worker pool.
+
+    Args:
+        current_user (User): Current authenticated user (must be ADMIN)
+
+    Returns:
+        dict: Worker and queue limits, queue depth and wait/run time histograms
+    """
+    return password_executor.stats()
+
+
+@router.get("/jobs", status_code=HTTP_200_OK)
+async def get_job_statistics(
+    current_user: User = Depends(role_required([UserRole.ADMIN])),
+) -> dict:
+    """
+    Report the load of the background job runner.
+
+    Args:
+        current_user (User): Current authenticated user (must be ADMIN)
+
+    Returns:
+        dict: Worker limit, queue depth, outcome counters and wait/run time
+            histograms
+    """
+    return job_runner.stats()
@@ -1,24 +1,32 @@
+import os
 from datetime import datetime, timedelta
 
-from database import get_db
+from cache import TTLCache
+from database import get_async_db
+from executor import BoundedExecutor, ExecutorFullError
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from model import Group, User, UserRole
 from passlib.context import CryptContext
 from routers.schemas import Token, TokenData, UserCreate, UserResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.status import (
     HTTP_201_CREATED,
     HTTP_401_UNAUTHORIZED,
     HTTP_403_FORBIDDEN,
     HTTP_409_CONFLICT,
     HTTP_422_UNPROCESSABLE_ENTITY,
+    HTTP_503_SERVICE_UNAVAILABLE,
 )
 
 SECRET_KEY = "secret-key"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# EventSource cannot send headers, so streams take a short-lived token in the
+# URL; it is only accepted by the endpoints of its scope
+STREAM_TOKEN_EXPIRE_SECONDS = int(os.getenv("STREAM_TOKEN_EXPIRE_SECONDS", "60"))
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -26,6 +34,20 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt takes ~100-300 ms per call, so async handlers hash and verify passwords
+# on a small thread pool instead of blocking the event loop
+password_executor = BoundedExecutor(
+    workers=int(os.getenv("PASSWORD_HASH_WORKERS", "4")),
+    max_queue=int(os.getenv("PASSWORD_HASH_QUEUE", "64")),
+    name="password-hash",
+)
+
+# Authenticated users by token subject (email), invalidated by the users router
+principal_cache: TTLCache[User] = TTLCache(
+    max_size=int(os.getenv("AUTH_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("AUTH_CACHE_TTL", "60")),
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -54,6 +76,55 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against a hash on the password worker pool.
+
+    Args:
+        plain_password (str): The plain text password to verify
+        hashed_password (str): The hashed password to verify against
+
+    Raises:
+        HTTPException: If too many password operations are already queued
+
+    Returns:
+        bool: True if password matches hash, False otherwise
+    """
+    try:
+        return await password_executor.run(
+            verify_password, plain_password, hashed_password
+        )
+    except ExecutorFullError:
+        raise _password_pool_busy()
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Generate a password hash on the password worker pool.
+
+    Args:
+        password (str): The plain text password to hash
+
+    Raises:
+        HTTPException: If too many password operations are already queued
+
+    Returns:
+        str: The hashed password
+    """
+    try:
+        return await password_executor.run(get_password_hash, password)
+    except ExecutorFullError:
+        raise _password_pool_busy()
+
+
+def _password_pool_busy() -> HTTPException:
+    return HTTPException(
+        status_code=HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent logins, try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """
     Create a JWT access token.
@@ -75,18 +146,38 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     return encoded_jwt
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-) -> User:
+def create_stream_token(email: str, scope: str) -> str:
     """
-    Get the current authenticated user from the JWT token.
+    Create a short-lived JWT for a stream that cannot send headers.
 
     Args:
-        token (str): JWT token from Authorization header
-        db (Session): Database session
+        email (str): Email of the user the token authenticates
+        scope (str): Name of the stream the token is accepted by
+
+    Returns:
+        str: Encoded JWT token
+    """
+    return create_access_token(
+        data={"sub": email, "scope": scope},
+        expires_delta=timedelta(seconds=STREAM_TOKEN_EXPIRE_SECONDS),
+    )
+
+
+async def authenticate(token: str, db: AsyncSession, scope: str | None = None) -> User:
+    """
+    Get the user a JWT token was issued to.
+
+    The user is looked up in ``principal_cache`` first and only loaded from the
+    database on a miss.
+
+    Args:
+        token (str): Encoded JWT token
+        db (AsyncSession): Database session
+        scope (str | None, optional): Scope the token must have; access tokens
+            have none. Defaults to None.
 
     Raises:
-        HTTPException: If token is invalid or user not found
+        HTTPException: If token is invalid, has another scope or user not found
 
     Returns:
         User: The authenticated user
@@ -99,17 +190,40 @@ async def get_current_user(
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
-        if email is None:
+        if email is None or payload.get("scope") != scope:
             raise credentials_exception
         token_data = TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    user = db.query(User).filter(User.email == token_data.email).first()
+    user = principal_cache.get(token_data.email)
+    if user is not None:
+        return user
+    user = await db.scalar(select(User).where(User.email == token_data.email))
     if user is None:
         raise credentials_exception
+    principal_cache.set(token_data.email, user)
     return user
 
 
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """
+    Get the current authenticated user from the JWT token.
+
+    Args:
+        token (str): JWT token from Authorization header
+        db (AsyncSession): Database session
+
+    Raises:
+        HTTPException: If token is invalid or user not found
+
+    Returns:
+        User: The authenticated user
+    """
+    return await authenticate(token, db)
+
+
 def role_required(allowed_roles: list[UserRole]) -> callable:
     """
     Dependency to check if user has required role(s).
@@ -120,7 +234,7 @@ def role_required(allowed_roles: list[UserRole]) -> callable:
     Returns:
         callable: Dependency function that checks user's role
     """
-    def role_checker(current_user: User = Depends(get_current_user)) -> User:
+    async def role_checker(current_user: User = Depends(get_current_user)) -> User:
         if current_user.role not in allowed_roles:
             raise HTTPException(
                 status_code=HTTP_403_FORBIDDEN,
@@ -133,14 +247,15 @@ def role_required(allowed_roles: list[UserRole]) -> callable:
 
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db),
 ) -> dict:
     """
     OAuth2 compatible token login, get an access token for future requests.
 
     Args:
         form_data (OAuth2PasswordRequestForm): Form data with username and password
-        db (Session): Database session
+        db (AsyncSession): Database session
 
     Raises:
         HTTPException: If authentication fails
@@ -148,8 +263,8 @@ async def login_for_access_token(
     Returns:
         dict: Access token and token type
     """
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password):
+    user = await db.scalar(select(User).where(User.email == form_data.username))
+    if not user or not await verify_password_async(form_data.password, user.password):
         raise HTTPException(
             status_code=HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -163,13 +278,15 @@ async def login_for_access_token(
 
 
 @router.post("/register", status_code=HTTP_201_CREATED)
-async def register_user(user: UserCreate, db: Session = Depends(get_db)) -> dict:
+async def register_user(
+    user: UserCreate, db: AsyncSession = Depends(get_async_db)
+) -> dict:
     """
     Register a new user.
 
     Args:
         user (UserCreate): User registration data
-        db (Session): Database session
+        db (AsyncSession): Database session
 
     Raises:
         HTTPException: If email already exists or group is invalid
@@ -177,16 +294,16 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)) -> dict
     Returns:
         dict: Success message
     """
-    db_user = db.query(User).filter(User.email == user.email).first()
+    db_user = await db.scalar(select(User).where(User.email == user.email))
     if db_user:
         raise HTTPException(
             status_code=HTTP_409_CONFLICT, detail="Email already registered"
         )
 
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
 
     if user.role != UserRole.ADMIN:
-        db_group = db.query(Group).filter(Group.id == user.group_id).first()
+        db_group = await db.scalar(select(Group).where(Group.id == user.group_id))
         if not db_group:
             raise HTTPException(
                 status_code=HTTP_422_UNPROCESSABLE_ENTITY,
@@ -203,8 +320,8 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)) -> dict
     )
 
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
 
     return {"message": "User created successfully"}
 
@@ -0,0 +1,215 @@
+"""Public iCalendar feeds of group and teacher timetables."""
+
+from collections import defaultdict
+from collections.abc import AsyncIterable, Sequence
+from datetime import datetime, timezone
+
+from calendar_feed import feed_validators, http_date, is_not_modified, stream_calendar
+from database import AsyncSessionLocal, get_async_db
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from model import Course, CourseEvent, CourseSeries, Group, Room, TimeSlots, User
+from series import occurrence_days
+from sqlalchemy import ColumnElement, Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.status import HTTP_304_NOT_MODIFIED, HTTP_404_NOT_FOUND
+
+FEED_BATCH_SIZE = 500
+
+router = APIRouter(prefix="/calendar", tags=["calendar"])
+
+
+def _events_query() -> Select:
+    return (
+        select(
+            CourseEvent.id,
+            CourseEvent.day,
+            TimeSlots.start_time,
+            TimeSlots.end_time,
+            Course.name,
+            Room.name,
+            CourseEvent.canceled,
+        )
+        .join(Course, CourseEvent.course_id == Course.id)
+        .join(TimeSlots, CourseEvent.time_slot_id == TimeSlots.id)
+        .outerjoin(Room, CourseEvent.room_id == Room.id)
+        .order_by(CourseEvent.day, TimeSlots.start_time, CourseEvent.id)
+    )
+
+
+async def _event_rows(query: Select) -> AsyncIterable[Sequence]:
+    # The request's session is closed before the body is streamed, so the
+    # generator opens its own and reads the events in batches
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=FEED_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield rows
+
+
+async def _series_rows(db: AsyncSession, courses: ColumnElement) -> list[tuple]:
+    # Series are few, so they are read up front with the request's session
+    series = (
+        await db.execute(
+            select(
+                CourseSeries.id,
+                CourseSeries.weekday,
+                CourseSeries.start_date,
+                CourseSeries.end_date,
+                TimeSlots.start_time,
+                TimeSlots.end_time,
+                Course.name,
+                Room.name,
+            )
+            .join(Course, CourseSeries.course_id == Course.id)
+            .join(TimeSlots, CourseSeries.time_slot_id == TimeSlots.id)
+            .outerjoin(Room, CourseSeries.room_id == Room.id)
+            .where(courses)
+            .order_by(CourseSeries.id)
+        )
+    ).all()
+    if not series:
+        return []
+    exceptions = defaultdict(list)
+    for series_id, day in await db.execute(
+        select(CourseEvent.series_id, CourseEvent.series_day)
+        .join(CourseSeries, CourseEvent.series_id == CourseSeries.id)
+        .join(Course, CourseSeries.course_id == Course.id)
+        .where(courses)
+        .order_by(CourseEvent.series_day)
+    ):
+        exceptions[series_id].append(day)
+
+    rows = []
+    for series_id, weekday, first, last, start, end, summary, location in series:
+        days = occurrence_days(weekday, first, last)
+        if not days:
+            continue
+        skipped = exceptions[series_id]
+        rows.append(
+            (series_id, days[0], days[-1], start, end, summary, location, skipped)
+        )
+    return rows
+
+
+async def _feed_response(
+    db: AsyncSession,
+    name: str,
+    title: str,
+    versions: Sequence[tuple[int, int, datetime]],
+    courses: ColumnElement,
+    if_none_match: str | None,
+    if_modified_since: str | None,
+) -> Response:
+    etag, last_modified = feed_validators(name, title, versions)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if is_not_modified(if_none_match, if_modified_since, etag, last_modified):
+        return Response(status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+
+    stamp = last_modified or datetime.now(timezone.utc)
+    series = await _series_rows(db, courses)
+    return StreamingResponse(
+        stream_calendar(
+            title, _event_rows(_events_query().where(courses)), stamp, series
+        ),
+        media_type="text/calendar; charset=utf-8",
+        headers={**headers, "Content-Disposition": f'inline; filename="{name}.ics"'},
+    )
+
+
+@router.get("/group/{group_id}.ics", response_class=StreamingResponse)
+async def get_group_calendar(
+    group_id: int,
+    if_none_match: str | None = Header(default=None),
+    if_modified_since: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    """
+    Serve the iCalendar feed with all events of a group.
+
+    The feed is public so calendar clients can subscribe to it without a token.
+    Conditional requests are answered from the group's schedule version alone.
+
+    Args:
+        group_id (int): ID of the group
+        if_none_match (str | None): ETag of the copy held by the client
+        if_modified_since (str | None): Last-Modified of the copy held by the client
+        db (AsyncSession): Database session
+
+    Raises:
+        HTTPException: If the group is not found
+
+    Returns:
+        Response: Streamed calendar, or 304 if the client's copy is current
+    """
+    group = (
+        await db.execute(
+            select(
+                Group.id, Group.schedule_version, Group.schedule_updated_at, Group.name
+            ).where(Group.id == group_id)
+        )
+    ).first()
+    if group is None:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Group not found")
+
+    return await _feed_response(
+        db,
+        f"group-{group_id}",
+        group.name,
+        [tuple(group[:3])],
+        Course.group_id == group_id,
+        if_none_match,
+        if_modified_since,
+    )
+
+
+@router.get("/teacher/{user_id}.ics", response_class=StreamingResponse)
+async def get_teacher_calendar(
+    user_id: int,
+    if_none_match: str | None = Header(default=None),
+    if_modified_since: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    """
+    Serve the iCalendar feed with all events taught by a user.
+
+    The feed is public so calendar clients can subscribe to it without a token.
+    Its version combines the schedule versions of the groups the user teaches.
+
+    Args:
+        user_id (int): ID of the teacher
+        if_none_match (str | None): ETag of the copy held by the client
+        if_modified_since (str | None): Last-Modified of the copy held by the client
+        db (AsyncSession): Database session
+
+    Raises:
+        HTTPException: If the user is not found
+
+    Returns:
+        Response: Streamed calendar, or 304 if the client's copy is current
+    """
+    teacher = (
+        await db.execute(select(User.name, User.surname).where(User.id == user_id))
+    ).first()
+    if teacher is None:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="User not found")
+
+    versions = (
+        await db.execute(
+            select(Group.id, Group.schedule_version, Group.schedule_updated_at).where(
+                Group.id.in_(
+                    select(Course.group_id).where(Course.teacher_id == user_id)
+                )
+            )
+        )
+    ).all()
+    return await _feed_response(
+        db,
+        f"teacher-{user_id}",
+        f"{teacher.name} {teacher.surname}",
+        [tuple(version) for version in versions],
+        Course.teacher_id == user_id,
+        if_none_match,
+        if_modified_since,
+    )
@@ -1,147 +1,440 @@
-from database import get_db
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from datetime import date
+
+import numpy as np
+import ranking
+from database import get_async_db, get_db, upsert_insert
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from jobs import JobError, job_runner
 from model import (
     AvailabilityProposal,
     ChangeRecomendation,
     ChangeRequest,
+    Course,
     CourseEvent,
+    CourseSeries,
     Room,
     RoomUnavailability,
+    TimeSlots,
     User,
-    Equipment
+    Equipment,
+    room_equipment_association,
 )
 from routers.auth import get_current_user
 from routers.schemas import ChangeRecomendationResponse
-from sqlalchemy import func
-from sqlalchemy.orm import Session
-from starlette.status import HTTP_204_NO_CONTENT
+from series import exceptions_query, expand, series_query
+from sqlalchemy import (
+    Date,
+    Select,
+    delete,
+    exists,
+    func,
+    literal,
+    or_,
+    select,
+    true,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from starlette.status import HTTP_202_ACCEPTED, HTTP_204_NO_CONTENT
 
 router = APIRouter(prefix="/change_recommendation", tags=["change_recommendation"])
 
 
-@router.post("/common-availability")
-async def find_and_add_common_availability(
+def available_rooms_query(
+    common_intervals: list[tuple[int, date]],
+    required_equipment: list[str] | None = None,
+    minimum_capacity: int = 0,
+) -> Select:
+    """
+    Build the query finding free rooms for every common interval at once.
+
+    Args:
+        common_intervals (list[tuple[int, date]]): (time slot ID, day) pairs
+        required_equipment (list[str] | None, optional): Names of equipment every
+            room must have. Defaults to None.
+        minimum_capacity (int, optional): Minimum room capacity. Defaults to 0.
+
+    Returns:
+        Select: Query returning (interval position, room ID) rows, ordered by
+            interval position and room ID
+    """
+    # Every common interval becomes one row of a derived table so that free rooms
+    # for all of them are found in a single round trip.
+    intervals = union_all(
+        *(
+            select(
+                literal(position).label("position"),
+                literal(slot_id).label("slot_id"),
+                literal(day, Date).label("day"),
+                literal(day.weekday()).label("weekday"),
+            )
+            for position, (slot_id, day) in enumerate(common_intervals)
+        )
+    ).subquery("intervals")
+    series_exceptions = CourseEvent.__table__.alias("series_exceptions")
+
+    query = (
+        select(intervals.c.position, Room.id)
+        .select_from(intervals)
+        .join(Room, true())
+        .where(
+            ~exists().where(
+                RoomUnavailability.room_id == Room.id,
+                RoomUnavailability.start_datetime <= intervals.c.day,
+                RoomUnavailability.end_datetime >= intervals.c.day,
+            ),
+            ~exists().where(
+                CourseEvent.room_id == Room.id,
+                CourseEvent.day == intervals.c.day,
+                CourseEvent.time_slot_id == intervals.c.slot_id,
+                ~CourseEvent.canceled,
+            ),
+            # Weekly series occurrences, unless replaced by an exception
+            ~exists().where(
+                CourseSeries.room_id == Room.id,
+                CourseSeries.weekday == intervals.c.weekday,
+                CourseSeries.time_slot_id == intervals.c.slot_id,
+                CourseSeries.start_date <= intervals.c.day,
+                CourseSeries.end_date >= intervals.c.day,
+                ~exists().where(
+                    series_exceptions.c.series_id == CourseSeries.id,
+                    series_exceptions.c.series_day == intervals.c.day,
+                ),
+            ),
+        )
+    )
+
+    if isinstance(required_equipment, list) and required_equipment:
+        equipped_rooms = (
+            select(room_equipment_association.c.room_id)
+            .join(Equipment)
+            .where(Equipment.name.in_(required_equipment))
+            .group_by(room_equipment_association.c.room_id)
+            .having(func.count(Equipment.id) >= len(required_equipment))
+        )
+        query = query.where(Room.id.in_(equipped_rooms))
+
+    if minimum_capacity > 0:
+        query = query.where(Room.capacity >= minimum_capacity)
+
+    return query.order_by(intervals.c.position, Room.id)
+
+
+def _proposals_query(change_request_id: int, user_id: int) -> Select:
+    # (ID, time slot ID, day) of a user's proposals, oldest first
+    return (
+        select(
+            AvailabilityProposal.id,
+            AvailabilityProposal.time_slot_id,
+            AvailabilityProposal.day,
+        )
+        .where(
+            AvailabilityProposal.user_id == user_id,
+            AvailabilityProposal.change_request_id == change_request_id,
+        )
+        .order_by(AvailabilityProposal.id)
+    )
+
+
+def _group_classes(
+    db: Session, change_request: ChangeRequest, days: set[date]
+) -> list[tuple[date, int]]:
+    # (day, slot ID) of the classes the group keeps on the given days: events
+    # other than the one being moved and occurrences of weekly series
+    group_id = db.scalar(
+        select(Course.group_id)
+        .join(CourseEvent, CourseEvent.course_id == Course.id)
+        .where(CourseEvent.id == change_request.course_event_id)
+    )
+    courses = select(Course.id).where(Course.group_id == group_id)
+    classes = db.execute(
+        select(CourseEvent.day, CourseEvent.time_slot_id).where(
+            CourseEvent.course_id.in_(courses),
+            CourseEvent.day.in_(days),
+            ~CourseEvent.canceled,
+            CourseEvent.id != change_request.course_event_id,
+        )
+    ).all()
+    first, last = min(days), max(days)
+    series = db.execute(
+        series_query(first, last).where(CourseSeries.course_id.in_(courses))
+    ).all()
+    if series:
+        exceptions = set(db.execute(exceptions_query(first, last)).all())
+        classes.extend(
+            (occurrence.day, occurrence.time_slot_id)
+            for occurrence in expand(series, exceptions, first, last)
+            if occurrence.day in days
+        )
+    return classes
+
+
+def rank_candidates(
+    db: Session,
+    change_request: ChangeRequest,
+    common_intervals: list[tuple[int, date]],
+    candidates: list[tuple[int, int]],
+    k: int,
+    weights: ranking.Weights = ranking.DEFAULT_WEIGHTS,
+) -> list[tuple[int, int, float]]:
+    """
+    Score every free room in every common interval and keep the best.
+
+    Args:
+        db (Session): Database session
+        change_request (ChangeRequest): The change request being answered
+        common_intervals (list[tuple[int, date]]): (time slot ID, day) pairs
+        candidates (list[tuple[int, int]]): (interval position, room ID) rows of
+            ``available_rooms_query``
+        k (int): Number of candidates to keep
+        weights (ranking.Weights, optional): Criterion weights. Defaults to
+            ``ranking.DEFAULT_WEIGHTS``.
+
+    Returns:
+        list[tuple[int, int, float]]: (interval position, room ID, score) of the
+            ``k`` best candidates, best first
+    """
+    positions = [position for position, _ in candidates]
+    room_ids = [room_id for _, room_id in candidates]
+    slot_ids = [common_intervals[position][0] for position in positions]
+    days = [common_intervals[position][1] for position in positions]
+
+    capacity = dict(
+        db.execute(select(Room.id, Room.capacity).where(Room.id.in_(set(room_ids))))
+        .all()
+    )
+    slots = db.execute(
+        select(TimeSlots.id, TimeSlots.end_time).order_by(
+            TimeSlots.start_time, TimeSlots.id
+        )
+    ).all()
+    slot_rank = {slot_id: rank for rank, (slot_id, _) in enumerate(slots)}
+    slot_end = dict(slots)
+    busy = [
+        (day, slot_rank[slot_id])
+        for day, slot_id in _group_classes(db, change_request, set(days))
+    ]
+
+    scores = ranking.score(
+        np.array([capacity[room_id] for room_id in room_ids], dtype=float),
+        change_request.minimum_capacity or 0,
+        [slot_end[slot_id] for slot_id in slot_ids],
+        ranking.adjacency(
+            days, np.array([slot_rank[slot_id] for slot_id in slot_ids]), busy
+        ),
+        weights,
+    )
+    return [
+        (positions[index], room_ids[index], round(float(scores[index]), 4))
+        for index in ranking.top_k(scores, k)
+    ]
+
+
+@job_runner.register("change_recommendations")
+def generate_recommendations(
+    db: Session,
     user1_id: int,
     user2_id: int,
     change_request_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    limit: int = ranking.DEFAULT_TOP_K,
 ) -> dict:
     """
-    Find common availability between two users and generate room change recommendations.
-    
+    Find common availability between two users and store the best ranked rooms.
+
+    Every free room in every common interval is scored by ``ranking`` and only
+    the ``limit`` best candidates are stored; recommendations of earlier runs
+    that are no longer among them are deleted. Runs inside a request or as a
+    background job.
+
     Args:
+        db (Session): Database session
         user1_id (int): ID of the first user
         user2_id (int): ID of the second user
         change_request_id (int): ID of the change request
-        db (Session): Database session
-        current_user (User): Current authenticated user
-        
+        limit (int, optional): Number of recommendations to keep. Defaults to
+            ``ranking.DEFAULT_TOP_K``.
+
     Raises:
-        HTTPException: If change request is not found or no common availability/rooms found
-        
+        JobError: If change request is not found, its room requirements are
+            invalid or no common availability/rooms found
+
     Returns:
-        dict: Success message with the number of recommendations added
+        dict: Success message with the number of recommendations stored
     """
-    user1_proposals = (
-        db.query(AvailabilityProposal)
-        .filter(
-            AvailabilityProposal.user_id == user1_id,
-            AvailabilityProposal.change_request_id == change_request_id,
-        )
-        .all()
-    )
-    user2_proposals = (
-        db.query(AvailabilityProposal)
-        .filter(
-            AvailabilityProposal.user_id == user2_id,
-            AvailabilityProposal.change_request_id == change_request_id,
-        )
-        .all()
-    )
+    # (time slot ID, day) -> ID of the first user's proposal for it
+    user1_proposals = {}
+    for proposal_id, slot_id, day in db.execute(
+        _proposals_query(change_request_id, user1_id)
+    ):
+        user1_proposals.setdefault((slot_id, day), proposal_id)
+    user2_intervals = {
+        (slot_id, day)
+        for _, slot_id, day in db.execute(_proposals_query(change_request_id, user2_id))
+    }
 
     change_request = (
         db.query(ChangeRequest).filter(ChangeRequest.id == change_request_id).first()
     )
     if not change_request:
-        raise HTTPException(status_code=404, detail="Change request not found")
+        raise JobError("Change request not found", status_code=404)
 
-    common_intervals = []
-    for proposal1 in user1_proposals:
-        for proposal2 in user2_proposals:
-            if (
-                proposal1.time_slot_id == proposal2.time_slot_id
-                and proposal1.day == proposal2.day
-            ):
-                common_intervals.append((proposal1.time_slot_id, proposal1.day))
+    common_intervals = [
+        interval for interval in user1_proposals if interval in user2_intervals
+    ]
 
     if not common_intervals:
-        raise HTTPException(status_code=404, detail="No common availability found")
-
-    recommendations = []
-    for slot_id, day in common_intervals:
-        # Base query for available rooms
-        available_rooms_query = db.query(Room).filter(
-            ~Room.id.in_(
-                db.query(RoomUnavailability.room_id).filter(
-                    RoomUnavailability.start_datetime <= day,
-                    RoomUnavailability.end_datetime >= day,
-                )
+        raise JobError("No common availability found", status_code=404)
+
+    required_equipment = None
+    # Add room requirements filtering if specified
+    if change_request.room_requirements:
+        try:
+            # e.g. ["projector"]
+            required_equipment = json.loads(change_request.room_requirements)
+        except Exception:
+            raise JobError("Invalid room_requirements format", status_code=400)
+
+    available_rooms = db.execute(
+        available_rooms_query(
+            common_intervals, required_equipment, change_request.minimum_capacity
+        )
+    ).all()
+
+    if not available_rooms:
+        raise JobError("No rooms available for the common intervals", status_code=404)
+
+    rows = []
+    for position, room_id, score in rank_candidates(
+        db, change_request, common_intervals, available_rooms, limit
+    ):
+        slot_id, day = common_intervals[position]
+        rows.append(
+            {
+                "change_request_id": change_request_id,
+                "recommended_slot_id": slot_id,
+                "recommended_day": day,
+                "recommended_room_id": room_id,
+                "source_proposal_id": user1_proposals[slot_id, day],
+                "score": score,
+            }
+        )
+    # Candidates of earlier runs that dropped out of the top k
+    recommendation_key = tuple_(
+        ChangeRecomendation.recommended_day,
+        ChangeRecomendation.recommended_slot_id,
+        ChangeRecomendation.recommended_room_id,
+    )
+    db.execute(
+        delete(ChangeRecomendation).where(
+            ChangeRecomendation.change_request_id == change_request_id,
+            recommendation_key.not_in(
+                [
+                    (
+                        row["recommended_day"],
+                        row["recommended_slot_id"],
+                        row["recommended_room_id"],
+                    )
+                    for row in rows
+                ]
             ),
-            ~Room.id.in_(
-                db.query(CourseEvent.room_id).filter(
-                    CourseEvent.day == day,
-                    CourseEvent.time_slot_id == slot_id,
-                    CourseEvent.canceled == False,
-                )
+        )
+    )
+    # Re-running for the same request only touches rows whose score or source
+    # proposal changed
+    statement = upsert_insert(db, ChangeRecomendation).values(rows)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[
+                ChangeRecomendation.change_request_id,
+                ChangeRecomendation.recommended_day,
+                ChangeRecomendation.recommended_slot_id,
+                ChangeRecomendation.recommended_room_id,
+            ],
+            set_={
+                "score": statement.excluded.score,
+                "source_proposal_id": statement.excluded.source_proposal_id,
+            },
+            where=or_(
+                ChangeRecomendation.score.is_distinct_from(statement.excluded.score),
+                ChangeRecomendation.source_proposal_id.is_distinct_from(
+                    statement.excluded.source_proposal_id
+                ),
             ),
         )
+    )
+    db.commit()
+    return {
+        "message": "Recommendations added successfully",
+        "recommendations": len(rows),
+    }
 
-        # Add room requirements filtering if specified
-        if change_request.room_requirements:
-            try:
-                import json
-                required_equipment = json.loads(change_request.room_requirements)  # <-- np. ["projector"]
-            except Exception:
-                raise HTTPException(status_code=400, detail="Invalid room_requirements format")
-
-            if isinstance(required_equipment, list) and required_equipment:
-                available_rooms_query = available_rooms_query.join(Room.equipment).filter(
-                    Equipment.name.in_(required_equipment)
-                ).group_by(Room.id).having(
-                    func.count(Equipment.id) >= len(required_equipment)
-                )
-
-        if change_request.minimum_capacity > 0:
-            # Extract capacity requirement if present
-            available_rooms_query = available_rooms_query.filter(
-                Room.capacity >= change_request.minimum_capacity
-            )
 
-        available_rooms = available_rooms_query.all()
+@router.post("/common-availability")
+def find_and_add_common_availability(
+    user1_id: int,
+    user2_id: int,
+    change_request_id: int,
+    response: Response,
+    limit: int = Query(
+        default=ranking.DEFAULT_TOP_K,
+        ge=1,
+        description="Number of best ranked recommendations to keep",
+    ),
+    background: bool = Query(
+        default=False,
+        description="Queue the work as a job and return its ID right away",
+    ),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    """
+    Find common availability between two users and generate room change recommendations.
 
-        for room in available_rooms:
-            source_proposal = next(
-                (p for p in user1_proposals if p.time_slot_id == slot_id and p.day == day),
-                None
-            )
-            recommendation = ChangeRecomendation(
-                change_request_id=change_request_id,
-                recommended_slot_id=slot_id,
-                recommended_day=day,
-                recommended_room_id=room.id,
-                source_proposal_id=source_proposal.id if source_proposal else None
-            )
-            recommendations.append(recommendation)
-            db.add(recommendation)
+    With ``background`` the work is queued on the job runner and the response
+    is 202 with the job ID, to be polled at ``/jobs/{job_id}``.
 
-    if not recommendations:
-        raise HTTPException(
-            status_code=404, detail="No rooms available for the common intervals"
-        )
+    Args:
+        user1_id (int): ID of the first user
+        user2_id (int): ID of the second user
+        change_request_id (int): ID of the change request
+        response (Response): Response whose status code is set for queued jobs
+        limit (int, optional): Number of recommendations to keep. Defaults to
+            ``ranking.DEFAULT_TOP_K``.
+        background (bool, optional): Run as a background job. Defaults to False.
+        db (Session): Database session
+        current_user (User): Current authenticated user
 
-    db.commit()
-    return {"message": "Recommendations added successfully"}
+    Raises:
+        HTTPException: If change request is not found or no common
+            availability/rooms found
+
+    Returns:
+        dict: Success message, or the ID and status of the queued job
+    """
+    params = {
+        "user1_id": user1_id,
+        "user2_id": user2_id,
+        "change_request_id": change_request_id,
+        "limit": limit,
+    }
+    if not background:
+        try:
+            result = generate_recommendations(db, **params)
+        except JobError as error:
+            raise HTTPException(status_code=error.status_code, detail=str(error))
+        return {"message": result["message"]}
+
+    request_exists = select(ChangeRequest.id).where(
+        ChangeRequest.id == change_request_id
+    )
+    if not db.scalar(request_exists):
+        raise HTTPException(status_code=404, detail="Change request not found")
+    job = job_runner.enqueue(db, "change_recommendations", params, current_user.id)
+    response.status_code = HTTP_202_ACCEPTED
+    return {"job_id": job.id, "status": job.status}
 
 
 @router.get(
@@ -150,15 +443,15 @@ async def find_and_add_common_availability(
 )
 async def get_proposals(
     change_request_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> list[ChangeRecomendationResponse]:
     """
-    Get all recommendations for a specific change request.
+    Get all recommendations for a specific change request, best ranked first.
     
     Args:
         change_request_id (int): ID of the change request
-        db (Session): Database session
+        db (AsyncSession): Database session
         current_user (User): Current authenticated user
         
     Raises:
@@ -167,22 +460,23 @@ async def get_proposals(
     Returns:
         list[ChangeRecomendation]: List of change recommendations
     """
-    change_request = (
-        db.query(ChangeRequest).filter(ChangeRequest.id == change_request_id).first()
+    change_request = await db.scalar(
+        select(ChangeRequest).where(ChangeRequest.id == change_request_id)
     )
     if not change_request:
         raise HTTPException(status_code=404, detail="Change request not found")
 
-    change_recommendations = (
-        db.query(ChangeRecomendation)
-        .filter(ChangeRecomendation.change_request_id == change_request_id)
-        .all()
+    change_recommendations = await db.scalars(
+        select(ChangeRecomendation)
+        .options(joinedload(ChangeRecomendation.source_proposal))
+        .where(ChangeRecomendation.change_request_id == change_request_id)
+        .order_by(ChangeRecomendation.score.desc().nulls_last(), ChangeRecomendation.id)
     )
-    return change_recommendations
+    return change_recommendations.all()
 
 
 @router.delete("/{change_request_id}/recommendations", status_code=HTTP_204_NO_CONTENT)
-async def delete_recommendations(
+def delete_recommendations(
     change_request_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
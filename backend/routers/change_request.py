@@ -1,30 +1,164 @@
-from fastapi import Query
-from database import get_db
-from fastapi import APIRouter, Depends, HTTPException
-from model import ChangeRequest, CourseEvent, User, ChangeRequestStatus, Course, Group
+from datetime import date
+
+from calendar_feed import touch_groups
+from database import get_async_db, get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from model import (
+    ChangeRequest,
+    ChangeRequestStatus,
+    Course,
+    CourseEvent,
+    CourseSeries,
+    Group,
+    User,
+)
+from notifications import notify_change_request
+from pagination import paginate, set_next_cursor
 from routers.auth import get_current_user
 from routers.schemas import (
+    ChangeRequestCounts,
     ChangeRequestCreate,
     ChangeRequestResponse,
     ChangeRequestUpdate,
 )
-from sqlalchemy import or_
+from series import occurrence_days
+from sqlalchemy import Select, Subquery, func, select, union
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from starlette.status import (
     HTTP_200_OK,
     HTTP_201_CREATED,
     HTTP_204_NO_CONTENT,
     HTTP_404_NOT_FOUND,
+    HTTP_409_CONFLICT,
+    HTTP_422_UNPROCESSABLE_ENTITY,
 )
 
 router = APIRouter(prefix="/change_requests", tags=["change_requests"])
 
 
+def _occurrence_event(db: Session, series_id: int, day: date) -> CourseEvent:
+    # A request needs an event row, so an occurrence that is still virtual is
+    # materialized as an unchanged exception of its series. It keeps the same
+    # room, day and slot, so occupancy and utilization stay as they are.
+    course_event = (
+        db.query(CourseEvent)
+        .filter(CourseEvent.series_id == series_id, CourseEvent.series_day == day)
+        .first()
+    )
+    if course_event:
+        return course_event
+    series = db.query(CourseSeries).filter(CourseSeries.id == series_id).first()
+    if not series:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Series not found")
+    if day not in occurrence_days(
+        series.weekday, series.start_date, series.end_date, day, day
+    ):
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND,
+            detail="The series does not meet on that day",
+        )
+    course_event = CourseEvent(
+        course_id=series.course_id,
+        room_id=series.room_id,
+        day=day,
+        time_slot_id=series.time_slot_id,
+        canceled=False,
+        series_id=series.id,
+        series_day=day,
+    )
+    db.add(course_event)
+    # Feeds render an exception as its own event
+    touch_groups(db, [series.course.group_id])
+    return course_event
+
+
+def related_requests_subquery(
+    user_id: int, status: ChangeRequestStatus | None = None
+) -> Subquery:
+    """
+    Build the (ID, status) rows of the change requests related to a user.
+
+    Each way of being related is its own branch of a UNION, so every branch
+    starts from an index on the user column (``initiator_id``, ``teacher_id``,
+    ``leader_id``) instead of checking every change request against an OR.
+
+    Args:
+        user_id (int): ID of the user
+        status (ChangeRequestStatus | None, optional): Optional status filter.
+            Defaults to None.
+
+    Returns:
+        Subquery: Distinct ``id`` and ``status`` of the related requests
+    """
+    filters = [ChangeRequest.status == status] if status else []
+    columns = (ChangeRequest.id, ChangeRequest.status)
+    initiated = select(*columns).where(ChangeRequest.initiator_id == user_id, *filters)
+    # kursy, jeśli prowadzący
+    taught = (
+        select(*columns)
+        .join(CourseEvent, ChangeRequest.course_event_id == CourseEvent.id)
+        .join(Course, CourseEvent.course_id == Course.id)
+        .where(Course.teacher_id == user_id, *filters)
+    )
+    # kursy, gdzie jest starostą grupy
+    led = (
+        select(*columns)
+        .join(CourseEvent, ChangeRequest.course_event_id == CourseEvent.id)
+        .join(Course, CourseEvent.course_id == Course.id)
+        .join(Group, Course.group_id == Group.id)
+        .where(Group.leader_id == user_id, *filters)
+    )
+    return union(initiated, taught, led).subquery("related")
+
+
+def related_requests_query(
+    user_id: int,
+    status: ChangeRequestStatus | None = None,
+    cursor: str | None = None,
+    skip: int = 0,
+    limit: int = 10,
+) -> Select:
+    """
+    Build the query for one page of change requests related to a user.
+
+    The page of IDs is cut from the UNION before any request is read, so the
+    requests are fetched by primary key instead of walking the whole table in
+    ID order until the page is full.
+
+    Args:
+        user_id (int): ID of the user
+        status (ChangeRequestStatus | None, optional): Optional status filter.
+            Defaults to None.
+        cursor (str | None, optional): Cursor of the previous page. Defaults to None.
+        skip (int, optional): Number of records to skip, ignored with a cursor.
+            Defaults to 0.
+        limit (int, optional): Maximum number of records to return. Defaults to 10.
+
+    Raises:
+        HTTPException: If the cursor is invalid
+
+    Returns:
+        Select: Query selecting the page of related change requests by ID
+    """
+    related = related_requests_subquery(user_id, status)
+    page = paginate(select(related.c.id), (related.c.id,), cursor, skip, limit)
+    page = page.subquery()
+    return (
+        select(ChangeRequest)
+        .join(page, page.c.id == ChangeRequest.id)
+        .order_by(ChangeRequest.id)
+    )
+
+
 @router.get("/", response_model=list[ChangeRequestResponse], status_code=HTTP_200_OK)
 async def get_requests(
+    response: Response,
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(default=None, description="Cursor of the previous page"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> list[ChangeRequest]:
     """
@@ -33,22 +167,33 @@ async def get_requests(
     Args:
         skip (int, optional): Number of records to skip. Defaults to 0.
         limit (int, optional): Maximum number of records to return. Defaults to 10.
-        db (Session): Database session.
+        cursor (str | None, optional): Cursor from the ``X-Next-Cursor`` header of the
+            previous page; when given, ``skip`` is ignored. Defaults to None.
+        response (Response): Outgoing response, carries the next page cursor.
+        db (AsyncSession): Database session.
         current_user (User): Current authenticated user.
 
     Returns:
         list[ChangeRequest]: List of change requests.
     """
-    requests = db.query(ChangeRequest).offset(skip).limit(limit).all()
+    order_by = (ChangeRequest.id,)
+    requests = (
+        await db.scalars(paginate(select(ChangeRequest), order_by, cursor, skip, limit))
+    ).all()
+    set_next_cursor(response, requests, order_by, limit)
     return requests
 
 
 @router.get("/related", response_model=list[ChangeRequestResponse], status_code=HTTP_200_OK)
 async def get_related_requests(
+        response: Response,
         status: ChangeRequestStatus | None = Query(default=None, description="Optional status filter"),
         skip: int = 0,
         limit: int = 10,
-        db: Session = Depends(get_db),
+        cursor: str | None = Query(
+            default=None, description="Cursor of the previous page"
+        ),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ) -> list[ChangeRequestResponse]:
     """
@@ -58,39 +203,47 @@ async def get_related_requests(
     - created by the user
     - for courses where the user is the teacher
     - for courses where the user is group leader (starosta)
+
+    When ``cursor`` is given, the page continues after it and ``skip`` is ignored;
+    the cursor of the next page is returned in the ``X-Next-Cursor`` header.
     """
-    # kursy, jeśli prowadzący
-    teacher_event_ids = (
-        db.query(CourseEvent.id)
-        .join(Course)
-        .filter(Course.teacher_id == current_user.id)
-        .subquery()
-    )
+    query = related_requests_query(current_user.id, status, cursor, skip, limit)
+    requests = (await db.scalars(query)).all()
+    set_next_cursor(response, requests, (ChangeRequest.id,), limit)
+    return requests
 
-    # kursy, gdzie jest starostą grupy
-    leader_event_ids = (
-        db.query(CourseEvent.id)
-        .join(Course)
-        .join(Group)
-        .filter(Group.leader_id == current_user.id)
-        .subquery()
-    )
 
-    query = (
-        db.query(ChangeRequest)
-        .filter(
-            or_(
-                ChangeRequest.initiator_id == current_user.id,
-                ChangeRequest.course_event_id.in_(teacher_event_ids),
-                ChangeRequest.course_event_id.in_(leader_event_ids),
-            )
-        )
-    )
+@router.get(
+    "/related/counts", response_model=ChangeRequestCounts, status_code=HTTP_200_OK
+)
+async def get_related_request_counts(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    """
+    Count the change requests related to the current user by status.
 
-    if status:
-        query = query.filter(ChangeRequest.status == status)
+    All statuses are counted by one grouped query over the same UNION as
+    ``/related``, without reading the requests themselves, for the badges of
+    the dashboard.
 
-    return query.offset(skip).limit(limit).all()
+    Args:
+        db (AsyncSession): Database session.
+        current_user (User): Current authenticated user.
+
+    Returns:
+        dict: Total and per-status number of related change requests.
+    """
+    related = related_requests_subquery(current_user.id)
+    counts = dict(
+        (
+            await db.execute(
+                select(related.c.status, func.count()).group_by(related.c.status)
+            )
+        ).all()
+    )
+    by_status = {status: counts.get(status, 0) for status in ChangeRequestStatus}
+    return {"total": sum(by_status.values()), "by_status": by_status}
 
 
 @router.get(
@@ -98,14 +251,14 @@ async def get_related_requests(
 )
 async def get_request_by_id(
     request_id: int, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> ChangeRequest:
     """
     Retrieve a specific change request by ID.
 
     Args:
         request_id (int): ID of the change request to retrieve.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
 
     Raises:
         HTTPException: If change request with the specified ID is not found.
@@ -113,7 +266,9 @@ async def get_request_by_id(
     Returns:
         ChangeRequest: The requested change request.
     """
-    request = db.query(ChangeRequest).filter(ChangeRequest.id == request_id).first()
+    request = await db.scalar(
+        select(ChangeRequest).where(ChangeRequest.id == request_id)
+    )
     if not request:
         raise HTTPException(
             status_code=HTTP_404_NOT_FOUND, detail="Change request not found"
@@ -122,7 +277,7 @@ async def get_request_by_id(
 
 
 @router.post("/", response_model=ChangeRequestResponse, status_code=HTTP_201_CREATED)
-async def create_request(
+def create_request(
     request: ChangeRequestCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -130,30 +285,61 @@ async def create_request(
     """
     Create a new change request.
 
+    The request targets either an event or, with ``series_id`` and
+    ``series_day``, one occurrence of a weekly series. Such an occurrence is
+    materialized as an exception of the series first.
+
     Args:
         request (ChangeRequestCreate): Data for the new change request.
         db (Session): Database session.
         current_user (User): Current authenticated user.
 
     Raises:
-        HTTPException: If course event or user is not found.
+        HTTPException: If neither or both an event and an occurrence are given,
+            if course event, series occurrence or user is not found, or if the
+            occurrence is materialized by a concurrent request.
 
     Returns:
         ChangeRequest: The newly created change request.
     """
-    course_event = (
-        db.query(CourseEvent).filter(CourseEvent.id == request.course_event_id).first()
-    )
-    if not course_event:
+    if (request.course_event_id is None) == (
+        request.series_id is None or request.series_day is None
+    ):
         raise HTTPException(
-            status_code=HTTP_404_NOT_FOUND, detail="Course event not found"
+            status_code=HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Give either course_event_id or series_id and series_day",
         )
     user = db.query(User).filter(User.id == request.initiator_id).first()
     if not user:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="User not found")
+    if request.course_event_id is None:
+        course_event = _occurrence_event(db, request.series_id, request.series_day)
+    else:
+        course_event = (
+            db.query(CourseEvent)
+            .filter(CourseEvent.id == request.course_event_id)
+            .first()
+        )
+    if not course_event:
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND, detail="Course event not found"
+        )
 
-    new_request = ChangeRequest(**request.dict())
+    new_request = ChangeRequest(
+        **request.dict(exclude={"course_event_id", "series_id", "series_day"}),
+        course_event=course_event,
+    )
     db.add(new_request)
+    try:
+        db.flush()
+    except IntegrityError:
+        # uq_course_events_series_day: another request materialized it first
+        db.rollback()
+        raise HTTPException(
+            status_code=HTTP_409_CONFLICT,
+            detail="The occurrence was changed at the same time, try again",
+        )
+    notify_change_request(db, new_request)
     db.commit()
     db.refresh(new_request)
     return new_request
@@ -162,7 +348,7 @@ async def create_request(
 @router.put(
     "/{request_id}", response_model=ChangeRequestResponse, status_code=HTTP_200_OK
 )
-async def update_request(
+def update_request(
     request: ChangeRequestUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -201,14 +387,17 @@ async def update_request(
     if not user:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="User not found")
 
+    previous_status = existing_request.status
     for key, value in request.dict(exclude_unset=True).items():
         setattr(existing_request, key, value)
+    if existing_request.status != previous_status:
+        notify_change_request(db, existing_request)
     db.commit()
     db.refresh(existing_request)
     return existing_request
 
 @router.delete("/{request_id}", status_code=HTTP_204_NO_CONTENT)
-async def delete_request(
+def delete_request(
     request_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -229,6 +418,7 @@ async def delete_request(
     )
     if existing_request is None:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Request not found")
+    notify_change_request(db, existing_request, deleted=True)
     db.delete(existing_request)
     db.commit()
-    return
\ No newline at end of file
+    return
@@ -1,9 +1,24 @@
 
-from database import get_db
-from fastapi import APIRouter, Depends, HTTPException
+import io
+from datetime import date
+from typing import Literal
+
+from calendar_feed import touch_groups
+from catalog_cache import bump_versions, catalog_cache
+from database import get_async_db, get_db
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
 from model import (
     Course,
     CourseEvent,
+    CourseSeries,
     Group,
     Room,
     RoomUnavailability,
@@ -11,6 +26,7 @@ from model import (
     User,
     UserRole,
 )
+from occupancy import EventSlot, occupancy_index
 from routers.auth import get_current_user, role_required
 from routers.schemas import (
     CourseCreate,
@@ -18,22 +34,165 @@ from routers.schemas import (
     CourseEventResponse,
     CourseEventUpdate,
     CourseResponse,
+    CourseSeriesCreate,
+    CourseSeriesException,
+    CourseSeriesResponse,
+    OccurrenceResponse,
+    ScheduleEntry,
+)
+from series import (
+    Occurrence,
+    exceptions_query,
+    expand,
+    occurrence_days,
+    series_query,
 )
-from sqlalchemy import and_
-from sqlalchemy.orm import Session
+from sqlalchemy import ColumnElement, and_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, raiseload
 from starlette.status import (
     HTTP_200_OK,
     HTTP_201_CREATED,
     HTTP_204_NO_CONTENT,
+    HTTP_400_BAD_REQUEST,
     HTTP_404_NOT_FOUND,
     HTTP_422_UNPROCESSABLE_ENTITY,
 )
+from timetable_import import TimetableImporter, read_records
+from utilization import course_slots, record_usage
 
 router = APIRouter(prefix="/courses", tags=["courses"])
 
+ScheduleField = Literal[
+    "id",
+    "course_id",
+    "course_name",
+    "room_id",
+    "room_name",
+    "day",
+    "time_slot_id",
+    "start_time",
+    "end_time",
+    "canceled",
+    "series_id",
+]
+
+
+def _ensure_slot_free(room_id: int, day: date, time_slot_id: int) -> None:
+    # Occurrences of weekly series are not rows, so only the occupancy index
+    # knows about them; the unique index still settles races between events
+    if occupancy_index.is_slot_busy(room_id, day, time_slot_id):
+        raise HTTPException(
+            status_code=HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Event time is taken by another event",
+        )
+
+
+def _commit_event(db: Session) -> None:
+    # uq_course_events_room_day_slot rejects a second non-cancelled event in the
+    # same room, day and slot, also when concurrent requests race each other
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Event time is taken by another event",
+        )
+
+
+async def _schedule(
+    db: AsyncSession,
+    courses: ColumnElement,
+    start: date | None,
+    end: date | None,
+    fields: list[str] | None,
+) -> list[dict]:
+    if start is not None and end is not None and end < start:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail="End date must not be before start date",
+        )
+
+    events = (
+        select(
+            CourseEvent.id,
+            CourseEvent.course_id,
+            Course.name.label("course_name"),
+            CourseEvent.room_id,
+            Room.name.label("room_name"),
+            CourseEvent.day,
+            CourseEvent.time_slot_id,
+            TimeSlots.start_time,
+            TimeSlots.end_time,
+            CourseEvent.canceled,
+            CourseEvent.series_id,
+        )
+        .join(Course, CourseEvent.course_id == Course.id)
+        .join(TimeSlots, CourseEvent.time_slot_id == TimeSlots.id)
+        .outerjoin(Room, CourseEvent.room_id == Room.id)
+        .where(courses)
+    )
+    series = (
+        series_query(start, end)
+        .add_columns(
+            Course.name.label("course_name"),
+            Room.name.label("room_name"),
+            TimeSlots.start_time,
+            TimeSlots.end_time,
+        )
+        .join(Course, CourseSeries.course_id == Course.id)
+        .join(TimeSlots, CourseSeries.time_slot_id == TimeSlots.id)
+        .outerjoin(Room, CourseSeries.room_id == Room.id)
+        .where(courses)
+    )
+    if start is not None:
+        events = events.where(CourseEvent.day >= start)
+    if end is not None:
+        events = events.where(CourseEvent.day <= end)
+
+    rows = [row._asdict() for row in await db.execute(events)]
+    series_rows = (await db.execute(series)).all()
+    if series_rows:
+        exceptions = set(
+            await db.execute(
+                exceptions_query(start, end)
+                .join(CourseSeries, CourseEvent.series_id == CourseSeries.id)
+                .join(Course, CourseSeries.course_id == Course.id)
+                .where(courses)
+            )
+        )
+        for item in series_rows:
+            days = occurrence_days(
+                item.weekday, item.start_date, item.end_date, start, end
+            )
+            rows.extend(
+                {
+                    "id": None,
+                    "course_id": item.course_id,
+                    "course_name": item.course_name,
+                    "room_id": item.room_id,
+                    "room_name": item.room_name,
+                    "day": day,
+                    "time_slot_id": item.time_slot_id,
+                    "start_time": item.start_time,
+                    "end_time": item.end_time,
+                    "canceled": False,
+                    "series_id": item.id,
+                }
+                for day in days
+                if (item.id, day) not in exceptions
+            )
+
+    rows.sort(key=lambda row: (row["day"], row["start_time"], row["id"] or 0))
+    if fields:
+        return [{field: row[field] for field in fields} for row in rows]
+    return rows
+
 
 @router.post("/", response_model=CourseResponse, status_code=HTTP_201_CREATED)
-async def create_course(
+def create_course(
     course: CourseCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(
@@ -66,6 +225,7 @@ async def create_course(
         name=course.name, teacher_id=course.teacher_id, group_id=course.group_id
     )
     db.add(db_course)
+    bump_versions(db, "courses")
     db.commit()
     db.refresh(db_course)
     return db_course
@@ -73,49 +233,69 @@ async def create_course(
 
 @router.get("/", response_model=list[CourseResponse], status_code=HTTP_200_OK)
 async def get_courses(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
-) -> list[Course]:
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+) -> Response:
     """
     Get all courses.
 
+    Answered with 304 when ``If-None-Match`` carries the current ETag.
+
     Args:
-        db (Session): Database session
+        request (Request): Incoming request
+        db (AsyncSession): Database session
         current_user (User): Current authenticated user
 
     Returns:
-        list[Course]: List of all courses
+        Response: JSON list of all courses, or 304 if the client's copy is current
     """
-    return db.query(Course).all()
+
+    async def load() -> list[Course]:
+        courses = await db.scalars(select(Course).options(raiseload("*")))
+        return courses.all()
+
+    return await catalog_cache.respond(
+        request, db, ("courses",), list[CourseResponse], load
+    )
 
 
 @router.get("/{course_id}", response_model=CourseResponse, status_code=HTTP_200_OK)
 async def get_course(
     course_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
-) -> Course:
+) -> Response:
     """
     Get a single course by ID.
 
     Args:
         course_id (int): ID of the course to retrieve
-        db (Session): Database session
+        request (Request): Incoming request
+        db (AsyncSession): Database session
         current_user (User): Current authenticated user
 
     Raises:
         HTTPException: If course is not found
 
     Returns:
-        Course: The requested course
+        Response: The requested course, or 304 if the client's copy is current
     """
-    course = db.query(Course).filter(Course.id == course_id).first()
-    if not course:
-        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Course not found")
-    return course
+
+    async def load() -> Course:
+        course = await db.scalar(select(Course).where(Course.id == course_id))
+        if not course:
+            raise HTTPException(
+                status_code=HTTP_404_NOT_FOUND, detail="Course not found"
+            )
+        return course
+
+    return await catalog_cache.respond(request, db, ("courses",), CourseResponse, load)
 
 
 @router.delete("/{course_id}", status_code=HTTP_204_NO_CONTENT)
-async def delete_course(
+def delete_course(
     course_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(role_required([UserRole.ADMIN, UserRole.KOORDYNATOR])),
@@ -134,13 +314,61 @@ async def delete_course(
     course = db.query(Course).filter(Course.id == course_id).first()
     if not course:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Course not found")
+    events = course_slots([course])
+    touch_groups(db, [course.group_id])
+    bump_versions(db, "courses")
+    record_usage(db, removed=events)
     db.delete(course)
     db.commit()
+    for event in events:
+        occupancy_index.remove_event(event)
     return
 
 
+@router.post("/import", status_code=HTTP_200_OK)
+def import_timetable(
+    file: UploadFile,
+    format: Literal["csv", "jsonl"] = Query(default="csv", description="File format"),
+    dry_run: bool = Query(default=False, description="Validate without saving"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(role_required([UserRole.ADMIN, UserRole.KOORDYNATOR])),
+) -> dict:
+    """
+    Import a semester timetable from a CSV or JSON-lines file.
+
+    Each record is one class with the fields ``course``, ``teacher_email``,
+    ``group``, ``room``, ``day``, ``start_time``, ``end_time`` and optionally
+    ``room_capacity`` and ``room_type``. Missing courses, rooms and time slots
+    are created. Records of a class held every week are stored as one series.
+    Records that conflict with existing events, with each other or with room
+    unavailability are skipped and listed in the report.
+
+    Args:
+        file (UploadFile): Timetable file
+        format (str, optional): ``csv`` or ``jsonl``. Defaults to ``csv``.
+        dry_run (bool, optional): Validate without saving. Defaults to False.
+        db (Session): Database session
+        current_user (User): Current authenticated user (must be ADMIN or KOORDYNATOR)
+
+    Raises:
+        HTTPException: If the file is not valid UTF-8 text
+
+    Returns:
+        dict: Import report with counters and the first errors
+    """
+    source = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    importer = TimetableImporter(db)
+    try:
+        report = importer.run(read_records(source, format), commit=not dry_run)
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST, detail="File is not valid UTF-8 text"
+        )
+    return report.as_dict()
+
+
 @router.put("/{course_id}", response_model=CourseResponse, status_code=HTTP_200_OK)
-async def update_course(
+def update_course(
     course_id: int,
     course: CourseCreate,
     db: Session = Depends(get_db),
@@ -173,8 +401,11 @@ async def update_course(
     if not existing_group:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Group not found")
 
+    previous_group_id = existing_course.group_id
     for key, value in course.dict(exclude_unset=True).items():
         setattr(existing_course, key, value)
+    touch_groups(db, [previous_group_id, existing_course.group_id])
+    bump_versions(db, "courses")
     db.commit()
     db.refresh(existing_course)
     return existing_course
@@ -183,7 +414,7 @@ async def update_course(
 @router.post(
     "/events", response_model=CourseEventResponse, status_code=HTTP_201_CREATED
 )
-async def create_event(
+def create_event(
     event: CourseEventCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(
@@ -214,24 +445,6 @@ async def create_event(
             status_code=HTTP_404_NOT_FOUND, detail="Room does not exist"
         )
 
-    existing_course_event = (
-        db.query(CourseEvent)
-        .filter(
-            CourseEvent.room_id == event.room_id,
-            and_(
-                CourseEvent.time_slot_id == event.time_slot_id,
-                CourseEvent.day == event.day,
-            ),
-        )
-        .first()
-    )
-
-    if existing_course_event:
-        raise HTTPException(
-            status_code=HTTP_422_UNPROCESSABLE_ENTITY,
-            detail="Event time is taken by another event",
-        )
-
     unavailability = (
         db.query(RoomUnavailability)
         .filter(
@@ -255,6 +468,8 @@ async def create_event(
         raise HTTPException(
             status_code=HTTP_404_NOT_FOUND, detail="Time slot does not exist"
         )
+    if not event.canceled:
+        _ensure_slot_free(event.room_id, event.day, event.time_slot_id)
 
     course_event = CourseEvent(
         course_id=event.course_id,
@@ -264,15 +479,18 @@ async def create_event(
         canceled=event.canceled,
     )
     db.add(course_event)
-    db.commit()
+    touch_groups(db, [course.group_id])
+    record_usage(db, added=[course_event])
+    _commit_event(db)
     db.refresh(course_event)
+    occupancy_index.add_event(course_event)
     return course_event
 
 
 @router.put(
     "/events/{event_id}", response_model=CourseEventResponse, status_code=HTTP_200_OK
 )
-async def update_event(
+def update_event(
     event_id: int,
     event: CourseEventUpdate,
     db: Session = Depends(get_db),
@@ -311,24 +529,6 @@ async def update_event(
             status_code=HTTP_404_NOT_FOUND, detail="Time slot does not exist"
         )
 
-    existing_course_event = (
-        db.query(CourseEvent)
-        .filter(
-            CourseEvent.room_id == event.room_id,
-            and_(
-                CourseEvent.time_slot_id == event.time_slot_id,
-                CourseEvent.day == event.day,
-            ),
-        )
-        .first()
-    )
-
-    if existing_course_event:
-        raise HTTPException(
-            status_code=HTTP_422_UNPROCESSABLE_ENTITY,
-            detail="Event time is taken by another event",
-        )
-
     unavailability = (
         db.query(RoomUnavailability)
         .filter(
@@ -345,62 +545,107 @@ async def update_event(
             status_code=HTTP_404_NOT_FOUND, detail="Room unavailable in selected time"
         )
 
-    for key, value in event.dict(exclude_unset=True).items():
+    previous = EventSlot.of(course_event)
+    changes = event.dict(exclude_unset=True)
+    # Fields left out of the request keep their stored values, canceled included
+    target = previous._replace(
+        **{key: value for key, value in changes.items() if key in EventSlot._fields}
+    )
+    # The event itself occupies its current slot in the index
+    if not target.canceled and (previous.canceled or target[:3] != previous[:3]):
+        _ensure_slot_free(target.room_id, target.day, target.time_slot_id)
+    previous_group_id = course_event.course.group_id
+    for key, value in changes.items():
         setattr(course_event, key, value)
     db.add(course_event)
-    db.commit()
+    group_id = (
+        db.query(Course.group_id).filter(Course.id == course_event.course_id).scalar()
+    )
+    touch_groups(db, [previous_group_id, group_id])
+    record_usage(db, added=[course_event], removed=[previous])
+    _commit_event(db)
     db.refresh(course_event)
+    occupancy_index.remove_event(previous)
+    occupancy_index.add_event(course_event)
     return course_event
 
 
 @router.get(
     "/{course_id}/events",
-    response_model=list[CourseEventResponse],
+    response_model=list[ScheduleEntry],
+    response_model_exclude_unset=True,
     status_code=HTTP_200_OK,
 )
 async def get_events_for_course(
     course_id: int,
-    db: Session = Depends(get_db),
+    start: date | None = Query(default=None, description="First day of the window"),
+    end: date | None = Query(default=None, description="Last day of the window"),
+    fields: list[ScheduleField] | None = Query(
+        default=None, description="Fields to return, all by default"
+    ),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
-) -> list[CourseEvent]:
+) -> list[dict]:
     """
-    Get all events for a specific course.
+    Get the schedule of a course, optionally limited to a date window.
+
+    Every row already carries the course name, room name and slot times.
+    Occurrences of weekly series are included.
 
     Args:
         course_id (int): ID of the course
-        db (Session): Database session
+        start (date | None, optional): First day of the window. Defaults to None.
+        end (date | None, optional): Last day of the window. Defaults to None.
+        fields (list[str] | None, optional): Fields to return. Defaults to None.
+        db (AsyncSession): Database session
         current_user (User): Current authenticated user
 
+    Raises:
+        HTTPException: If the window ends before it starts
+
     Returns:
-        list[CourseEvent]: List of events for the specified course
+        list[dict]: Schedule entries ordered by day and start time
     """
-    return db.query(CourseEvent).filter(CourseEvent.course_id == course_id).all()
+    return await _schedule(db, Course.id == course_id, start, end, fields)
 
 
-@router.get("/group/{group_id}/events"
-, response_model=list[CourseEventResponse], status_code=HTTP_200_OK)
+@router.get(
+    "/group/{group_id}/events",
+    response_model=list[ScheduleEntry],
+    response_model_exclude_unset=True,
+    status_code=HTTP_200_OK,
+)
 async def get_events_for_group(
     group_id: int,
-    db: Session = Depends(get_db),
+    start: date | None = Query(default=None, description="First day of the window"),
+    end: date | None = Query(default=None, description="Last day of the window"),
+    fields: list[ScheduleField] | None = Query(
+        default=None, description="Fields to return, all by default"
+    ),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
-) -> list[CourseEvent]:
+) -> list[dict]:
     """
-    Get all events for a specific group.
+    Get the schedule of a group, optionally limited to a date window.
+
+    Every row already carries the course name, room name and slot times.
+    Occurrences of weekly series are included.
 
     Args:
         group_id (int): ID of the group
-        db (Session): Database session
+        start (date | None, optional): First day of the window. Defaults to None.
+        end (date | None, optional): Last day of the window. Defaults to None.
+        fields (list[str] | None, optional): Fields to return. Defaults to None.
+        db (AsyncSession): Database session
         current_user (User): Current authenticated user
 
+    Raises:
+        HTTPException: If the window ends before it starts
+
     Returns:
-        list[CourseEvent]: List of events for the specified group
+        list[dict]: Schedule entries ordered by day and start time
     """
-    return (
-        db.query(CourseEvent)
-        .join(Course)
-        .filter(Course.group_id == group_id)
-        .all()
-    )
+    return await _schedule(db, Course.group_id == group_id, start, end, fields)
 
 
 @router.get(
@@ -410,7 +655,7 @@ async def get_events_for_group(
 )
 async def get_course_event(
     course_event_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> CourseEvent:
     """
@@ -418,7 +663,7 @@ async def get_course_event(
 
     Args:
         course_event_id (int): ID of the course event
-        db (Session): Database session
+        db (AsyncSession): Database session
         current_user (User): Current authenticated user
 
     Raises:
@@ -427,11 +672,314 @@ async def get_course_event(
     Returns:
         CourseEvent: The requested course event
     """
-    course_event = (
-        db.query(CourseEvent).filter(CourseEvent.id == course_event_id).first()
+    course_event = await db.scalar(
+        select(CourseEvent).where(CourseEvent.id == course_event_id)
     )
     if not course_event:
         raise HTTPException(
             status_code=HTTP_404_NOT_FOUND, detail="Course event not found"
         )
     return course_event
+
+
+@router.post(
+    "/series", response_model=CourseSeriesResponse, status_code=HTTP_201_CREATED
+)
+def create_series(
+    series: CourseSeriesCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(
+        role_required([UserRole.ADMIN, UserRole.KOORDYNATOR, UserRole.PROWADZACY])
+    ),
+) -> CourseSeries:
+    """
+    Schedule a class held every week in the same room and slot.
+
+    Only the series is stored; its occurrences are expanded when they are read.
+    Every occurrence is checked against the occupancy index and the room's
+    unavailability periods.
+
+    Args:
+        series (CourseSeriesCreate): Series data for creation
+        db (Session): Database session
+        current_user (User): Current authenticated user (must be ADMIN,
+            KOORDYNATOR or PROWADZACY)
+
+    Raises:
+        HTTPException: If the dates or weekday are invalid, if course, room or time
+            slot is not found, or if an occurrence collides with another class or
+            an unavailability period
+
+    Returns:
+        CourseSeries: The created series
+    """
+    if not 0 <= series.weekday <= 6:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail="Weekday must be between 0 (Monday) and 6 (Sunday)",
+        )
+    days = occurrence_days(series.weekday, series.start_date, series.end_date)
+    if not days:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST, detail="The series has no occurrences"
+        )
+
+    course = db.query(Course).filter(Course.id == series.course_id).first()
+    if not course:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Course not found")
+    if not db.query(Room).filter(Room.id == series.room_id).first():
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND, detail="Room does not exist"
+        )
+    if not db.query(TimeSlots).filter(TimeSlots.id == series.time_slot_id).first():
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND, detail="Time slot does not exist"
+        )
+
+    periods = (
+        db.query(RoomUnavailability.start_datetime, RoomUnavailability.end_datetime)
+        .filter(
+            RoomUnavailability.room_id == series.room_id,
+            RoomUnavailability.start_datetime <= days[-1],
+            RoomUnavailability.end_datetime >= days[0],
+        )
+        .all()
+    )
+    for day in days:
+        if any(start <= day <= end for start, end in periods):
+            raise HTTPException(
+                status_code=HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Room unavailable on {day.isoformat()}",
+            )
+        if occupancy_index.is_slot_busy(series.room_id, day, series.time_slot_id):
+            raise HTTPException(
+                status_code=HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Event time on {day.isoformat()} is taken by another event",
+            )
+
+    db_series = CourseSeries(**series.dict())
+    db.add(db_series)
+    touch_groups(db, [course.group_id])
+    record_usage(db, added=expand([db_series]))
+    db.commit()
+    db.refresh(db_series)
+    occupancy_index.add_series(db_series)
+    return db_series
+
+
+@router.get(
+    "/{course_id}/series",
+    response_model=list[CourseSeriesResponse],
+    status_code=HTTP_200_OK,
+)
+async def get_series_for_course(
+    course_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+) -> list[CourseSeries]:
+    """
+    Get all weekly series of a course.
+
+    Args:
+        course_id (int): ID of the course
+        db (AsyncSession): Database session
+        current_user (User): Current authenticated user
+
+    Returns:
+        list[CourseSeries]: Series of the course
+    """
+    series = await db.scalars(
+        select(CourseSeries)
+        .options(raiseload("*"))
+        .where(CourseSeries.course_id == course_id)
+        .order_by(CourseSeries.id)
+    )
+    return series.all()
+
+
+@router.get(
+    "/series/{series_id}/occurrences",
+    response_model=list[OccurrenceResponse],
+    status_code=HTTP_200_OK,
+)
+async def get_series_occurrences(
+    series_id: int,
+    start: date | None = Query(default=None, description="First day of the window"),
+    end: date | None = Query(default=None, description="Last day of the window"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+) -> list[dict]:
+    """
+    Expand the occurrences of a series that are not replaced by an exception.
+
+    Exceptions are regular course events and are listed with the events of
+    the course.
+
+    Args:
+        series_id (int): ID of the series
+        start (date | None, optional): First day of the window. Defaults to None.
+        end (date | None, optional): Last day of the window. Defaults to None.
+        db (AsyncSession): Database session
+        current_user (User): Current authenticated user
+
+    Raises:
+        HTTPException: If the series is not found
+
+    Returns:
+        list[dict]: Occurrences ordered by day
+    """
+    series = await db.scalar(select(CourseSeries).where(CourseSeries.id == series_id))
+    if not series:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Series not found")
+    exceptions = (
+        await db.execute(
+            exceptions_query(start, end).where(CourseEvent.series_id == series_id)
+        )
+    ).all()
+    return [
+        occurrence._asdict()
+        for occurrence in expand([series], set(exceptions), start, end)
+    ]
+
+
+@router.post(
+    "/series/{series_id}/exceptions",
+    response_model=CourseEventResponse,
+    status_code=HTTP_201_CREATED,
+)
+def create_series_exception(
+    series_id: int,
+    exception: CourseSeriesException,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(
+        role_required([UserRole.ADMIN, UserRole.KOORDYNATOR, UserRole.PROWADZACY])
+    ),
+) -> CourseEvent:
+    """
+    Cancel or move one occurrence of a series.
+
+    The occurrence is materialized as a course event linked to the series, so
+    it can later be edited and referenced like any other event.
+
+    Args:
+        series_id (int): ID of the series
+        exception (CourseSeriesException): Day of the occurrence and its changes
+        db (Session): Database session
+        current_user (User): Current authenticated user (must be ADMIN,
+            KOORDYNATOR or PROWADZACY)
+
+    Raises:
+        HTTPException: If the series, room or time slot is not found, if the series
+            does not meet on that day, if the occurrence already has an exception,
+            if the new room is unavailable or if the new time is taken
+
+    Returns:
+        CourseEvent: The event replacing the occurrence
+    """
+    series = db.query(CourseSeries).filter(CourseSeries.id == series_id).first()
+    if not series:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Series not found")
+    if exception.day not in occurrence_days(
+        series.weekday, series.start_date, series.end_date, exception.day, exception.day
+    ):
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND,
+            detail="The series does not meet on that day",
+        )
+    if (
+        db.query(CourseEvent.id)
+        .filter(
+            CourseEvent.series_id == series_id,
+            CourseEvent.series_day == exception.day,
+        )
+        .first()
+    ):
+        raise HTTPException(
+            status_code=HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="The occurrence already has an exception",
+        )
+
+    original = Occurrence(
+        series.id, series.course_id, series.room_id, exception.day, series.time_slot_id
+    )
+    room_id = exception.room_id or series.room_id
+    day = exception.new_day or exception.day
+    time_slot_id = exception.time_slot_id or series.time_slot_id
+    if exception.room_id and not db.query(Room).filter(Room.id == room_id).first():
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND, detail="Room does not exist"
+        )
+    if (
+        exception.time_slot_id
+        and not db.query(TimeSlots).filter(TimeSlots.id == time_slot_id).first()
+    ):
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND, detail="Time slot does not exist"
+        )
+    moved = (room_id, day, time_slot_id) != original[2:]
+    if not exception.canceled and moved:
+        unavailability = (
+            db.query(RoomUnavailability)
+            .filter(
+                RoomUnavailability.room_id == room_id,
+                RoomUnavailability.start_datetime <= day,
+                RoomUnavailability.end_datetime >= day,
+            )
+            .first()
+        )
+        if unavailability:
+            raise HTTPException(
+                status_code=HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Room unavailable in selected time",
+            )
+        _ensure_slot_free(room_id, day, time_slot_id)
+
+    course_event = CourseEvent(
+        course_id=series.course_id,
+        room_id=room_id,
+        day=day,
+        time_slot_id=time_slot_id,
+        canceled=exception.canceled,
+        series_id=series.id,
+        series_day=exception.day,
+    )
+    db.add(course_event)
+    touch_groups(db, [series.course.group_id])
+    record_usage(db, added=[course_event], removed=[original])
+    _commit_event(db)
+    db.refresh(course_event)
+    occupancy_index.remove_event(original)
+    occupancy_index.add_event(course_event)
+    return course_event
+
+
+@router.delete("/series/{series_id}", status_code=HTTP_204_NO_CONTENT)
+def delete_series(
+    series_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(role_required([UserRole.ADMIN, UserRole.KOORDYNATOR])),
+) -> None:
+    """
+    Delete a series together with its exceptions.
+
+    Args:
+        series_id (int): ID of the series to delete
+        db (Session): Database session
+        current_user (User): Current authenticated user (must be ADMIN or KOORDYNATOR)
+
+    Raises:
+        HTTPException: If the series is not found
+    """
+    series = db.query(CourseSeries).filter(CourseSeries.id == series_id).first()
+    if not series:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Series not found")
+    events = [EventSlot.of(event) for event in series.exceptions]
+    exceptions = {(series.id, event.series_day) for event in series.exceptions}
+    events.extend(expand([series], exceptions))
+    touch_groups(db, [series.course.group_id])
+    record_usage(db, removed=events)
+    db.delete(series)
+    db.commit()
+    for event in events:
+        occupancy_index.remove_event(event)
+    return
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
-from database import get_db
+from catalog_cache import bump_versions, catalog_cache
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from database import get_async_db, get_db
 from model import Equipment
 from routers.schemas import EquipmentResponse, EquipmentCreate
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 router = APIRouter(prefix="/equipment", tags=["equipment"])
@@ -13,18 +16,28 @@ def add_equipment(equipment: EquipmentCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Equipment already exists")
     new_equipment = Equipment(name=equipment.name)
     db.add(new_equipment)
+    bump_versions(db, "equipment")
     db.commit()
     db.refresh(new_equipment)
     return new_equipment
 
 @router.get("/", response_model=list[EquipmentResponse])
-def get_all_equipment(db: Session = Depends(get_db)):
-    return db.query(Equipment).all()
+async def get_all_equipment(
+    request: Request, db: AsyncSession = Depends(get_async_db)
+) -> Response:
+    async def load() -> list[Equipment]:
+        return (await db.scalars(select(Equipment))).all()
+
+    return await catalog_cache.respond(
+        request, db, ("equipment",), list[EquipmentResponse], load
+    )
 
 @router.delete("/{equipment_id}", status_code=204)
 def delete_equipment(equipment_id: int, db: Session = Depends(get_db)):
     eq = db.query(Equipment).filter(Equipment.id == equipment_id).first()
     if not eq:
         raise HTTPException(status_code=404, detail="Equipment not found")
+    # Rooms list their equipment
+    bump_versions(db, "equipment", "rooms")
     db.delete(eq)
-    db.commit()
\ No newline at end of file
+    db.commit()
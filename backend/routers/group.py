@@ -1,9 +1,14 @@
 
-from database import get_db
-from fastapi import APIRouter, Depends, HTTPException
+from catalog_cache import bump_versions, catalog_cache
+from database import get_async_db, get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from model import Group, User, UserRole
+from occupancy import occupancy_index
+from pagination import paginate, set_next_cursor
 from routers.auth import role_required, get_current_user
 from routers.schemas import GroupCreate, GroupResponse, GroupUpdate
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from starlette.status import (
     HTTP_200_OK,
@@ -12,61 +17,89 @@ from starlette.status import (
     HTTP_404_NOT_FOUND,
     HTTP_422_UNPROCESSABLE_ENTITY,
 )
+from utilization import course_slots, record_usage
 
 router = APIRouter(prefix="/groups", tags=["groups"])
 
 
 @router.get("/", response_model=list[GroupResponse], status_code=HTTP_200_OK)
 async def get_groups(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(default=None, description="Cursor of the previous page"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
-) -> list[Group]:
+) -> Response:
     """
     Retrieve a paginated list of all groups.
 
+    Answered with 304 when ``If-None-Match`` carries the current ETag.
+
     Args:
         skip (int, optional): Number of records to skip. Defaults to 0.
         limit (int, optional): Maximum number of records to return. Defaults to 10.
-        db (Session): Database session.
+        cursor (str | None, optional): Cursor from the ``X-Next-Cursor`` header of the
+            previous page; when given, ``skip`` is ignored. Defaults to None.
+        request (Request): Incoming request.
+        response (Response): Outgoing response, carries the next page cursor.
+        db (AsyncSession): Database session.
         current_user (User): Current authenticated user (must be ADMIN or KOORDYNATOR).
 
     Returns:
-        list[Group]: List of group objects.
+        Response: JSON list of groups, or 304 if the client's copy is current.
     """
-    groups = db.query(Group).offset(skip).limit(limit).all()
-    return groups
+    order_by = (Group.id,)
+
+    async def load() -> list[Group]:
+        groups = (
+            await db.scalars(paginate(select(Group), order_by, cursor, skip, limit))
+        ).all()
+        set_next_cursor(response, groups, order_by, limit)
+        return groups
+
+    return await catalog_cache.respond(
+        request, db, ("groups",), list[GroupResponse], load, response
+    )
 
 
 @router.get("/{group_id}", status_code=HTTP_200_OK, response_model=GroupResponse)
 async def get_group(
     group_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
-) -> Group:
+) -> Response:
     """
     Retrieve a single group by ID.
 
     Args:
         group_id (int): ID of the group to retrieve.
-        db (Session): Database session.
+        request (Request): Incoming request.
+        db (AsyncSession): Database session.
         current_user (User): Current authenticated user (must be ADMIN or KOORDYNATOR).
 
     Raises:
         HTTPException: If group with the specified ID is not found.
 
     Returns:
-        Group: The requested group object.
+        Response: The requested group, or 304 if the client's copy is current.
     """
-    group = db.query(Group).filter(Group.id == group_id).first()
-    if not group:
-        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Group not found")
-    return group
+
+    async def load() -> Group:
+        group = await db.scalar(select(Group).where(Group.id == group_id))
+        if not group:
+            raise HTTPException(
+                status_code=HTTP_404_NOT_FOUND, detail="Group not found"
+            )
+        return group
+
+    return await catalog_cache.respond(request, db, ("groups",), GroupResponse, load)
 
 
 @router.post("/", status_code=HTTP_201_CREATED, response_model=GroupResponse)
-async def create_group(
+def create_group(
     group: GroupCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(role_required([UserRole.ADMIN, UserRole.KOORDYNATOR])),
@@ -105,13 +138,14 @@ async def create_group(
 
     new_group = Group(**group.dict())
     db.add(new_group)
+    bump_versions(db, "groups")
     db.commit()
     db.refresh(new_group)
     return new_group
 
 
 @router.put("/{group_id}", status_code=HTTP_200_OK, response_model=GroupResponse)
-async def update_group(
+def update_group(
     group_id: int,
     group: GroupUpdate,
     db: Session = Depends(get_db),
@@ -156,13 +190,14 @@ async def update_group(
 
     for key, value in group.dict(exclude_unset=True).items():
         setattr(existing_group, key, value)
+    bump_versions(db, "groups")
     db.commit()
     db.refresh(existing_group)
     return existing_group
 
 
 @router.delete("/{group_id}", status_code=HTTP_204_NO_CONTENT)
-async def delete_group(
+def delete_group(
     group_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(role_required([UserRole.ADMIN, UserRole.KOORDYNATOR])),
@@ -181,5 +216,11 @@ async def delete_group(
     group = db.query(Group).filter(Group.id == group_id).first()
     if not group:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Group not found")
+    # Courses of the group are deleted with it
+    slots = course_slots(group.courses)
+    bump_versions(db, "groups", "courses")
+    record_usage(db, removed=slots)
     db.delete(group)
     db.commit()
+    for slot in slots:
+        occupancy_index.remove_event(slot)
@@ -0,0 +1,41 @@
+"""Status of background jobs."""
+
+from database import get_async_db
+from fastapi import APIRouter, Depends, HTTPException
+from model import Job, User, UserRole
+from routers.auth import get_current_user
+from routers.schemas import JobResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.status import HTTP_200_OK, HTTP_403_FORBIDDEN, HTTP_404_NOT_FOUND
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", status_code=HTTP_200_OK, response_model=JobResponse)
+async def get_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+) -> Job:
+    """
+    Get the status of a background job and, once it has finished, its result.
+
+    Args:
+        job_id (int): ID of the job
+        db (AsyncSession): Database session
+        current_user (User): Current authenticated user (the job's owner or ADMIN)
+
+    Raises:
+        HTTPException: If the job is not found or belongs to another user
+
+    Returns:
+        Job: Status, timestamps and the result or error of the job
+    """
+    job = await db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Job not found")
+    if job.user_id != current_user.id and current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=HTTP_403_FORBIDDEN, detail="Job belongs to another user"
+        )
+    return job
@@ -0,0 +1,98 @@
+"""Server-sent stream of change request and proposal updates."""
+
+from collections.abc import AsyncIterator
+
+from database import get_async_db
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from model import User
+from notifications import broker, stream
+from routers.auth import (
+    STREAM_TOKEN_EXPIRE_SECONDS,
+    authenticate,
+    create_stream_token,
+    get_current_user,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.status import HTTP_200_OK, HTTP_201_CREATED
+
+router = APIRouter(prefix="/notifications", tags=["notifications"])
+
+STREAM_SCOPE = "notifications"
+
+
+@router.post("/token", status_code=HTTP_201_CREATED)
+async def create_notification_token(
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    """
+    Issue a short-lived token for the notification stream.
+
+    ``EventSource`` cannot send the Authorization header, so the stream takes
+    this token in its URL instead of the access token. A client fetches a new
+    one whenever it reconnects.
+
+    Args:
+        current_user (User): Current authenticated user
+
+    Returns:
+        dict: The token and its lifetime in seconds
+    """
+    return {
+        "token": create_stream_token(current_user.email, STREAM_SCOPE),
+        "expires_in": STREAM_TOKEN_EXPIRE_SECONDS,
+    }
+
+
+async def get_stream_user(
+    token: str = Query(description="Token from POST /notifications/token"),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """
+    Get the user of a notification stream token.
+
+    Args:
+        token (str): Stream token from the query string
+        db (AsyncSession): Database session
+
+    Raises:
+        HTTPException: If the token is invalid, expired or not a stream token
+
+    Returns:
+        User: The authenticated user
+    """
+    return await authenticate(token, db, scope=STREAM_SCOPE)
+
+
+@router.get("/stream", status_code=HTTP_200_OK, response_class=StreamingResponse)
+async def get_notification_stream(
+    current_user: User = Depends(get_stream_user),
+) -> StreamingResponse:
+    """
+    Stream change request and proposal status changes of the current user.
+
+    Server-sent events ``change_request``, ``change_request_deleted``,
+    ``proposal`` and ``proposal_deleted`` are pushed as the changes are
+    committed; ``resync`` asks the client to reload after it fell behind.
+
+    Args:
+        current_user (User): User of the stream token in the ``token`` query
+            parameter
+
+    Returns:
+        StreamingResponse: ``text/event-stream`` response open until the client
+            disconnects
+    """
+    user_id = current_user.id
+
+    async def events() -> AsyncIterator[str]:
+        with broker.subscribe(user_id) as subscription:
+            async for chunk in stream(subscription):
+                yield chunk
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Proxies must pass events through as soon as they are written
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,9 +1,13 @@
 
-from database import get_db
-from fastapi import APIRouter, Depends, HTTPException
+from database import get_async_db, get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from model import AvailabilityProposal, ChangeRequest, User, ChangeRequestStatus, UserRole
+from notifications import notify_change_request, notify_proposal
+from pagination import paginate, set_next_cursor
 from routers.auth import get_current_user, role_required
 from routers.schemas import ProposalCreate, ProposalResponse, ProposalUpdate
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from starlette.status import (
     HTTP_200_OK,
@@ -18,9 +22,11 @@ router = APIRouter(prefix="/proposals", tags=["proposals"])
 
 @router.get("/", response_model=list[ProposalResponse], status_code=HTTP_200_OK)
 async def get_proposals(
+    response: Response,
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(default=None, description="Cursor of the previous page"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> list[AvailabilityProposal]:
     """
@@ -29,20 +35,26 @@ async def get_proposals(
     Args:
         skip (int, optional): Number of records to skip. Defaults to 0.
         limit (int, optional): Maximum number of records to return. Defaults to 10.
-        db (Session): Database session.
+        cursor (str | None, optional): Cursor from the ``X-Next-Cursor`` header of the
+            previous page; when given, ``skip`` is ignored. Defaults to None.
+        response (Response): Outgoing response, carries the next page cursor.
+        db (AsyncSession): Database session.
         current_user (User): Current authenticated user.
 
     Returns:
         list[AvailabilityProposal]: List of availability proposals.
     """
-    proposals = db.query(AvailabilityProposal).offset(skip).limit(limit).all()
+    order_by = (AvailabilityProposal.id,)
+    query = paginate(select(AvailabilityProposal), order_by, cursor, skip, limit)
+    proposals = (await db.scalars(query)).all()
+    set_next_cursor(response, proposals, order_by, limit)
     return proposals
 
 
 @router.get("/{proposal_id}", response_model=ProposalResponse, status_code=HTTP_200_OK)
 async def get_proposal(
     proposal_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> AvailabilityProposal:
     """
@@ -50,7 +62,7 @@ async def get_proposal(
 
     Args:
         proposal_id (int): ID of the proposal to retrieve.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
         current_user (User): Current authenticated user.
 
     Raises:
@@ -59,10 +71,8 @@ async def get_proposal(
     Returns:
         AvailabilityProposal: The requested proposal.
     """
-    proposal = (
-        db.query(AvailabilityProposal)
-        .filter(AvailabilityProposal.id == proposal_id)
-        .first()
+    proposal = await db.scalar(
+        select(AvailabilityProposal).where(AvailabilityProposal.id == proposal_id)
     )
     if not proposal:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Proposal not found")
@@ -76,7 +86,7 @@ async def get_proposal(
 )
 async def get_change_request_proposals(
     change_request_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> list[AvailabilityProposal]:
     """
@@ -84,7 +94,7 @@ async def get_change_request_proposals(
 
     Args:
         change_request_id (int): ID of the change request.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
         current_user (User): Current authenticated user.
 
     Raises:
@@ -94,10 +104,12 @@ async def get_change_request_proposals(
         list[AvailabilityProposal]: List of proposals for the specified change request.
     """
     proposals = (
-        db.query(AvailabilityProposal)
-        .filter(AvailabilityProposal.change_request_id == change_request_id)
-        .all()
-    )
+        await db.scalars(
+            select(AvailabilityProposal).where(
+                AvailabilityProposal.change_request_id == change_request_id
+            )
+        )
+    ).all()
     if not proposals:
         raise HTTPException(
             status_code=HTTP_404_NOT_FOUND, detail="Change requests not found"
@@ -106,7 +118,7 @@ async def get_change_request_proposals(
 
 
 @router.post("/", status_code=HTTP_201_CREATED, response_model=ProposalResponse)
-async def create_proposal(
+def create_proposal(
     proposal: ProposalCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -163,13 +175,15 @@ async def create_proposal(
         day=proposal.day,
     )
     db.add(new_proposal)
+    db.flush()
+    notify_proposal(db, new_proposal)
     db.commit()
     db.refresh(new_proposal)
     return new_proposal
 
 
 @router.post("/{proposal_id}/changestatus/leader", response_model=ProposalResponse)
-async def change_status_by_leader(
+def change_status_by_leader(
         proposal_id: int, new_status: bool, db: Session = Depends(get_db), current_user: User = Depends(role_required([UserRole.PROWADZACY]))
 ):
     proposal = db.query(AvailabilityProposal).filter(AvailabilityProposal.id == proposal_id).first()
@@ -177,6 +191,7 @@ async def change_status_by_leader(
         raise HTTPException(status_code=404, detail="Request not found")
 
     request = proposal.change_request
+    previous_status = request.status
     proposal.accepted_by_leader = new_status
 
     if new_status == False:
@@ -184,6 +199,9 @@ async def change_status_by_leader(
     elif proposal.accepted_by_leader and proposal.accepted_by_representative:
         request.status = ChangeRequestStatus.ACCEPTED
 
+    notify_proposal(db, proposal)
+    if request.status != previous_status:
+        notify_change_request(db, request)
     db.commit()
     db.refresh(request)
     db.refresh(proposal)
@@ -191,7 +209,7 @@ async def change_status_by_leader(
 
 
 @router.post("/{proposal_id}/changestatus/representative", response_model=ProposalResponse)
-async def change_status_by_representative(
+def change_status_by_representative(
         proposal_id: int, new_status: bool, db: Session = Depends(get_db), current_user: User = Depends(role_required([UserRole.STAROSTA]))
 ):
     proposal = db.query(AvailabilityProposal).filter(AvailabilityProposal.id == proposal_id).first()
@@ -199,6 +217,7 @@ async def change_status_by_representative(
         raise HTTPException(status_code=404, detail="Request not found")
 
     request = proposal.change_request
+    previous_status = request.status
     proposal.accepted_by_representative = new_status
 
     if new_status == False:
@@ -206,13 +225,16 @@ async def change_status_by_representative(
     elif proposal.accepted_by_leader and proposal.accepted_by_representative:
         request.status = ChangeRequestStatus.ACCEPTED
 
+    notify_proposal(db, proposal)
+    if request.status != previous_status:
+        notify_change_request(db, request)
     db.commit()
     db.refresh(request)
     db.refresh(proposal)
     return proposal
 
 @router.put("/{proposal_id}", response_model=ProposalResponse, status_code=HTTP_200_OK)
-async def update_proposal(
+def update_proposal(
     proposal_id: int,
     proposal: ProposalUpdate,
     db: Session = Depends(get_db),
@@ -247,13 +269,14 @@ async def update_proposal(
     existing_proposal.user_id = proposal.user_id
     existing_proposal.day = proposal.day
     existing_proposal.time_slot_id = proposal.time_slot_id
+    notify_proposal(db, existing_proposal)
     db.commit()
     db.refresh(existing_proposal)
     return existing_proposal
 
 
 @router.delete("/{proposal_id}", status_code=HTTP_204_NO_CONTENT)
-async def delete_proposal(
+def delete_proposal(
     proposal_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -278,6 +301,7 @@ async def delete_proposal(
         raise HTTPException(
             status_code=HTTP_404_NOT_FOUND, detail="Change request not found"
         )
+    notify_proposal(db, existing_proposal, deleted=True)
     db.delete(existing_proposal)
     db.commit()
     return
@@ -0,0 +1,215 @@
+"""Room utilization reports."""
+
+from datetime import date, timedelta
+
+from database import get_async_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from model import Room, RoomType, RoomWeekUsage, TimeSlots, User, UserRole
+from routers.auth import role_required
+from routers.schemas import UtilizationReport, UtilizationWeek
+from sqlalchemy import ColumnElement, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+from utilization import week_of
+
+# Slots of a week are counted on weekdays only
+TEACHING_DAYS = 5
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+
+def _weeks(start: date, end: date) -> tuple[date, date]:
+    if end < start:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail="End date must not be before start date",
+        )
+    return week_of(start), week_of(end)
+
+
+def _room_filters(
+    room_type: RoomType | None, min_capacity: int | None
+) -> list[ColumnElement]:
+    filters = []
+    if room_type is not None:
+        filters.append(Room.type == room_type)
+    if min_capacity is not None:
+        filters.append(Room.capacity >= min_capacity)
+    return filters
+
+
+async def _slots_per_week(db: AsyncSession) -> int:
+    return TEACHING_DAYS * await db.scalar(select(func.count()).select_from(TimeSlots))
+
+
+def _ratio(used: int, available: int) -> float:
+    return round(used / available, 4) if available else 0.0
+
+
+@router.get("/utilization", status_code=HTTP_200_OK, response_model=UtilizationReport)
+async def get_utilization(
+    start: date = Query(..., description="A day of the first week"),
+    end: date = Query(..., description="A day of the last week"),
+    room_type: RoomType | None = Query(default=None, alias="type"),
+    min_capacity: int | None = Query(
+        default=None, description="Minimum number of seats"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(role_required([UserRole.ADMIN, UserRole.KOORDYNATOR])),
+) -> dict:
+    """
+    Report the utilization of every matching room over whole weeks.
+
+    Only the weekly aggregates and the rooms are read, so the cost depends on
+    the number of rooms and weeks, not on the number of events.
+
+    Args:
+        start (date): A day of the first week of the report.
+        end (date): A day of the last week of the report.
+        room_type (RoomType | None, optional): Only rooms of this type, passed as
+            ``type``. Defaults to None.
+        min_capacity (int | None, optional): Minimum room capacity. Defaults to None.
+        db (AsyncSession): Database session.
+        current_user (User): Current authenticated user (must be ADMIN or KOORDYNATOR).
+
+    Raises:
+        HTTPException: If the end date is before the start date.
+
+    Returns:
+        dict: Window, totals and per-room booked, cancelled and seat-slots with
+            the share of available slots in use.
+    """
+    first, last = _weeks(start, end)
+    weeks = (last - first).days // 7 + 1
+    slots_per_week = await _slots_per_week(db)
+    usage = (
+        select(
+            RoomWeekUsage.room_id,
+            func.sum(RoomWeekUsage.booked_slots).label("booked"),
+            func.sum(RoomWeekUsage.canceled_slots).label("canceled"),
+        )
+        .where(RoomWeekUsage.week.between(first, last))
+        .group_by(RoomWeekUsage.room_id)
+        .subquery()
+    )
+    rows = (
+        await db.execute(
+            select(
+                Room.id,
+                Room.name,
+                Room.capacity,
+                Room.type,
+                func.coalesce(usage.c.booked, 0),
+                func.coalesce(usage.c.canceled, 0),
+            )
+            .outerjoin(usage, usage.c.room_id == Room.id)
+            .where(*_room_filters(room_type, min_capacity))
+            .order_by(Room.id)
+        )
+    ).all()
+
+    available = weeks * slots_per_week
+    rooms = [
+        {
+            "id": room_id,
+            "name": name,
+            "capacity": capacity,
+            "type": type_,
+            "booked_slots": booked,
+            "canceled_slots": canceled,
+            "seat_slots": booked * (capacity or 0),
+            "utilization": _ratio(booked, available),
+        }
+        for room_id, name, capacity, type_, booked, canceled in rows
+    ]
+    booked = sum(room["booked_slots"] for room in rooms)
+    seat_slots = sum(room["seat_slots"] for room in rooms)
+    seats = sum(room["capacity"] or 0 for room in rooms)
+    return {
+        "start": first,
+        "end": last + timedelta(days=6),
+        "weeks": weeks,
+        "slots_per_week": slots_per_week,
+        "booked_slots": booked,
+        "canceled_slots": sum(room["canceled_slots"] for room in rooms),
+        "seat_slots": seat_slots,
+        "utilization": _ratio(booked, available * len(rooms)),
+        "weighted_utilization": _ratio(seat_slots, available * seats),
+        "rooms": rooms,
+    }
+
+
+@router.get(
+    "/utilization/weekly",
+    status_code=HTTP_200_OK,
+    response_model=list[UtilizationWeek],
+)
+async def get_weekly_utilization(
+    start: date = Query(..., description="A day of the first week"),
+    end: date = Query(..., description="A day of the last week"),
+    room_type: RoomType | None = Query(default=None, alias="type"),
+    min_capacity: int | None = Query(
+        default=None, description="Minimum number of seats"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(role_required([UserRole.ADMIN, UserRole.KOORDYNATOR])),
+) -> list[dict]:
+    """
+    Report the utilization of all matching rooms week by week.
+
+    Args:
+        start (date): A day of the first week of the report.
+        end (date): A day of the last week of the report.
+        room_type (RoomType | None, optional): Only rooms of this type, passed as
+            ``type``. Defaults to None.
+        min_capacity (int | None, optional): Minimum room capacity. Defaults to None.
+        db (AsyncSession): Database session.
+        current_user (User): Current authenticated user (must be ADMIN or KOORDYNATOR).
+
+    Raises:
+        HTTPException: If the end date is before the start date.
+
+    Returns:
+        list[dict]: One entry per week, weeks without events included.
+    """
+    first, last = _weeks(start, end)
+    filters = _room_filters(room_type, min_capacity)
+    slots_per_week = await _slots_per_week(db)
+    room_count, seats = (
+        await db.execute(
+            select(
+                func.count(Room.id), func.coalesce(func.sum(Room.capacity), 0)
+            ).where(*filters)
+        )
+    ).one()
+    totals = {
+        week: (booked, canceled, seat_slots)
+        for week, booked, canceled, seat_slots in await db.execute(
+            select(
+                RoomWeekUsage.week,
+                func.sum(RoomWeekUsage.booked_slots),
+                func.sum(RoomWeekUsage.canceled_slots),
+                func.sum(RoomWeekUsage.booked_slots * func.coalesce(Room.capacity, 0)),
+            )
+            .join(Room, RoomWeekUsage.room_id == Room.id)
+            .where(RoomWeekUsage.week.between(first, last), *filters)
+            .group_by(RoomWeekUsage.week)
+        )
+    }
+
+    report = []
+    week = first
+    while week <= last:
+        booked, canceled, seat_slots = totals.get(week, (0, 0, 0))
+        report.append(
+            {
+                "week": week,
+                "booked_slots": booked,
+                "canceled_slots": canceled,
+                "seat_slots": seat_slots,
+                "utilization": _ratio(booked, slots_per_week * room_count),
+                "weighted_utilization": _ratio(seat_slots, slots_per_week * seats),
+            }
+        )
+        week += timedelta(weeks=1)
+    return report
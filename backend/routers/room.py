@@ -1,12 +1,36 @@
-from datetime import date, datetime
-
-from database import get_db
-from fastapi import APIRouter, Depends, HTTPException, Query
-from model import CourseEvent, Room, RoomType, RoomUnavailability, UserRole, User, Equipment
+from datetime import date, datetime, timedelta
+from typing import Literal
+
+from calendar_feed import touch_groups_using_room
+from catalog_cache import bump_versions, catalog_cache
+from database import get_async_db, get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from free_grid import encode_rows, free_grid
+from model import (
+    CourseEvent,
+    CourseSeries,
+    Equipment,
+    Room,
+    RoomType,
+    RoomUnavailability,
+    RoomWeekUsage,
+    TimeSlots,
+    User,
+    UserRole,
+)
+from occupancy import occupancy_index
+from pagination import paginate, set_next_cursor
 from routers.auth import get_current_user, role_required
-from routers.schemas import RoomCreate, RoomResponse, RoomUpdate
-from sqlalchemy import not_, or_
-from sqlalchemy.orm import Session
+from routers.schemas import (
+    FreeGridResponse,
+    RoomCreate,
+    RoomResponse,
+    RoomUpdate,
+)
+from series import exceptions_query, expand, series_query
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 from starlette.status import (
     HTTP_200_OK,
     HTTP_201_CREATED,
@@ -17,28 +41,54 @@ from starlette.status import (
 
 router = APIRouter(prefix="/rooms", tags=["rooms"])
 
+# Longest window of the free-slot grid, a little over two months
+MAX_GRID_DAYS = 62
+# Room responses list the equipment of every room
+ROOM_TABLES = ("rooms", "equipment")
+
 
 @router.get("/", status_code=HTTP_200_OK, response_model=list[RoomResponse])
 async def get_rooms(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(default=None, description="Cursor of the previous page"),
+    sort_by: Literal["id", "name"] = Query(default="id", description="Sort key"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
-) -> list[Room]:
+) -> Response:
     """
     Retrieve a paginated list of all rooms.
 
+    Answered with 304 when ``If-None-Match`` carries the current ETag.
+
     Args:
         skip (int, optional): Number of records to skip. Defaults to 0.
         limit (int, optional): Maximum number of records to return. Defaults to 10.
-        db (Session): Database session.
+        cursor (str | None, optional): Cursor from the ``X-Next-Cursor`` header of the
+            previous page; when given, ``skip`` is ignored. Defaults to None.
+        sort_by (str, optional): Sort key, ``id`` or ``name``. Defaults to ``id``.
+        request (Request): Incoming request.
+        response (Response): Outgoing response, carries the next page cursor.
+        db (AsyncSession): Database session.
         current_user (User): Current authenticated user.
 
     Returns:
-        list[Room]: List of room objects.
+        Response: JSON list of rooms, or 304 if the client's copy is current.
     """
-    rooms = db.query(Room).offset(skip).limit(limit).all()
-    return rooms
+    order_by = (Room.id,) if sort_by == "id" else (Room.name, Room.id)
+
+    async def load() -> list[Room]:
+        # selectinload keeps LIMIT on rooms, a join would paginate room/equipment pairs
+        query = select(Room).options(selectinload(Room.equipment))
+        rooms = (await db.scalars(paginate(query, order_by, cursor, skip, limit))).all()
+        set_next_cursor(response, rooms, order_by, limit)
+        return rooms
+
+    return await catalog_cache.respond(
+        request, db, ROOM_TABLES, list[RoomResponse], load, response
+    )
 
 
 @router.get(
@@ -49,7 +99,7 @@ async def get_available_rooms(
     room_type: RoomType,
     start: date = Query(..., description="Start of desired interval"),
     end: date = Query(..., description="End of desired interval"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> list[Room]:
     """
@@ -60,7 +110,7 @@ async def get_available_rooms(
         room_type (RoomType): Type of room required.
         start (date): Start date of the desired interval.
         end (date): End date of the desired interval.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
         current_user (User): Current authenticated user.
 
     Raises:
@@ -79,38 +129,14 @@ async def get_available_rooms(
             status_code=HTTP_400_BAD_REQUEST, detail="Seats must be greater than zero"
         )
 
-    query = db.query(Room).filter(Room.capacity >= seats, Room.type == room_type)
-
-    busy_rooms_subq = (
-        db.query(Room.id)
-        .join(CourseEvent)
-        .filter(
-            CourseEvent.day >= start,
-            CourseEvent.day <= end,
-            CourseEvent.canceled == False,
-        )
-        .distinct()
-        .subquery()
-    )
-
-    unavailable_rooms_subq = (
-        db.query(Room.id)
-        .join(RoomUnavailability)
-        .filter(
-            not_(
-                or_(
-                    RoomUnavailability.end_datetime <= start,
-                    RoomUnavailability.start_datetime >= end,
-                )
-            )
-        )
-        .distinct()
-        .subquery()
+    candidates = await db.scalars(
+        select(Room)
+        .options(selectinload(Room.equipment))
+        .where(Room.capacity >= seats, Room.type == room_type)
     )
-
-    available_rooms = query.filter(
-        Room.id.not_in(busy_rooms_subq), Room.id.not_in(unavailable_rooms_subq)
-    ).all()
+    available_rooms = [
+        room for room in candidates if occupancy_index.is_available(room.id, start, end)
+    ]
 
     return available_rooms
 
@@ -122,7 +148,7 @@ async def get_room_availability(
     room_id: int,
     start: datetime = Query(..., description="Start of desired interval"),
     end: datetime = Query(..., description="End of desired interval"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> dict:
     """
@@ -132,7 +158,7 @@ async def get_room_availability(
         room_id (int): ID of the room to check.
         start (datetime): Start datetime of the interval.
         end (datetime): End datetime of the interval.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
         current_user (User): Current authenticated user.
 
     Raises:
@@ -147,66 +173,171 @@ async def get_room_availability(
             detail="End time must be greater than start time",
         )
 
-    room = db.query(Room).filter(Room.id == room_id).first()
+    room = await db.scalar(select(Room).where(Room.id == room_id))
     if not room:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Room not found")
 
-    is_busy = (
-        db.query(CourseEvent)
-        .filter(
-            CourseEvent.room_id == room_id,
-            CourseEvent.day >= start.date(),
-            CourseEvent.day <= end.date(),
-            CourseEvent.canceled == False,
+    is_busy = occupancy_index.is_busy(room_id, start.date(), end.date())
+    is_unavailable = occupancy_index.is_unavailable(room_id, start, end)
+
+    return {"available": not (is_busy or is_unavailable)}
+
+
+@router.get("/free-grid", status_code=HTTP_200_OK, response_model=FreeGridResponse)
+async def get_free_grid(
+    start: date = Query(..., description="First day of the grid"),
+    end: date = Query(..., description="Last day of the grid, inclusive"),
+    room_type: RoomType | None = Query(default=None, alias="type"),
+    min_capacity: int = Query(default=0, description="Minimum number of seats"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    """
+    Return the free/busy grid of all matching rooms over days and time slots.
+
+    Occupancy of the whole window is loaded with one query each for events,
+    unavailability and weekly series, whatever the number of rooms and days.
+
+    Args:
+        start (date): First day of the grid.
+        end (date): Last day of the grid, inclusive.
+        room_type (RoomType | None, optional): Only rooms of this type, passed as
+            ``type``. Defaults to None.
+        min_capacity (int, optional): Minimum room capacity. Defaults to 0.
+        db (AsyncSession): Database session.
+        current_user (User): Current authenticated user.
+
+    Raises:
+        HTTPException: If the window is empty or longer than ``MAX_GRID_DAYS``.
+
+    Returns:
+        dict: Window, slot IDs and one bitstring per room, ``1`` for a free slot,
+            ordered by day and then by slot.
+    """
+    days = (end - start).days + 1
+    if days < 1:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail="End date must not be before start date",
         )
-        .first()
-        is not None
-    )
+    if days > MAX_GRID_DAYS:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail=f"The grid spans at most {MAX_GRID_DAYS} days",
+        )
+
+    room_filters = [Room.capacity >= min_capacity]
+    if room_type is not None:
+        room_filters.append(Room.type == room_type)
 
-    is_unavailable = (
-        db.query(RoomUnavailability)
-        .filter(
-            RoomUnavailability.room_id == room_id,
-            not_(
-                or_(
-                    RoomUnavailability.end_datetime <= start,
-                    RoomUnavailability.start_datetime >= end,
-                )
-            ),
+    rooms = (
+        await db.execute(
+            select(Room.id, Room.name, Room.capacity)
+            .where(*room_filters)
+            .order_by(Room.id)
         )
-        .first()
-        is not None
-    )
+    ).all()
+    slots = (
+        await db.execute(
+            select(TimeSlots.id, TimeSlots.start_time, TimeSlots.end_time).order_by(
+                TimeSlots.id
+            )
+        )
+    ).all()
+    events = (
+        await db.execute(
+            select(CourseEvent.room_id, CourseEvent.day, CourseEvent.time_slot_id)
+            .join(Room, Room.id == CourseEvent.room_id)
+            .where(
+                *room_filters,
+                CourseEvent.day.between(start, end),
+                ~CourseEvent.canceled,
+            )
+        )
+    ).all()
+    periods = (
+        await db.execute(
+            select(
+                RoomUnavailability.room_id,
+                RoomUnavailability.start_datetime,
+                RoomUnavailability.end_datetime,
+            )
+            .join(Room, Room.id == RoomUnavailability.room_id)
+            .where(
+                *room_filters,
+                RoomUnavailability.start_datetime < end + timedelta(days=1),
+                RoomUnavailability.end_datetime >= start,
+            )
+        )
+    ).all()
 
-    return {"available": not (is_busy or is_unavailable)}
+    series = (
+        await db.execute(
+            series_query(start, end)
+            .join(Room, Room.id == CourseSeries.room_id)
+            .where(*room_filters)
+        )
+    ).all()
+    if series:
+        exceptions = set((await db.execute(exceptions_query(start, end))).all())
+        events.extend(
+            (occurrence.room_id, occurrence.day, occurrence.time_slot_id)
+            for occurrence in expand(series, exceptions, start, end)
+        )
+
+    grid = free_grid([room.id for room in rooms], slots, start, days, events, periods)
+    return {
+        "start": start,
+        "end": end,
+        "slots": [slot.id for slot in slots],
+        "rooms": [
+            {"id": room.id, "name": room.name, "capacity": room.capacity, "free": free}
+            for room, free in zip(rooms, encode_rows(grid))
+        ],
+    }
 
 
 @router.get("/{room_id}", status_code=HTTP_200_OK, response_model=RoomResponse)
 async def get_room(
-    room_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
-) -> Room:
+    room_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+) -> Response:
     """
     Retrieve a single room by its ID.
 
     Args:
         room_id (int): ID of the room to retrieve.
-        db (Session): Database session.
+        request (Request): Incoming request.
+        db (AsyncSession): Database session.
         current_user (User): Current authenticated user.
 
     Raises:
         HTTPException: If room with the specified ID is not found.
 
     Returns:
-        Room: The requested room object.
+        Response: The requested room, or 304 if the client's copy is current.
     """
-    room = db.query(Room).filter(Room.id == room_id).first()
-    if not room:
-        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Room not found")
-    return room
+
+    async def load() -> Room:
+        # A single row, so the equipment is joined instead of fetched separately
+        room = (
+            await db.scalars(
+                select(Room)
+                .options(joinedload(Room.equipment))
+                .where(Room.id == room_id)
+            )
+        ).unique().first()
+        if not room:
+            raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Room not found")
+        return room
+
+    return await catalog_cache.respond(request, db, ROOM_TABLES, RoomResponse, load)
 
 
 @router.post("/", status_code=HTTP_201_CREATED, response_model=RoomResponse)
-async def create_room(
+def create_room(
     room: RoomCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(role_required([UserRole.ADMIN, UserRole.KOORDYNATOR])),
@@ -248,13 +379,14 @@ async def create_room(
         new_room.equipment = equipment_objs
 
     db.add(new_room)
+    bump_versions(db, "rooms")
     db.commit()
     db.refresh(new_room)
     return new_room
 
 
 @router.put("/{room_id}", status_code=HTTP_200_OK, response_model=RoomResponse)
-async def update_room(
+def update_room(
     room_id: int,
     room: RoomUpdate,
     db: Session = Depends(get_db),
@@ -290,6 +422,9 @@ async def update_room(
         duplicate = db.query(Room).filter(Room.name == room.name, Room.id != room_id).first()
         if duplicate:
             raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Room with this name already exists")
+        if room.name != existing_room.name:
+            # Calendar feeds show the room name
+            touch_groups_using_room(db, room_id)
         existing_room.name = room.name
 
     if room.capacity is not None:
@@ -304,13 +439,14 @@ async def update_room(
         equipment_objs = db.query(Equipment).filter(Equipment.id.in_(room.equipment_ids)).all()
         existing_room.equipment = equipment_objs
 
+    bump_versions(db, "rooms")
     db.commit()
     db.refresh(existing_room)
     return existing_room
 
 
 @router.delete("/{room_id}", status_code=HTTP_204_NO_CONTENT)
-async def delete_room(
+def delete_room(
     room_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(role_required([UserRole.ADMIN, UserRole.KOORDYNATOR])),
@@ -329,6 +465,11 @@ async def delete_room(
     room = db.query(Room).filter(Room.id == room_id).first()
     if not room:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Room not found")
+    touch_groups_using_room(db, room_id)
+    bump_versions(db, "rooms")
+    # Deleted explicitly, SQLite does not enforce ON DELETE CASCADE
+    db.execute(delete(RoomWeekUsage).where(RoomWeekUsage.room_id == room_id))
     db.delete(room)
     db.commit()
+    occupancy_index.remove_room(room_id)
     return
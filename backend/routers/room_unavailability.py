@@ -2,6 +2,7 @@
 from database import get_db
 from fastapi import APIRouter, Depends, HTTPException
 from model import Room, RoomUnavailability, UserRole, User
+from occupancy import occupancy_index
 from routers.auth import get_current_user, role_required
 from routers.schemas import (
     RoomUnavailabilityCreate,
@@ -140,6 +141,7 @@ def create_room_unavailability(
     db.add(new_unavailability)
     db.commit()
     db.refresh(new_unavailability)
+    occupancy_index.add_unavailability(new_unavailability)
     return new_unavailability
 
 
@@ -189,6 +191,7 @@ def update_room_unavailability(
     existing_unavailability.end_datetime = unavailability.end_datetime
     db.commit()
     db.refresh(existing_unavailability)
+    occupancy_index.add_unavailability(existing_unavailability)
     return existing_unavailability
 
 
@@ -220,4 +223,5 @@ def delete_room_unavailability(
         )
     db.delete(existing_unavailability)
     db.commit()
+    occupancy_index.remove_unavailability(unavailability_id)
     return
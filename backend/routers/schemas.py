@@ -1,6 +1,6 @@
-from datetime import date, datetime
+from datetime import date, datetime, time
 
-from model import ChangeRequestStatus, RoomType, UserRole
+from model import ChangeRequestStatus, JobStatus, RoomType, UserRole
 from pydantic import BaseModel, EmailStr
 from pydantic.v1 import validator
 
@@ -89,6 +89,25 @@ class RoomResponse(BaseModel):
         orm_mode = True
 
 
+class FreeGridRoom(BaseModel):
+    """Free slots of one room over the grid window."""
+
+    id: int
+    name: str
+    capacity: int
+    # One character per (day, slot), day-major, "1" when the slot is free
+    free: str
+
+
+class FreeGridResponse(BaseModel):
+    """Free slot grid of the matching rooms."""
+
+    start: date
+    end: date
+    slots: list[int]
+    rooms: list[FreeGridRoom]
+
+
 # Group
 class GroupCreate(BaseModel):
     name: str
@@ -130,7 +149,10 @@ class GroupUpdate(BaseModel):
 
 # Change requests
 class ChangeRequestCreate(BaseModel):
-    course_event_id: int
+    # Either an event, or an occurrence of a series given by its day
+    course_event_id: int | None = None
+    series_id: int | None = None
+    series_day: date | None = None
     initiator_id: int  # should be assigned automatically
     status: ChangeRequestStatus
     reason: str
@@ -164,6 +186,17 @@ class ChangeRequestResponse(BaseModel):
         orm_mode = True
 
 
+class ChangeRequestCounts(BaseModel):
+    """
+    Number of change requests related to a user, in total and per status.
+
+    Every status is present, 0 when the user has no request in it.
+    """
+
+    total: int
+    by_status: dict[ChangeRequestStatus, int]
+
+
 # Proposal
 class ProposalCreate(BaseModel):
     change_request_id: int
@@ -220,11 +253,79 @@ class CourseEventUpdate(BaseModel):
 
 
 class CourseEventResponse(CourseEventCreate):
+    id: int
+    series_id: int | None = None
+    series_day: date | None = None
+
+    class Config:
+        orm_mode = True
+
+
+class ScheduleEntry(BaseModel):
+    """
+    Event or series occurrence in a schedule.
+
+    Every field is optional because clients may select a subset of them.
+    """
+
+    id: int | None = None
+    course_id: int | None = None
+    course_name: str | None = None
+    room_id: int | None = None
+    room_name: str | None = None
+    day: date | None = None
+    time_slot_id: int | None = None
+    start_time: time | None = None
+    end_time: time | None = None
+    canceled: bool | None = None
+    # Set for occurrences of a weekly series, which have no ID, and exceptions
+    series_id: int | None = None
+
+
+class CourseSeriesCreate(BaseModel):
+    """Weekly series of a course in one room and slot."""
+
+    course_id: int
+    room_id: int
+    time_slot_id: int
+    # 0 is Monday
+    weekday: int
+    start_date: date
+    end_date: date
+
+
+class CourseSeriesResponse(CourseSeriesCreate):
+    """Stored weekly series."""
+
     id: int
 
     class Config:
+        """Read the fields from ORM objects."""
+
         orm_mode = True
 
+
+class CourseSeriesException(BaseModel):
+    """Cancellation or move of one occurrence of a series."""
+
+    # Day of the occurrence being cancelled or moved
+    day: date
+    canceled: bool = False
+    room_id: int | None = None
+    new_day: date | None = None
+    time_slot_id: int | None = None
+
+
+class OccurrenceResponse(BaseModel):
+    """One expanded occurrence of a series."""
+
+    series_id: int
+    course_id: int
+    room_id: int
+    day: date
+    time_slot_id: int
+
+
 class AvailabilityProposalResponse(BaseModel):
     id: int
     user_id: int
@@ -240,6 +341,7 @@ class ChangeRecomendationResponse(BaseModel):
     recommended_day: date
     recommended_slot_id: int
     recommended_room_id: int
+    score: float | None = None
     source_proposal: AvailabilityProposalResponse | None = None
 
     class Config:
@@ -264,4 +366,63 @@ class RoomUnavailabilityResponse(BaseModel):
     end_datetime: date
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+
+class UtilizationRoom(BaseModel):
+    """Utilization of one room over the report period."""
+
+    id: int
+    name: str
+    capacity: int | None
+    type: RoomType | None
+    booked_slots: int
+    canceled_slots: int
+    # Booked slots times seats
+    seat_slots: int
+    utilization: float
+
+
+class UtilizationReport(BaseModel):
+    """Seat and slot utilization of the rooms over a period."""
+
+    start: date
+    end: date
+    weeks: int
+    slots_per_week: int
+    booked_slots: int
+    canceled_slots: int
+    seat_slots: int
+    utilization: float
+    # Share of all seat-slots in use, large rooms weigh more
+    weighted_utilization: float
+    rooms: list[UtilizationRoom]
+
+
+class UtilizationWeek(BaseModel):
+    """Utilization of all rooms in one week."""
+
+    week: date
+    booked_slots: int
+    canceled_slots: int
+    seat_slots: int
+    utilization: float
+    weighted_utilization: float
+
+
+class JobResponse(BaseModel):
+    """State of a background job and its result once finished."""
+
+    id: int
+    kind: str
+    status: JobStatus
+    result: dict | None = None
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    class Config:
+        """Read the fields from ORM objects."""
+
+        orm_mode = True
@@ -1,9 +1,12 @@
 
-from database import get_db
-from fastapi import APIRouter, Depends, HTTPException
+from database import get_async_db, get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from model import User, UserRole
-from routers.auth import get_password_hash, role_required
+from pagination import paginate, set_next_cursor
+from routers.auth import get_password_hash, principal_cache, role_required
 from routers.schemas import UserCreate, UserResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from starlette.status import (
     HTTP_200_OK,
@@ -18,9 +21,11 @@ router = APIRouter(prefix="/users", tags=["users"])
 
 @router.get("/", response_model=list[UserResponse], status_code=HTTP_200_OK)
 async def get_users(
+    response: Response,
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(default=None, description="Cursor of the previous page"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(role_required([UserRole.ADMIN, UserRole.KOORDYNATOR])),
 ) -> list[User]:
     """
@@ -29,20 +34,27 @@ async def get_users(
     Args:
         skip (int, optional): Number of records to skip. Defaults to 0.
         limit (int, optional): Maximum number of records to return. Defaults to 10.
-        db (Session): Database session.
+        cursor (str | None, optional): Cursor from the ``X-Next-Cursor`` header of the
+            previous page; when given, ``skip`` is ignored. Defaults to None.
+        response (Response): Outgoing response, carries the next page cursor.
+        db (AsyncSession): Database session.
         current_user (User): Current authenticated user (must be ADMIN or KOORDYNATOR).
 
     Returns:
         list[User]: List of user objects.
     """
-    users = db.query(User).offset(skip).limit(limit).all()
+    order_by = (User.id,)
+    users = (
+        await db.scalars(paginate(select(User), order_by, cursor, skip, limit))
+    ).all()
+    set_next_cursor(response, users, order_by, limit)
     return users
 
 
 @router.get("/{user_id}", response_model=UserResponse, status_code=HTTP_200_OK)
 async def get_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(role_required([UserRole.ADMIN, UserRole.KOORDYNATOR])),
 ) -> User:
     """
@@ -50,7 +62,7 @@ async def get_user(
 
     Args:
         user_id (int): ID of the user to retrieve.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
         current_user (User): Current authenticated user (must be ADMIN or KOORDYNATOR).
 
     Raises:
@@ -59,14 +71,14 @@ async def get_user(
     Returns:
         User: The requested user object.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if user is None:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="User not found")
     return user
 
 
 @router.post("/create", response_model=UserResponse, status_code=HTTP_201_CREATED)
-async def create_user(
+def create_user(
     user: UserCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(role_required([UserRole.ADMIN, UserRole.KOORDYNATOR])),
@@ -108,7 +120,7 @@ async def create_user(
 
 
 @router.put("/{user_id}", response_model=UserResponse, status_code=HTTP_200_OK)
-async def update_user(
+def update_user(
     user_id: int,
     user: UserCreate,
     db: Session = Depends(get_db),
@@ -143,6 +155,7 @@ async def update_user(
 
     hashed_password = get_password_hash(user.password)
 
+    previous_email = db_user.email
     db_user.email = user.email
     db_user.password = hashed_password
     db_user.name = user.name
@@ -150,12 +163,14 @@ async def update_user(
     db_user.role = user.role
     db.commit()
     db.refresh(db_user)
+    principal_cache.invalidate(previous_email)
+    principal_cache.invalidate(db_user.email)
 
     return db_user
 
 
 @router.delete("/{user_id}", status_code=HTTP_204_NO_CONTENT)
-async def delete_user(
+def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(role_required([UserRole.ADMIN, UserRole.KOORDYNATOR])),
@@ -175,6 +190,8 @@ async def delete_user(
     if db_user is None:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="User not found")
 
+    email = db_user.email
     db.delete(db_user)
     db.commit()
+    principal_cache.invalidate(email)
     return
@@ -0,0 +1,159 @@
+"""
+Weekly course series and lazy expansion of their occurrences.
+
+A ``CourseSeries`` stands for one class every week between two dates. Its
+occurrences are never stored; every reader expands them for the window it
+needs. Only exceptions are materialized: a ``CourseEvent`` with ``series_id``
+and ``series_day`` replaces the occurrence of that day, either cancelled or
+moved to another room, day or slot, and is read like any other event.
+"""
+
+from collections.abc import Collection, Iterable, Iterator
+from datetime import date, timedelta
+from typing import NamedTuple
+
+from model import CourseEvent, CourseSeries
+from sqlalchemy import Select, select
+
+
+class Occurrence(NamedTuple):
+    """One expanded occurrence, shaped like an event for the occupancy index."""
+
+    series_id: int
+    course_id: int
+    room_id: int
+    day: date
+    time_slot_id: int
+    canceled: bool = False
+
+
+def occurrence_days(
+    weekday: int,
+    first: date,
+    last: date,
+    start: date | None = None,
+    end: date | None = None,
+) -> list[date]:
+    """
+    List the days a weekly series meets, optionally clipped to a window.
+
+    Args:
+        weekday (int): Day of the week, 0 is Monday
+        first (date): First day of the series
+        last (date): Last day of the series, inclusive
+        start (date | None, optional): First day of the window. Defaults to None.
+        end (date | None, optional): Last day of the window. Defaults to None.
+
+    Returns:
+        list[date]: Meeting days in ascending order
+    """
+    if start is not None and start > first:
+        first = start
+    if end is not None and end < last:
+        last = end
+    day = first + timedelta(days=(weekday - first.weekday()) % 7)
+    days = []
+    while day <= last:
+        days.append(day)
+        day += timedelta(weeks=1)
+    return days
+
+
+def weekly_runs(days: Iterable[date]) -> list[list[date]]:
+    """
+    Split days into runs of the same weekday exactly one week apart.
+
+    Args:
+        days (Iterable[date]): Distinct days, in any order
+
+    Returns:
+        list[list[date]]: Runs ordered by their first day, each in ascending order
+    """
+    runs: list[list[date]] = []
+    # The run every weekday is currently extending
+    current: dict[int, list[date]] = {}
+    for day in sorted(days):
+        run = current.get(day.weekday())
+        if run and day - run[-1] == timedelta(weeks=1):
+            run.append(day)
+        else:
+            current[day.weekday()] = run = [day]
+            runs.append(run)
+    return runs
+
+
+def expand(
+    series: Iterable,
+    exceptions: Collection[tuple[int, date]] = (),
+    start: date | None = None,
+    end: date | None = None,
+) -> Iterator[Occurrence]:
+    """
+    Expand series into the occurrences that are not replaced by an exception.
+
+    Args:
+        series (Iterable): ``CourseSeries`` objects or rows with the same fields
+        exceptions (Collection[tuple[int, date]], optional): (series ID, series
+            day) of every exception. Defaults to ().
+        start (date | None, optional): First day of the window. Defaults to None.
+        end (date | None, optional): Last day of the window. Defaults to None.
+
+    Returns:
+        Iterator[Occurrence]: Occurrences in series order, then by day
+    """
+    for item in series:
+        for day in occurrence_days(
+            item.weekday, item.start_date, item.end_date, start, end
+        ):
+            if (item.id, day) not in exceptions:
+                yield Occurrence(
+                    item.id, item.course_id, item.room_id, day, item.time_slot_id
+                )
+
+
+def series_query(start: date | None = None, end: date | None = None) -> Select:
+    """
+    Build the query for series that meet at least once in a window.
+
+    Args:
+        start (date | None, optional): First day of the window. Defaults to None.
+        end (date | None, optional): Last day of the window. Defaults to None.
+
+    Returns:
+        Select: Query returning the fields ``expand`` needs
+    """
+    query = select(
+        CourseSeries.id,
+        CourseSeries.course_id,
+        CourseSeries.room_id,
+        CourseSeries.time_slot_id,
+        CourseSeries.weekday,
+        CourseSeries.start_date,
+        CourseSeries.end_date,
+    )
+    if start is not None:
+        query = query.where(CourseSeries.end_date >= start)
+    if end is not None:
+        query = query.where(CourseSeries.start_date <= end)
+    return query
+
+
+def exceptions_query(start: date | None = None, end: date | None = None) -> Select:
+    """
+    Build the query for the (series ID, series day) pairs of exceptions.
+
+    Args:
+        start (date | None, optional): First day of the window. Defaults to None.
+        end (date | None, optional): Last day of the window. Defaults to None.
+
+    Returns:
+        Select: Query returning (series ID, series day) rows
+    """
+    query = select(CourseEvent.series_id, CourseEvent.series_day).where(
+        CourseEvent.series_id.isnot(None)
+    )
+    if start is not None:
+        query = query.where(CourseEvent.series_day >= start)
+    if end is not None:
+        query = query.where(CourseEvent.series_day <= end)
+    return query
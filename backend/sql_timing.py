@@ -0,0 +1,195 @@
+"""
+Per-request SQL statistics.
+
+Engine event listeners add the duration of every statement to the statistics
+of the request being served, found through a context variable. The ASGI
+middleware exposes them in a ``Server-Timing`` header, writes one structured
+log line per request and warns when a request runs the same statement more
+than ``SQL_REPEAT_THRESHOLD`` times, which usually means an N+1 query pattern.
+"""
+
+import json
+import logging
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext, ExecutionContext
+from sqlalchemy.engine.interfaces import DBAPICursor
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+SQL_TIMING_ENABLED = os.getenv("SQL_TIMING_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+SQL_REPEAT_THRESHOLD = int(os.getenv("SQL_REPEAT_THRESHOLD", "10"))
+
+logger = logging.getLogger("booking.sql")
+
+
+class RequestStats:
+    """SQL statements executed while serving one request."""
+
+    __slots__ = ("statements", "db_seconds", "shapes")
+
+    def __init__(self) -> None:
+        """Start with no statements."""
+        self.statements = 0
+        self.db_seconds = 0.0
+        # SQL text with bind placeholders, so repeated shapes share a key
+        self.shapes: Counter[str] = Counter()
+
+    def most_repeated(self) -> tuple[str, int] | None:
+        """
+        Return the statement run most often, if it exceeds the threshold.
+
+        Returns:
+            tuple[str, int] | None: Statement and count, or None
+        """
+        if not self.shapes:
+            return None
+        statement, count = self.shapes.most_common(1)[0]
+        return (statement, count) if count > SQL_REPEAT_THRESHOLD else None
+
+
+_current: ContextVar[RequestStats | None] = ContextVar(
+    "sql_request_stats", default=None
+)
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: object,
+    context: ExecutionContext,
+    executemany: bool,
+) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("sql_timing_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: object,
+    context: ExecutionContext,
+    executemany: bool,
+) -> None:
+    stats = _current.get()
+    if stats is None:
+        return
+    started = conn.info["sql_timing_started"].pop()
+    stats.statements += 1
+    stats.db_seconds += time.perf_counter() - started
+    stats.shapes[statement] += 1
+
+
+def _handle_error(exception_context: ExceptionContext) -> None:
+    # A failed statement never reaches after_cursor_execute
+    if _current.get() is not None and exception_context.connection is not None:
+        started = exception_context.connection.info.get("sql_timing_started")
+        if started:
+            started.pop()
+
+
+def instrument(engine: Engine) -> None:
+    """
+    Attach the timing listeners to an engine.
+
+    Args:
+        engine (Engine): Engine to instrument; pass ``sync_engine`` of an
+            async engine
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def server_timing(stats: RequestStats, total_seconds: float) -> str:
+    """
+    Format request statistics as a ``Server-Timing`` header value.
+
+    Args:
+        stats (RequestStats): Statistics of the request
+        total_seconds (float): Time spent in the application so far
+
+    Returns:
+        str: Header value
+    """
+    return (
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.statements} statements", '
+        f"app;dur={total_seconds * 1000:.1f}"
+    )
+
+
+class SQLTimingMiddleware:
+    """
+    ASGI middleware collecting SQL statistics for every HTTP request.
+
+    The header is sent with the response start, so statements run while a
+    streaming body is produced only appear in the log line.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Wrap an application.
+
+        Args:
+            app (ASGIApp): The wrapped application
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Collect the statistics of one HTTP request."""
+        if scope["type"] != "http" or not SQL_TIMING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                header = server_timing(stats, time.perf_counter() - started)
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", header.encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self._log(scope, status, stats, time.perf_counter() - started)
+
+    @staticmethod
+    def _log(
+        scope: Scope, status: int, stats: RequestStats, total_seconds: float
+    ) -> None:
+        route = scope.get("route")
+        record = {
+            "method": scope["method"],
+            "path": getattr(route, "path", scope["path"]),
+            "status": status,
+            "statements": stats.statements,
+            "db_ms": round(stats.db_seconds * 1000, 2),
+            "total_ms": round(total_seconds * 1000, 2),
+        }
+        repeated = stats.most_repeated()
+        if repeated is None:
+            logger.info(json.dumps(record))
+            return
+        statement, count = repeated
+        record["repeated_statement"] = " ".join(statement.split())[:500]
+        record["repeated_count"] = count
+        logger.warning(json.dumps(record))
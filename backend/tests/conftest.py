@@ -0,0 +1,166 @@
+"""Fixtures shared by the backend tests."""
+
+import asyncio
+from collections.abc import AsyncIterator, Callable, Iterator
+from datetime import date, datetime, time
+from pathlib import Path
+
+import pytest
+import timetable_import
+from catalog_cache import catalog_cache
+from database import get_async_db, get_db
+from main import app
+from model import (
+    Base,
+    ChangeRequest,
+    Course,
+    CourseEvent,
+    Group,
+    Room,
+    RoomType,
+    TimeSlots,
+    User,
+    UserRole,
+)
+from occupancy import OccupancyIndex
+from routers import courses as courses_router
+from routers import group as group_router
+from routers import room as room_router
+from routers import room_unavailability as room_unavailability_router
+from routers.auth import get_current_user
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session, sessionmaker
+
+
+@pytest.fixture(autouse=True)
+def empty_catalog_cache() -> None:
+    """Empty the catalog body cache before every test."""
+    # Every test database starts at the same versions, so bodies must not leak
+    catalog_cache.clear()
+
+
+@pytest.fixture
+def db(tmp_path: Path) -> Iterator[Session]:
+    """Create a SQLite database and route the request handlers to it."""
+    # One database file shared by the test and the sync and async request handlers
+    path = tmp_path / "test.db"
+    engine = create_engine(
+        f"sqlite:///{path}", connect_args={"check_same_thread": False}
+    )
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    Base.metadata.create_all(engine)
+    make_session = sessionmaker(bind=engine, autoflush=False)
+    make_async_session = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    def get_test_db() -> Iterator[Session]:
+        with make_session() as session:
+            yield session
+
+    async def get_async_test_db() -> AsyncIterator[AsyncSession]:
+        async with make_async_session() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = get_test_db
+    app.dependency_overrides[get_async_db] = get_async_test_db
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, role=UserRole.ADMIN)
+    session: Session = make_session()
+    yield session
+    session.close()
+    app.dependency_overrides.clear()
+    engine.dispose()
+    asyncio.run(async_engine.dispose())
+
+
+@pytest.fixture
+def fresh_index(monkeypatch: pytest.MonkeyPatch) -> OccupancyIndex:
+    """Give the routers and the importer an empty occupancy index."""
+    # The index is a process-wide singleton, filled by every test that writes
+    index = OccupancyIndex()
+    for module in (
+        courses_router,
+        group_router,
+        room_router,
+        room_unavailability_router,
+        timetable_import,
+    ):
+        monkeypatch.setattr(module, "occupancy_index", index)
+    return index
+
+
+def _seed_course(db: Session) -> dict:
+    teacher = User(
+        email="teacher@example.com",
+        password="x",
+        name="John",
+        surname="Smith",
+        role=UserRole.PROWADZACY,
+    )
+    slot = TimeSlots(start_time=time(8), end_time=time(9, 30))
+    room = Room(name="Sala 1", capacity=30, type=RoomType.LABORATORY)
+    db.add_all([teacher, slot, room])
+    db.flush()
+    group = Group(name="Grupa 1", leader_id=teacher.id)
+    course = Course(name="Analiza", teacher=teacher, group=group)
+    db.add(course)
+    db.commit()
+    return {"course_id": course.id, "room_id": room.id, "time_slot_id": slot.id}
+
+
+@pytest.fixture
+def seed_course() -> Callable[[Session], dict]:
+    """
+    Return a function adding a teacher, a time slot, a room and a course.
+
+    It takes the session to write to, so tests on another database than
+    ``db`` can seed as well. The course belongs to a group led by the teacher.
+    """
+    return _seed_course
+
+
+@pytest.fixture
+def change_request(db: Session) -> dict:
+    """
+    Add a change request of the teacher for a course event on 2025-03-03.
+
+    The group is led by a separate STAROSTA user, and a second, free time slot
+    exists for proposals.
+    """
+    ids = _seed_course(db)
+    leader = User(
+        email="leader@example.com",
+        password="x",
+        name="Anna",
+        surname="Nowak",
+        role=UserRole.STAROSTA,
+    )
+    second = TimeSlots(start_time=time(10), end_time=time(11, 30))
+    db.add_all([leader, second])
+    db.flush()
+    course = db.get(Course, ids["course_id"])
+    course.group.leader_id = leader.id
+    request = ChangeRequest(
+        course_event=CourseEvent(
+            course=course,
+            room_id=ids["room_id"],
+            day=date(2025, 3, 3),
+            time_slot_id=ids["time_slot_id"],
+        ),
+        initiator_id=course.teacher_id,
+        reason="x",
+        created_at=datetime(2025, 3, 1),
+    )
+    db.add(request)
+    db.commit()
+    return {
+        "teacher": course.teacher_id,
+        "leader": leader.id,
+        "room": ids["room_id"],
+        "first_slot": ids["time_slot_id"],
+        "second_slot": second.id,
+        "change_request": request.id,
+    }
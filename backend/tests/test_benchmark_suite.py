@@ -0,0 +1,26 @@
+"""Tests of the benchmark suite summary."""
+
+from collections import Counter
+
+from benchmarks.suite import summarize
+
+
+def test_summary_percentiles_and_statuses() -> None:
+    """The summary reports nearest-rank percentiles and status counts."""
+    latencies = [i / 1000 for i in range(1, 101)]
+    summary = summarize(latencies, Counter({200: 99, 404: 1}), elapsed=2.0)
+
+    assert summary["requests"] == 100
+    assert summary["throughput_rps"] == 50.0
+    assert summary["p50_ms"] == 50.0
+    assert summary["p95_ms"] == 95.0
+    assert summary["p99_ms"] == 99.0
+    assert summary["max_ms"] == 100.0
+    assert summary["statuses"] == {"200": 99, "404": 1}
+
+
+def test_percentiles_of_a_single_request() -> None:
+    """Every percentile of a single request is its latency."""
+    summary = summarize([0.004], Counter({200: 1}), elapsed=1.0)
+
+    assert summary["p50_ms"] == summary["p99_ms"] == summary["max_ms"] == 4.0
@@ -0,0 +1,41 @@
+"""Tests of the expiring LRU cache."""
+
+import time
+
+from cache import TTLCache
+
+
+def test_hits_misses_and_expiry() -> None:
+    """Entries are served until they expire and lookups are counted."""
+    cache = TTLCache(max_size=10, ttl=0.05)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    """A full cache evicts the entry used least recently."""
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_invalidate() -> None:
+    """Invalidating removes an entry and ignores unknown keys."""
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
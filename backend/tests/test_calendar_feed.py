@@ -0,0 +1,79 @@
+"""Tests of the iCalendar feed rendering and caching validators."""
+
+from datetime import date, datetime, time, timezone
+
+from calendar_feed import (
+    feed_validators,
+    fold,
+    http_date,
+    is_not_modified,
+    render_event,
+    touch_groups,
+)
+from model import Base, Group, User, UserRole
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+
+def test_event_lines_are_escaped_and_folded() -> None:
+    """Event text is escaped and folded to 75 octets per line."""
+    stamp = datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc)
+    text = render_event(
+        7,
+        date(2025, 3, 3),
+        time(8),
+        time(9, 30),
+        "Analiza; wykład, " + "ż" * 60,
+        "Sala 3.27",
+        True,
+        stamp,
+    )
+    lines = text.split("\r\n")
+
+    assert "DTSTART:20250303T080000" in lines
+    assert "DTSTAMP:20250301T120000Z" in lines
+    assert "STATUS:CANCELLED" in lines
+    assert all(len(line.encode()) <= 75 for line in lines)
+    summary = "".join(lines[5:7]).replace("\r\n ", "")
+    assert summary.startswith("SUMMARY:Analiza\\; wykład\\, ż")
+    assert fold("X" * 80) == "X" * 75 + "\r\n " + "X" * 5 + "\r\n"
+
+
+def test_conditional_request_uses_versions() -> None:
+    """The validators change with the schedule version and match conditions."""
+    updated = datetime(2025, 3, 1, 12, 0, 30, 250000, tzinfo=timezone.utc)
+    etag, last_modified = feed_validators("group-1", "Grupa 1", [(1, 4, updated)])
+    newer, _ = feed_validators("group-1", "Grupa 1", [(1, 5, updated)])
+
+    assert etag != newer
+    assert is_not_modified(etag, None, etag, last_modified)
+    assert is_not_modified(f'W/{etag}, "other"', None, etag, last_modified)
+    assert not is_not_modified(newer, http_date(updated), etag, last_modified)
+    assert is_not_modified(None, http_date(updated), etag, last_modified)
+    assert not is_not_modified(
+        None, "Sat, 01 Mar 2025 12:00:00 GMT", etag, last_modified
+    )
+
+
+def test_touch_groups_bumps_version() -> None:
+    """Touching groups bumps their schedule version."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        leader = User(
+            email="leader@example.com",
+            password="x",
+            name="Anna",
+            surname="Kowalska",
+            role=UserRole.STAROSTA,
+        )
+        db.add(leader)
+        db.flush()
+        group = Group(name="Grupa 1", leader_id=leader.id)
+        db.add(group)
+        db.commit()
+
+        touch_groups(db, [group.id, None])
+        db.commit()
+
+        assert db.scalar(select(Group.schedule_version)) == 2
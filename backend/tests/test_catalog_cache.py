@@ -0,0 +1,58 @@
+"""Tests of the version-based catalog response cache."""
+
+from fastapi.testclient import TestClient
+from main import app
+from model import CatalogVersion, Equipment, Room, RoomType
+from sqlalchemy.orm import Session
+
+
+def test_catalog_reads_are_revalidated_by_version(db: Session) -> None:
+    """Catalog reads answer 304 until a write to one of their tables."""
+    projector = Equipment(name="projector")
+    db.add(
+        Room(
+            name="Sala 1", capacity=30, type=RoomType.LABORATORY, equipment=[projector]
+        )
+    )
+    db.commit()
+    client = TestClient(app)
+
+    first = client.get("/rooms/1")
+    etag = first.headers["ETag"]
+    unchanged = client.get("/rooms/1", headers={"If-None-Match": etag})
+    assert first.json()["equipment"] == [{"id": 1, "name": "projector"}]
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+
+    # Equipment changes show up in room responses
+    client.delete(f"/equipment/{projector.id}")
+    changed = client.get("/rooms/1", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["equipment"] == []
+    assert db.get(CatalogVersion, "equipment").version == 2
+
+
+def test_bodies_are_served_from_cache_until_a_write(db: Session) -> None:
+    """Bodies come from the cache until a write bumps the version."""
+    db.add(Equipment(name="projector"))
+    db.commit()
+    client = TestClient(app)
+
+    first = client.get("/equipment/")
+    # Written behind the application's back, so only the cache can answer
+    db.add(Equipment(name="whiteboard"))
+    db.commit()
+    cached = client.get("/equipment/")
+    client.post("/equipment/", json={"name": "camera"})
+    fresh = client.get("/equipment/")
+
+    assert first.json() == cached.json() == [{"id": 1, "name": "projector"}]
+    assert [item["name"] for item in fresh.json()] == [
+        "projector",
+        "whiteboard",
+        "camera",
+    ]
+    stats = client.get("/admin/catalog-cache").json()
+    assert stats["bodies"]["hits"] == 1
+    assert stats["bodies"]["misses"] == 2
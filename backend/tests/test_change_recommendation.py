@@ -4,9 +4,13 @@ from fastapi.testclient import TestClient
 from main import app
 from model import (
     AvailabilityProposal,
+    ChangeRecomendation,
     ChangeRequest,
     ChangeRequestStatus,
+    Course,
     CourseEvent,
+    Equipment,
+    Group,
     Room,
     RoomType,
     TimeSlots,
@@ -23,10 +27,26 @@ def test_find_common_availability(db: Session):
     now = datetime.now()
 
     # Create users
-    user1 = User(email="user1@test.com", role=UserRole.TEACHER)
-    user2 = User(email="user2@test.com", role=UserRole.TEACHER)
+    user1 = User(
+        email="user1@test.com",
+        password="x",
+        name="Jan",
+        surname="Kowalski",
+        role=UserRole.PROWADZACY,
+    )
+    user2 = User(
+        email="user2@test.com",
+        password="x",
+        name="Anna",
+        surname="Nowak",
+        role=UserRole.STAROSTA,
+    )
     db.add_all([user1, user2])
     db.flush()
+    group = Group(name="Grupa 1", leader_id=user2.id)
+    course = Course(name="Analiza", teacher_id=user1.id, group=group)
+    db.add(course)
+    db.flush()
 
     # Create time slots
     time_slot1 = TimeSlots(
@@ -41,13 +61,18 @@ def test_find_common_availability(db: Session):
     db.flush()
 
     # Create room
-    room = Room(name="Test Room", capacity=30, type=RoomType.LECTURE_HALL)
+    room = Room(
+        name="Test Room",
+        capacity=30,
+        type=RoomType.LECTURE_HALL,
+        equipment=[Equipment(name="projector")],
+    )
     db.add(room)
     db.flush()
 
     # Create course event
     course_event = CourseEvent(
-        course_id=1,
+        course_id=course.id,
         room_id=room.id,
         time_slot_id=time_slot1.id,
         day=(now + timedelta(days=1)).date(),
@@ -62,7 +87,7 @@ def test_find_common_availability(db: Session):
         initiator_id=user1.id,
         status=ChangeRequestStatus.PENDING,
         reason="Test reason",
-        room_requirements="Projector",
+        room_requirements='["projector"]',
         created_at=now,
     )
     db.add(change_request)
@@ -101,6 +126,35 @@ def test_find_common_availability(db: Session):
     assert recommendations[0].recommended_slot_id == time_slot2.id
     assert recommendations[0].recommended_day == (now + timedelta(days=2)).date()
     assert recommendations[0].recommended_room_id == room.id
+    # Exact fit and an early slot; the group has no other class that day
+    assert recommendations[0].score == 1.5
+
+    # Running it again drops the recommendations that are no longer among the
+    # best and refreshes the source proposal of the kept ones
+    recommendations[0].source_proposal_id = proposal2.id
+    stale = ChangeRecomendation(
+        change_request_id=change_request.id,
+        recommended_slot_id=time_slot1.id,
+        recommended_day=(now + timedelta(days=3)).date(),
+        recommended_room_id=room.id,
+        source_proposal_id=proposal1.id,
+        score=0.1,
+    )
+    db.add(stale)
+    db.commit()
+    stale_id = stale.id
+    again = client.post(
+        f"/change_recommendation/common-availability?user1_id={user1.id}&user2_id={user2.id}&change_request_id={change_request.id}"
+    )
+    assert again.status_code == 200
+    assert (
+        db.query(ChangeRecomendation)
+        .filter(ChangeRecomendation.change_request_id == change_request.id)
+        .count()
+    ) == len(recommendations)
+    db.expire_all()
+    assert db.get(ChangeRecomendation, stale_id) is None
+    assert recommendations[0].source_proposal_id == proposal1.id
 
 
 def test_no_common_availability(db: Session):
@@ -108,10 +162,26 @@ def test_no_common_availability(db: Session):
     now = datetime.now()
 
     # Create users
-    user1 = User(email="user1@test.com", role=UserRole.TEACHER)
-    user2 = User(email="user2@test.com", role=UserRole.TEACHER)
+    user1 = User(
+        email="user1@test.com",
+        password="x",
+        name="Jan",
+        surname="Kowalski",
+        role=UserRole.PROWADZACY,
+    )
+    user2 = User(
+        email="user2@test.com",
+        password="x",
+        name="Anna",
+        surname="Nowak",
+        role=UserRole.STAROSTA,
+    )
     db.add_all([user1, user2])
     db.flush()
+    group = Group(name="Grupa 1", leader_id=user2.id)
+    course = Course(name="Analiza", teacher_id=user1.id, group=group)
+    db.add(course)
+    db.flush()
 
     # Create time slots
     time_slot1 = TimeSlots(
@@ -126,13 +196,18 @@ def test_no_common_availability(db: Session):
     db.flush()
 
     # Create room
-    room = Room(name="Test Room", capacity=30, type=RoomType.LECTURE_HALL)
+    room = Room(
+        name="Test Room",
+        capacity=30,
+        type=RoomType.LECTURE_HALL,
+        equipment=[Equipment(name="projector")],
+    )
     db.add(room)
     db.flush()
 
     # Create course event
     course_event = CourseEvent(
-        course_id=1,
+        course_id=course.id,
         room_id=room.id,
         time_slot_id=time_slot1.id,
         day=(now + timedelta(days=1)).date(),
@@ -147,7 +222,7 @@ def test_no_common_availability(db: Session):
         initiator_id=user1.id,
         status=ChangeRequestStatus.PENDING,
         reason="Test reason",
-        room_requirements="Projector",
+        room_requirements='["projector"]',
         created_at=now,
     )
     db.add(change_request)
@@ -0,0 +1,216 @@
+"""Tests of weekly course series and their exceptions."""
+
+from collections.abc import Callable
+from datetime import date, datetime, time, timezone
+
+import pytest
+from calendar_feed import render_series
+from fastapi.testclient import TestClient
+from main import app
+from model import CourseEvent, CourseSeries, Room, RoomUnavailability, User
+from occupancy import OccupancyIndex
+from routers.change_recommendation import available_rooms_query
+from series import Occurrence, expand
+from sqlalchemy.orm import Session
+
+MONDAY = date(2025, 3, 3)
+TUESDAY = date(2025, 3, 4)
+
+pytestmark = pytest.mark.usefixtures("fresh_index")
+
+
+def test_expand_skips_exceptions_and_clips_window() -> None:
+    """Expansion skips the exception days and stops at the window end."""
+    series = CourseSeries(
+        id=1,
+        course_id=2,
+        room_id=3,
+        time_slot_id=4,
+        weekday=0,
+        start_date=date(2025, 3, 1),
+        end_date=date(2025, 3, 31),
+    )
+    occurrences = expand([series], {(1, date(2025, 3, 10))}, end=date(2025, 3, 24))
+
+    assert [occurrence.day for occurrence in occurrences] == [
+        date(2025, 3, 3),
+        date(2025, 3, 17),
+        date(2025, 3, 24),
+    ]
+
+
+def test_exception_frees_an_occurrence(
+    db: Session, seed_course: Callable[[Session], dict]
+) -> None:
+    """Cancelling an occurrence frees its slot for a one-off event."""
+    ids = seed_course(db)
+    client = TestClient(app)
+    series = {**ids, "weekday": 0, "start_date": "2025-03-03", "end_date": "2025-03-17"}
+    one_off = {**ids, "day": "2025-03-10"}
+
+    created = client.post("/courses/series", json=series)
+    clash = client.post("/courses/events", json=one_off)
+    canceled = client.post(
+        f"/courses/series/{created.json()['id']}/exceptions",
+        json={"day": "2025-03-10", "canceled": True},
+    )
+    booked = client.post("/courses/events", json=one_off)
+
+    assert created.status_code == 201
+    assert clash.status_code == 422
+    assert canceled.status_code == 201
+    assert canceled.json()["series_day"] == "2025-03-10"
+    assert booked.status_code == 201
+    assert db.query(CourseEvent).count() == 2
+
+
+def test_exception_cannot_move_into_an_unavailable_room(
+    db: Session, seed_course: Callable[[Session], dict]
+) -> None:
+    """An occurrence cannot be moved into a room while it is unavailable."""
+    ids = seed_course(db)
+    blocked = Room(name="Sala 2", capacity=30)
+    db.add(blocked)
+    db.flush()
+    db.add_all(
+        [
+            RoomUnavailability(
+                room_id=blocked.id,
+                start_datetime=date(2025, 3, 10),
+                end_datetime=date(2025, 3, 10),
+            ),
+            RoomUnavailability(
+                room_id=ids["room_id"],
+                start_datetime=date(2025, 3, 12),
+                end_datetime=date(2025, 3, 14),
+            ),
+        ]
+    )
+    db.commit()
+    client = TestClient(app)
+    series = {**ids, "weekday": 0, "start_date": "2025-03-03", "end_date": "2025-03-17"}
+    url = f"/courses/series/{client.post('/courses/series', json=series).json()['id']}"
+
+    to_blocked_room = client.post(
+        f"{url}/exceptions", json={"day": "2025-03-10", "room_id": blocked.id}
+    )
+    to_blocked_day = client.post(
+        f"{url}/exceptions", json={"day": "2025-03-10", "new_day": "2025-03-12"}
+    )
+    to_free_day = client.post(
+        f"{url}/exceptions", json={"day": "2025-03-10", "new_day": "2025-03-11"}
+    )
+
+    assert to_blocked_room.status_code == 422
+    assert to_blocked_day.status_code == 422
+    assert to_blocked_day.json()["detail"] == "Room unavailable in selected time"
+    assert to_free_day.status_code == 201
+    assert db.query(CourseEvent.day).scalar() == date(2025, 3, 11)
+
+
+def test_change_request_materializes_a_series_occurrence(
+    db: Session, seed_course: Callable[[Session], dict]
+) -> None:
+    """A change request for an occurrence stores it once as an exception."""
+    ids = seed_course(db)
+    series = CourseSeries(
+        **ids, weekday=0, start_date=MONDAY, end_date=date(2025, 3, 17)
+    )
+    db.add(series)
+    db.commit()
+    client = TestClient(app)
+    request = {
+        "initiator_id": db.query(User.id).scalar(),
+        "status": "PENDING",
+        "reason": "x",
+        "room_requirements": "",
+        "minimum_capacity": 0,
+        "created_at": "2025-03-01T00:00:00",
+    }
+    second = {**request, "series_id": series.id, "series_day": "2025-03-10"}
+
+    created = client.post("/change_requests/", json=second)
+    again = client.post("/change_requests/", json=second)
+    off_day = client.post(
+        "/change_requests/", json={**second, "series_day": "2025-03-11"}
+    )
+    neither = client.post("/change_requests/", json=request)
+
+    assert created.status_code == again.status_code == 201
+    assert created.json()["course_event_id"] == again.json()["course_event_id"]
+    assert off_day.status_code == 404
+    assert neither.status_code == 422
+    event = db.get(CourseEvent, created.json()["course_event_id"])
+    assert (event.series_id, event.series_day) == (series.id, date(2025, 3, 10))
+    assert not event.canceled
+
+
+def test_recommendations_skip_rooms_taken_by_a_series(
+    db: Session, seed_course: Callable[[Session], dict]
+) -> None:
+    """The free room search excludes rooms taken by a series occurrence."""
+    ids = seed_course(db)
+    series = CourseSeries(
+        **ids, weekday=MONDAY.weekday(), start_date=MONDAY, end_date=date(2025, 6, 30)
+    )
+    db.add(series)
+    db.commit()
+    intervals = [(ids["time_slot_id"], MONDAY), (ids["time_slot_id"], TUESDAY)]
+
+    assert db.execute(available_rooms_query(intervals)).all() == [(1, ids["room_id"])]
+
+    db.add(
+        CourseEvent(
+            course_id=ids["course_id"],
+            room_id=ids["room_id"],
+            day=MONDAY,
+            time_slot_id=ids["time_slot_id"],
+            canceled=True,
+            series_id=series.id,
+            series_day=MONDAY,
+        )
+    )
+    db.commit()
+    assert len(db.execute(available_rooms_query(intervals)).all()) == 2
+
+
+def test_occupancy_index_loads_series_occurrences(
+    db: Session, seed_course: Callable[[Session], dict]
+) -> None:
+    """Loading the index marks every occurrence of a series as busy."""
+    ids = seed_course(db)
+    db.add(
+        CourseSeries(**ids, weekday=0, start_date=MONDAY, end_date=date(2025, 3, 17))
+    )
+    db.commit()
+    index = OccupancyIndex()
+    index.load(db)
+
+    room_id, slot_id = ids["room_id"], ids["time_slot_id"]
+    second = date(2025, 3, 10)
+
+    assert index.is_slot_busy(room_id, second, slot_id)
+    assert not index.is_slot_busy(room_id, TUESDAY, slot_id)
+    index.remove_event(Occurrence(1, ids["course_id"], room_id, second, slot_id))
+    assert not index.is_slot_busy(room_id, second, slot_id)
+
+
+def test_series_renders_as_recurring_event() -> None:
+    """A series renders as one event with a weekly rule and exclusions."""
+    stamp = datetime(2025, 3, 1, tzinfo=timezone.utc)
+    text = render_series(
+        series_id=7,
+        first_day=MONDAY,
+        last_day=date(2025, 3, 17),
+        start=time(8),
+        end=time(9, 30),
+        summary="Analiza",
+        location="Sala 1",
+        exception_days=[date(2025, 3, 10)],
+        stamp=stamp,
+    )
+
+    assert "UID:series-7@booking-system-agh\r\n" in text
+    assert "DTSTART:20250303T080000\r\n" in text
+    assert "RRULE:FREQ=WEEKLY;UNTIL=20250317T080000\r\n" in text
+    assert "EXDATE:20250310T080000\r\n" in text
@@ -0,0 +1,109 @@
+"""Tests that a room slot can only hold one active event."""
+
+import os
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from database import get_db
+from fastapi.testclient import TestClient
+from main import app
+from model import CourseEvent, User, UserRole
+from routers import courses as courses_router
+from routers.auth import get_current_user
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.usefixtures("fresh_index")
+
+
+def test_second_event_in_the_same_slot_is_rejected(
+    db: Session, seed_course: Callable[[Session], dict]
+) -> None:
+    """A second active event in a taken slot is rejected with 422."""
+    event = {**seed_course(db), "day": "2025-03-03"}
+    client = TestClient(app)
+
+    first = client.post("/courses/events", json=event)
+    second = client.post("/courses/events", json=event)
+    canceled = client.post("/courses/events", json={**event, "canceled": True})
+    # Saving an event in its own slot is not a conflict
+    unchanged = client.put(f"/courses/events/{first.json()['id']}", json=event)
+
+    assert first.status_code == 201
+    assert second.status_code == 422
+    assert second.json() == {"detail": "Event time is taken by another event"}
+    assert canceled.status_code == 201
+    assert unchanged.status_code == 200
+
+
+def test_moving_a_canceled_event_keeps_it_canceled(
+    db: Session, seed_course: Callable[[Session], dict]
+) -> None:
+    """Moving a cancelled event without ``canceled`` keeps it cancelled."""
+    event = {**seed_course(db), "day": "2025-03-03"}
+    client = TestClient(app)
+    active = client.post("/courses/events", json=event)
+    canceled = client.post(
+        "/courses/events", json={**event, "day": "2025-03-04", "canceled": True}
+    )
+
+    # canceled is not sent, so the event stays canceled and may share the slot
+    moved = client.put(
+        f"/courses/events/{canceled.json()['id']}",
+        json={key: event[key] for key in ("room_id", "time_slot_id", "day")},
+    )
+
+    assert active.status_code == 201
+    assert moved.status_code == 200
+    assert moved.json()["canceled"] is True
+    room_id, slot_id = event["room_id"], event["time_slot_id"]
+    assert courses_router.occupancy_index.is_slot_busy(
+        room_id, date(2025, 3, 3), slot_id
+    )
+    assert not courses_router.occupancy_index.is_slot_busy(
+        room_id, date(2025, 3, 4), slot_id
+    )
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+def test_parallel_writers_never_double_book(
+    seed_course: Callable[[Session], dict],
+) -> None:
+    """Concurrent writers racing for one slot book it exactly once."""
+    config = Config(os.path.join(os.path.dirname(__file__), "..", "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", TEST_DATABASE_URL)
+    command.upgrade(config, "head")
+    engine = create_engine(TEST_DATABASE_URL, pool_size=20)
+    make_session = sessionmaker(bind=engine, autoflush=False)
+
+    def get_test_db() -> Iterator[Session]:
+        with make_session() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = get_test_db
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, role=UserRole.ADMIN)
+    try:
+        with make_session() as db:
+            event = {**seed_course(db), "day": "2025-03-03"}
+
+        def post(_: int) -> int:
+            return TestClient(app).post("/courses/events", json=event).status_code
+
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            statuses = list(pool.map(post, range(20)))
+        with make_session() as db:
+            booked = db.scalar(select(func.count()).select_from(CourseEvent))
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+        command.downgrade(config, "base")
+
+    assert statuses.count(201) == 1
+    assert statuses.count(422) == 19
+    assert booked == 1
@@ -0,0 +1,104 @@
+"""Tests that list endpoints load related rows with a fixed number of statements."""
+
+from collections.abc import Callable, Iterator
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from model import CourseEvent, Equipment, Room, RoomType
+from occupancy import OccupancyIndex
+from sqlalchemy import Connection, Engine, event
+from sqlalchemy.orm import Session
+
+
+@pytest.fixture(params=[3, 30])
+def client(
+    request: pytest.FixtureRequest,
+    db: Session,
+    seed_course: Callable[[Session], dict],
+    fresh_index: OccupancyIndex,
+) -> Iterator[tuple[TestClient, list[str], int]]:
+    """Seed one event per room and record every statement the requests run."""
+    ids = seed_course(db)
+    equipment = [Equipment(name="projector"), Equipment(name="whiteboard")]
+    first = db.get(Room, ids["room_id"])
+    first.equipment = equipment
+    rooms = [first] + [
+        Room(
+            name=f"Sala {i}",
+            capacity=30,
+            type=RoomType.LABORATORY,
+            equipment=equipment,
+        )
+        for i in range(2, request.param + 1)
+    ]
+    db.add_all(
+        CourseEvent(
+            course_id=ids["course_id"],
+            room=room,
+            day=date(2025, 3, 3),
+            time_slot_id=ids["time_slot_id"],
+        )
+        for room in rooms
+    )
+    db.commit()
+    statements = []
+
+    def record(conn: Connection, cursor: object, statement: str, *args: object) -> None:
+        statements.append(statement)
+
+    # Requests run on the async engine of ``db``, so every engine is watched
+    event.listen(Engine, "before_cursor_execute", record)
+    yield TestClient(app), statements, request.param
+    event.remove(Engine, "before_cursor_execute", record)
+
+
+@pytest.mark.parametrize(
+    ("url", "expected_statements"),
+    [
+        # catalog versions, rooms and their equipment
+        ("/rooms/?limit=100", 3),
+        ("/rooms/?limit=100&sort_by=name", 3),
+        (
+            "/rooms/check-availability?seats=10&room_type=LABORATORY"
+            "&start=2025-03-01&end=2025-03-31",
+            2,
+        ),
+        ("/rooms/1", 2),
+        # events and weekly series, whatever the number of events
+        ("/courses/group/1/events", 2),
+        ("/courses/1/events?start=2025-03-03&end=2025-03-09", 2),
+    ],
+)
+def test_statement_count_does_not_grow_with_rows(
+    client: tuple[TestClient, list[str], int], url: str, expected_statements: int
+) -> None:
+    """The statement count of an endpoint is the same for 3 and 30 rows."""
+    test_client, statements, rows = client
+    response = test_client.get(url)
+
+    assert response.status_code == 200
+    if isinstance(response.json(), list):
+        assert len(response.json()) == rows
+    assert len(statements) == expected_statements
+
+
+def test_schedule_returns_selected_fields_in_window(
+    client: tuple[TestClient, list[str], int],
+) -> None:
+    """The schedule only returns the selected fields of events in the window."""
+    test_client, _, rows = client
+    response = test_client.get(
+        "/courses/group/1/events",
+        params={
+            "start": "2025-03-03",
+            "end": "2025-03-03",
+            "fields": ["day", "room_name"],
+        },
+    )
+
+    assert response.status_code == 200
+    assert len(response.json()) == rows
+    assert response.json()[0] == {"day": "2025-03-03", "room_name": "Sala 1"}
+    assert test_client.get("/courses/group/1/events?start=2025-03-10").json() == []
@@ -0,0 +1,37 @@
+"""Tests of the bounded executor."""
+
+import asyncio
+import threading
+
+import pytest
+from executor import BoundedExecutor, ExecutorFullError
+
+
+def test_calls_beyond_queue_limit_are_rejected() -> None:
+    """Calls are rejected once the queue is full and the rest complete."""
+    executor = BoundedExecutor(workers=1, max_queue=1, name="test")
+    release = threading.Event()
+
+    async def scenario() -> tuple[bool, str]:
+        first = asyncio.create_task(executor.run(release.wait))
+        while executor.running == 0:
+            await asyncio.sleep(0.001)
+        # The only worker is busy, so the second call waits in the queue
+        second = asyncio.create_task(executor.run(lambda: "done"))
+        await asyncio.sleep(0.01)
+        assert executor.queued == 1
+
+        with pytest.raises(ExecutorFullError):
+            await executor.run(lambda: "rejected")
+
+        release.set()
+        return await first, await second
+
+    assert asyncio.run(scenario()) == (True, "done")
+
+    stats = executor.stats()
+    assert stats["completed"] == 2
+    assert stats["rejected"] == 1
+    assert stats["peak_queued"] == 1
+    assert stats["queued"] == 0
+    assert stats["wait_ms"]["count"] == 2
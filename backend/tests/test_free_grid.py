@@ -0,0 +1,96 @@
+"""Tests of the free slot grid."""
+
+from collections.abc import Callable
+from datetime import date, datetime, time
+
+from fastapi.testclient import TestClient
+from free_grid import encode_rows, free_grid
+from main import app
+from model import CourseEvent, Room, RoomType, RoomUnavailability, TimeSlots
+from sqlalchemy.orm import Session
+
+MONDAY = date(2025, 3, 3)
+
+
+SLOTS = [(1, time(8), time(9, 30)), (2, time(14), time(15, 30))]
+
+
+def test_events_clear_cells_and_unavailability_clears_days() -> None:
+    """Events clear their cell and whole-day unavailability clears the day."""
+    grid = free_grid(
+        room_ids=[4, 7],
+        slots=SLOTS,
+        start=MONDAY,
+        days=3,
+        events=[(7, date(2025, 3, 4), 2)],
+        # starts before the window, covers Monday and Tuesday of room 4
+        periods=[(4, date(2025, 2, 20), date(2025, 3, 4))],
+    )
+
+    assert grid.shape == (2, 3, 2)
+    assert encode_rows(grid) == ["000011", "111011"]
+
+
+def test_part_day_unavailability_only_clears_overlapped_slots() -> None:
+    """Unavailability within a day only clears the slots it overlaps."""
+    grid = free_grid(
+        room_ids=[4],
+        slots=SLOTS,
+        start=MONDAY,
+        days=2,
+        events=[],
+        # the afternoon of Monday, and Tuesday from 9:30 when slot 1 has ended
+        periods=[
+            (4, datetime(2025, 3, 3, 14), datetime(2025, 3, 3, 16)),
+            (4, datetime(2025, 3, 4, 9, 30), datetime(2025, 3, 5)),
+        ],
+    )
+
+    assert encode_rows(grid) == ["1010"]
+
+
+def test_free_grid_endpoint(
+    db: Session, seed_course: Callable[[Session], dict]
+) -> None:
+    """The endpoint filters rooms by capacity and rejects windows that are too long."""
+    ids = seed_course(db)
+    large = Room(name="Sala 2", capacity=60, type=RoomType.LABORATORY)
+    late = TimeSlots(start_time=time(9, 45), end_time=time(11, 15))
+    db.add_all([large, late])
+    db.flush()
+    event = {"course_id": ids["course_id"], "room_id": large.id, "day": MONDAY}
+    db.add_all(
+        [
+            CourseEvent(**event, time_slot_id=late.id),
+            CourseEvent(**event, time_slot_id=ids["time_slot_id"], canceled=True),
+            RoomUnavailability(
+                room_id=large.id,
+                start_datetime=date(2025, 3, 4),
+                end_datetime=date(2025, 3, 4),
+            ),
+            # starts on the last day of the window and runs past it
+            RoomUnavailability(
+                room_id=large.id,
+                start_datetime=date(2025, 3, 5),
+                end_datetime=date(2025, 3, 9),
+            ),
+        ]
+    )
+    db.commit()
+    client = TestClient(app)
+
+    response = client.get(
+        "/rooms/free-grid",
+        params={"start": "2025-03-03", "end": "2025-03-05", "min_capacity": 40},
+    )
+    too_long = client.get(
+        "/rooms/free-grid", params={"start": "2025-03-03", "end": "2025-06-03"}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["slots"] == [1, 2]
+    assert body["rooms"] == [
+        {"id": 2, "name": "Sala 2", "capacity": 60, "free": "100000"}
+    ]
+    assert too_long.status_code == 400
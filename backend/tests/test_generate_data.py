@@ -0,0 +1,51 @@
+"""Tests of the benchmark data generator."""
+
+from datetime import date
+
+import pytest
+from benchmarks.generate_data import Generator, prepare_schema
+from model import ChangeRequest, CourseEvent, CourseSeries
+from sqlalchemy import create_engine, func, select
+
+
+def test_generated_events_never_double_book_a_room(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The generated series and events never put two classes in one slot."""
+    # bcrypt is slow and irrelevant here
+    monkeypatch.setattr("benchmarks.generate_data.get_password_hash", lambda _: "x")
+    engine = create_engine("sqlite://")
+    counts = {
+        "rooms": 3,
+        "users": 100,
+        "groups": 5,
+        "courses": 20,
+        "events": 300,
+        "change_requests": 10,
+    }
+    with engine.begin() as conn:
+        prepare_schema(conn, "sqlite://", reset=False)
+        inserted = Generator(conn, counts, date(2025, 10, 6), seed=1).run()
+
+        cell = (CourseSeries.room_id, CourseSeries.weekday, CourseSeries.time_slot_id)
+        cells = select(*cell).group_by(*cell)
+        distinct_cells = conn.scalar(select(func.count()).select_from(cells.subquery()))
+        series = conn.execute(
+            select(CourseSeries.start_date, CourseSeries.end_date)
+        ).all()
+        canceled = conn.scalar(
+            select(func.count()).where(
+                CourseEvent.canceled, CourseEvent.series_id.is_not(None)
+            )
+        )
+        requested = conn.scalar(
+            select(func.count(ChangeRequest.id))
+            .join(CourseEvent, ChangeRequest.course_event_id == CourseEvent.id)
+            .where(CourseEvent.series_id.is_not(None), ~CourseEvent.canceled)
+        )
+
+    assert inserted["course_series"] == distinct_cells == 20
+    assert sum((end - start).days // 7 + 1 for start, end in series) == 300
+    assert inserted["course_events"] == canceled + 10
+    assert requested == 10
+    assert inserted["availability_proposals"] == 60
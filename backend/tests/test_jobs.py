@@ -0,0 +1,135 @@
+"""Tests of the background job queue."""
+
+import threading
+from datetime import date, datetime, timedelta, timezone
+from time import monotonic, sleep
+
+import pytest
+from fastapi.testclient import TestClient
+from jobs import JobRunner, job_runner
+from main import app
+from model import AvailabilityProposal, ChangeRecomendation, Job, JobStatus
+from sqlalchemy.orm import Session, sessionmaker
+
+client = TestClient(app)
+
+DAY = date(2025, 3, 4)
+
+
+@pytest.fixture
+def runner_db(db: Session, monkeypatch: pytest.MonkeyPatch) -> Session:
+    """Return ``db`` with the job workers opening their sessions on it."""
+    monkeypatch.setattr(job_runner, "session_factory", sessionmaker(bind=db.get_bind()))
+    return db
+
+
+def propose(db: Session, change_request: dict, common: bool) -> dict:
+    """Add the proposals of both users and return the endpoint parameters."""
+    # The teacher proposes the second slot, the leader the same or the first one
+    teacher, leader = change_request["teacher"], change_request["leader"]
+    second = change_request["second_slot"]
+    leader_slot = second if common else change_request["first_slot"]
+    db.add_all(
+        [
+            AvailabilityProposal(
+                change_request_id=change_request["change_request"],
+                user_id=user_id,
+                day=DAY,
+                time_slot_id=slot_id,
+            )
+            for user_id, slot_id in ((teacher, second), (leader, leader_slot))
+        ]
+    )
+    db.commit()
+    return {
+        "user1_id": teacher,
+        "user2_id": leader,
+        "change_request_id": change_request["change_request"],
+        "background": True,
+    }
+
+
+def wait_for(job_id: int) -> dict:
+    """Poll a job until it finishes and return its body."""
+    deadline = monotonic() + 5
+    while monotonic() < deadline:
+        body = client.get(f"/jobs/{job_id}").json()
+        if body["status"] in ("SUCCEEDED", "FAILED"):
+            return body
+        sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_background_recommendations_run_as_a_job(
+    runner_db: Session, change_request: dict
+) -> None:
+    """A background recommendation request is queued and run as a job."""
+    params = propose(runner_db, change_request, common=True)
+
+    response = client.post("/change_recommendation/common-availability", params=params)
+
+    assert response.status_code == 202
+    assert response.json()["status"] == "QUEUED"
+    job = wait_for(response.json()["job_id"])
+    assert job["status"] == "SUCCEEDED"
+    assert job["result"]["recommendations"] == 1
+    assert runner_db.query(ChangeRecomendation).count() == 1
+
+
+def test_failed_job_keeps_the_error(runner_db: Session, change_request: dict) -> None:
+    """A job failing with JobError stores the message as its error."""
+    params = propose(runner_db, change_request, common=False)
+
+    response = client.post("/change_recommendation/common-availability", params=params)
+
+    job = wait_for(response.json()["job_id"])
+    assert job["status"] == "FAILED"
+    assert job["error"] == "No common availability found"
+    assert job["result"] is None
+
+
+def test_jobs_beyond_the_worker_limit_wait_in_the_queue(db: Session) -> None:
+    """Jobs beyond the worker count wait queued and run in order."""
+    runner = JobRunner(workers=1, session_factory=sessionmaker(bind=db.get_bind()))
+    release = threading.Event()
+    runner.register("wait")(
+        lambda db, value: {"value": value} if release.wait(5) else {}
+    )
+
+    jobs = [runner.enqueue(db, "wait", {"value": value}, None) for value in range(3)]
+    while runner.running == 0:
+        sleep(0.001)
+    assert (runner.running, runner.queued) == (1, 2)
+
+    release.set()
+    runner._executor.shutdown(wait=True)
+    db.expire_all()
+    assert [db.get(Job, job.id).status for job in jobs] == [JobStatus.SUCCEEDED] * 3
+    assert [db.get(Job, job.id).result["value"] for job in jobs] == [0, 1, 2]
+    assert runner.stats()["succeeded"] == 3
+
+
+def test_jobs_of_dead_processes_are_requeued(db: Session) -> None:
+    """The sweep requeues and reruns running jobs whose heartbeat stopped."""
+    runner = JobRunner(workers=1, session_factory=sessionmaker(bind=db.get_bind()))
+    runner.register("echo")(lambda db, value: {"value": value})
+    now = datetime.now(timezone.utc)
+    # Both started long ago, only the first one's process stopped beating
+    dead, alive = (
+        Job(
+            kind="echo",
+            params={"value": value},
+            status=JobStatus.RUNNING,
+            started_at=now - timedelta(hours=1),
+            heartbeat_at=heartbeat,
+        )
+        for value, heartbeat in ((1, now - timedelta(minutes=5)), (2, now))
+    )
+    db.add_all([dead, alive])
+    db.commit()
+
+    assert runner.sweep(db) == 1
+    runner._executor.shutdown(wait=True)
+    db.expire_all()
+    assert (dead.status, dead.result) == (JobStatus.SUCCEEDED, {"value": 1})
+    assert alive.status == JobStatus.RUNNING
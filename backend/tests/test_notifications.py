@@ -0,0 +1,129 @@
+"""Tests of the server-sent notifications."""
+
+import asyncio
+from datetime import date
+
+import pytest
+from database import get_async_db
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from main import app
+from model import AvailabilityProposal, User, UserRole
+from notifications import Broker, Subscription, broker, notify_proposal, stream
+from routers.auth import authenticate, create_access_token, get_current_user
+from sqlalchemy.orm import Session
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def ids(db: Session, change_request: dict) -> dict:
+    """Add a proposal of the leader, accepted by the representative."""
+    proposal = AvailabilityProposal(
+        change_request_id=change_request["change_request"],
+        user_id=change_request["leader"],
+        day=date(2025, 3, 4),
+        time_slot_id=change_request["first_slot"],
+        accepted_by_representative=True,
+    )
+    db.add(proposal)
+    db.commit()
+    return {**change_request, "proposal": proposal.id}
+
+
+async def received(subscription: Subscription, count: int) -> list[tuple[str, dict]]:
+    """Wait for the next ``count`` messages of a subscription."""
+    return [await asyncio.wait_for(subscription.queue.get(), 1) for _ in range(count)]
+
+
+def test_accepting_a_proposal_notifies_the_related_users(
+    db: Session, ids: dict
+) -> None:
+    """Accepting a proposal notifies the users of its change request."""
+    app.dependency_overrides[get_current_user] = lambda: User(
+        id=ids["teacher"], role=UserRole.PROWADZACY
+    )
+
+    async def scenario() -> list[tuple[str, dict]]:
+        with broker.subscribe(ids["leader"]) as subscription:
+            response = await asyncio.to_thread(
+                client.post,
+                f"/proposals/{ids['proposal']}/changestatus/leader",
+                params={"new_status": True},
+            )
+            assert response.status_code == 200
+            return await received(subscription, 2)
+
+    proposal, change_request = asyncio.run(scenario())
+
+    assert proposal[0] == "proposal"
+    assert proposal[1]["id"] == ids["proposal"]
+    assert proposal[1]["accepted_by_leader"] is True
+    assert change_request == (
+        "change_request",
+        {"id": ids["change_request"], "course_event_id": 1, "status": "ACCEPTED"},
+    )
+
+
+def test_rolled_back_changes_are_not_published(db: Session, ids: dict) -> None:
+    """Notifications of a rolled back transaction are dropped."""
+
+    async def scenario() -> int:
+        with broker.subscribe(ids["teacher"]) as subscription:
+            proposal = db.get(AvailabilityProposal, ids["proposal"])
+            proposal.accepted_by_leader = True
+            notify_proposal(db, proposal)
+            db.rollback()
+            db.commit()
+            await asyncio.sleep(0)
+            return subscription.queue.qsize()
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_slow_client_is_told_to_resync() -> None:
+    """A client whose queue overflowed gets a resync event."""
+    local = Broker(max_queue=1)
+
+    async def scenario() -> list[str]:
+        with local.subscribe(7) as subscription:
+            for value in range(3):
+                local.publish([7, 8], "proposal", {"id": value})
+            await asyncio.sleep(0)
+            events = stream(subscription, keepalive=0.01)
+            return [await anext(events) for _ in range(4)]
+
+    assert asyncio.run(scenario()) == [
+        ": connected\n\n",
+        'event: proposal\ndata: {"id":0}\n\n',
+        "event: resync\ndata: {}\n\n",
+        ": keepalive\n\n",
+    ]
+    assert local.stats() == {
+        "users": 0,
+        "subscriptions": 0,
+        "published": 3,
+        "delivered": 3,
+    }
+
+
+def test_stream_only_accepts_short_lived_stream_tokens(db: Session, ids: dict) -> None:
+    """The stream only accepts tokens issued for it."""
+    app.dependency_overrides[get_current_user] = lambda: db.get(User, ids["teacher"])
+    stream_token = client.post("/notifications/token").json()["token"]
+    access_token = create_access_token({"sub": "teacher@example.com"})
+
+    async def user_of(token: str, scope: str | None) -> User:
+        sessions = app.dependency_overrides[get_async_db]()
+        try:
+            return await authenticate(token, await anext(sessions), scope)
+        finally:
+            await sessions.aclose()
+
+    assert asyncio.run(user_of(stream_token, "notifications")).id == ids["teacher"]
+    for token, scope in ((stream_token, None), (access_token, "notifications")):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(user_of(token, scope))
+        assert error.value.status_code == 401
+    response = client.get("/notifications/stream", params={"token": access_token})
+    assert response.status_code == 401
@@ -0,0 +1,138 @@
+"""Tests of the in-memory room occupancy index."""
+
+from datetime import date, datetime, time
+
+from model import (
+    Base,
+    Course,
+    CourseEvent,
+    Group,
+    Room,
+    RoomType,
+    RoomUnavailability,
+    TimeSlots,
+    User,
+    UserRole,
+)
+from occupancy import EventSlot, OccupancyIndex
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+
+def test_event_occupies_day_and_slot() -> None:
+    """An event marks its room busy on its day and in its slot only."""
+    index = OccupancyIndex()
+    index.add_event(EventSlot(1, date(2025, 3, 10), 2, False))
+
+    assert index.is_busy(1, date(2025, 3, 10), date(2025, 3, 10))
+    assert index.is_busy(1, date(2025, 3, 1), date(2025, 3, 31))
+    assert not index.is_busy(1, date(2025, 3, 11), date(2025, 3, 20))
+    assert not index.is_busy(2, date(2025, 3, 1), date(2025, 3, 31))
+    assert index.is_slot_busy(1, date(2025, 3, 10), 2)
+    assert not index.is_slot_busy(1, date(2025, 3, 10), 3)
+
+
+def test_earlier_event_rebases_epoch() -> None:
+    """An event before the epoch shifts the day bitsets of every room."""
+    index = OccupancyIndex()
+    index.add_event(EventSlot(1, date(2025, 3, 10), 1, False))
+    index.add_event(EventSlot(2, date(2025, 2, 1), 1, False))
+
+    # Room 1 keeps its day after the day bitsets were shifted
+    assert index.is_busy(1, date(2025, 3, 10), date(2025, 3, 10))
+    assert not index.is_busy(1, date(2025, 2, 1), date(2025, 3, 9))
+    assert index.is_busy(2, date(2025, 1, 1), date(2025, 2, 1))
+
+
+def test_cancelled_and_duplicate_events() -> None:
+    """Cancelled events are ignored and shared slots are reference counted."""
+    index = OccupancyIndex()
+    day = date(2025, 3, 10)
+    index.add_event(EventSlot(1, day, 1, True))
+    assert not index.is_busy(1, day, day)
+
+    # Two events in the same slot: the slot stays busy until both are gone
+    index.add_event(EventSlot(1, day, 1, False))
+    index.add_event(EventSlot(1, day, 1, False))
+    index.remove_event(EventSlot(1, day, 1, False))
+    assert index.is_slot_busy(1, day, 1)
+    index.remove_event(EventSlot(1, day, 1, False))
+    assert not index.is_slot_busy(1, day, 1)
+    assert not index.is_busy(1, day, day)
+
+
+def test_unavailability_overlap_excludes_boundaries() -> None:
+    """Unavailability periods only count when they overlap an interval."""
+    index = OccupancyIndex()
+    period = RoomUnavailability(
+        id=7,
+        room_id=1,
+        start_datetime=date(2025, 3, 10),
+        end_datetime=date(2025, 3, 12),
+    )
+    index.add_unavailability(period)
+
+    assert index.is_unavailable(1, date(2025, 3, 11), date(2025, 3, 20))
+    assert not index.is_unavailable(1, date(2025, 3, 12), date(2025, 3, 20))
+    assert not index.is_unavailable(1, date(2025, 3, 1), date(2025, 3, 10))
+    assert index.is_unavailable(1, datetime(2025, 3, 9, 12), datetime(2025, 3, 10, 8))
+    # A day counts as blocked on both bounds, as in create_event
+    assert index.is_unavailable_on(1, date(2025, 3, 10))
+    assert index.is_unavailable_on(1, date(2025, 3, 12))
+    assert not index.is_unavailable_on(1, date(2025, 3, 13))
+
+    # Updating the period replaces the old interval
+    period.start_datetime = date(2025, 4, 1)
+    period.end_datetime = date(2025, 4, 2)
+    index.add_unavailability(period)
+    assert not index.is_unavailable(1, date(2025, 3, 11), date(2025, 3, 20))
+
+    index.remove_unavailability(7)
+    assert index.is_available(1, date(2025, 3, 1), date(2025, 4, 30))
+
+
+def test_load_from_database() -> None:
+    """Loading skips cancelled events and includes unavailability."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    leader = User(
+        email="leader@test.com",
+        password="x",
+        name="Anna",
+        surname="Kowalska",
+        role=UserRole.STAROSTA,
+    )
+    group = Group(name="Group A", year=1, leader=leader)
+    course = Course(name="Python", teacher=leader, group=group)
+    room = Room(name="Lab 101", capacity=30, type=RoomType.LABORATORY)
+    slot = TimeSlots(start_time=time(8, 0), end_time=time(9, 30))
+    session.add_all([leader, group, course, room, slot])
+    session.flush()
+    session.add_all(
+        [
+            CourseEvent(course=course, room=room, slot_id=slot, day=date(2025, 3, 10)),
+            CourseEvent(
+                course=course,
+                room=room,
+                slot_id=slot,
+                day=date(2025, 3, 17),
+                canceled=True,
+            ),
+            RoomUnavailability(
+                room=room,
+                start_datetime=date(2025, 3, 20),
+                end_datetime=date(2025, 3, 25),
+            ),
+        ]
+    )
+    session.commit()
+
+    index = OccupancyIndex()
+    index.load(session)
+
+    assert index.loaded
+    assert index.is_slot_busy(room.id, date(2025, 3, 10), slot.id)
+    assert index.is_available(room.id, date(2025, 3, 11), date(2025, 3, 19))
+    assert not index.is_available(room.id, date(2025, 3, 11), date(2025, 3, 21))
@@ -0,0 +1,48 @@
+"""Tests of the connection pool statistics."""
+
+import pytest
+from database import TimedQueuePool, pool_status
+from metrics import Histogram
+from sqlalchemy import create_engine, exc
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    """Every bucket counts the observations up to its bound."""
+    histogram = Histogram(bounds_ms=(1, 10))
+    histogram.observe(0.0005)
+    histogram.observe(0.005)
+    histogram.observe(0.5)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 3
+    assert snapshot["buckets"] == {"1": 1, "10": 2, "+Inf": 3}
+    assert snapshot["max_ms"] == 500
+
+
+def test_pool_status_counts_checkouts_and_timeouts() -> None:
+    """The pool status reports checkouts, overflow and timed out callers."""
+    engine = create_engine(
+        "sqlite://",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.01,
+    )
+
+    first = engine.connect()
+    second = engine.connect()
+    status = pool_status(engine)
+    assert status["checked_out"] == 2
+    assert status["overflow"] == 1
+
+    # Pool and overflow are exhausted, the third caller times out
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+
+    first.close()
+    second.close()
+    status = pool_status(engine)
+    assert status["checked_out"] == 0
+    assert status["idle"] == 1
+    assert status["timeouts"] == 1
+    assert status["wait_ms"]["count"] == 3
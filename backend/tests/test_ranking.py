@@ -0,0 +1,50 @@
+"""Tests of the vectorised room ranking."""
+
+from datetime import date, time
+
+import numpy as np
+from ranking import Weights, adjacency, capacity_fit, score, top_k
+
+MONDAY = date(2025, 3, 3)
+
+
+def test_smallest_sufficient_room_fits_best() -> None:
+    """The smallest room that is large enough gets the best capacity fit."""
+    capacities = np.array([30, 60, np.nan, 120], dtype=float)
+
+    assert capacity_fit(capacities, 30).tolist() == [1.0, 0.5, 0.0, 0.25]
+    # Without a requirement the smallest candidate is the need
+    assert capacity_fit(capacities, 0).tolist() == [1.0, 0.5, 0.0, 0.25]
+
+
+def test_adjacency_is_per_day() -> None:
+    """Only slots next to a busy slot on the same day are adjacent."""
+    days = [MONDAY, MONDAY, MONDAY, date(2025, 3, 4)]
+    ranks = np.array([0, 2, 4, 1])
+
+    assert adjacency(days, ranks, [(MONDAY, 1)]).tolist() == [True, True, False, False]
+    assert not adjacency(days, ranks, []).any()
+
+
+def test_adjacency_does_not_cross_days() -> None:
+    """Adjacency keys of consecutive days never collide."""
+    # The last Monday class and the first Tuesday slot are not neighbours
+    tuesday = date(2025, 3, 4)
+
+    assert not adjacency([tuesday], np.array([0]), [(MONDAY, 3)]).any()
+    assert adjacency([tuesday], np.array([0]), [(tuesday, 1)]).all()
+
+
+def test_top_k_keeps_best_candidates_in_order() -> None:
+    """The weighted scores are ranked and cut to the best k."""
+    scores = score(
+        np.array([30, 90, 30], dtype=float),
+        30,
+        [time(9, 30), time(9, 30), time(19, 30)],
+        np.array([False, True, False]),
+        Weights(capacity_fit=1.0, early_end=0.5, adjacency=1.0),
+    )
+
+    assert np.round(scores, 4).tolist() == [1.5, 1.8333, 1.0]
+    assert top_k(scores, 2) == [1, 0]
+    assert top_k(scores, 10) == [1, 0, 2]
@@ -0,0 +1,98 @@
+"""Tests of the change requests related to a user."""
+
+from datetime import date, datetime, time
+
+from fastapi.testclient import TestClient
+from main import app
+from model import (
+    ChangeRequest,
+    ChangeRequestStatus,
+    Course,
+    CourseEvent,
+    Group,
+    Room,
+    TimeSlots,
+    User,
+    UserRole,
+)
+from pagination import encode_cursor
+from routers.auth import get_current_user
+from sqlalchemy.orm import Session
+
+client = TestClient(app)
+
+
+def user(email: str, role: UserRole) -> User:
+    """Build a user with the given email and role."""
+    return User(email=email, password="x", name="Jan", surname="Kowalski", role=role)
+
+
+def test_related_inbox_and_counts(db: Session) -> None:
+    """The inbox lists related requests by page and counts them by status."""
+    me = user("me@example.com", UserRole.PROWADZACY)
+    other = user("other@example.com", UserRole.PROWADZACY)
+    leader = user("leader@example.com", UserRole.STAROSTA)
+    slot = TimeSlots(start_time=time(8), end_time=time(9, 30))
+    room = Room(name="Sala 1", capacity=30)
+    db.add_all([me, other, leader, slot, room])
+    db.flush()
+    my_group = Group(name="Grupa 1", leader_id=me.id)
+    other_group = Group(name="Grupa 2", leader_id=leader.id)
+    events = [
+        CourseEvent(
+            course=Course(name=f"Kurs {index}", teacher=teacher, group=group),
+            room_id=room.id,
+            day=date(2025, 3, 3 + index),
+            time_slot_id=slot.id,
+        )
+        for index, (teacher, group) in enumerate(
+            [(me, other_group), (other, my_group), (other, other_group)]
+        )
+    ]
+    requests = [
+        # Taught by me and initiated by me, listed once
+        (events[0], me, ChangeRequestStatus.PENDING),
+        # In a group I lead
+        (events[1], other, ChangeRequestStatus.ACCEPTED),
+        # Initiated by me
+        (events[2], me, ChangeRequestStatus.PENDING),
+        # Unrelated
+        (events[2], other, ChangeRequestStatus.PENDING),
+    ]
+    db.add_all(
+        ChangeRequest(
+            course_event=event,
+            initiator_id=initiator.id,
+            status=status,
+            reason="x",
+            room_requirements="",
+            created_at=datetime(2025, 3, 1),
+        )
+        for event, initiator, status in requests
+    )
+    db.commit()
+    app.dependency_overrides[get_current_user] = lambda: User(
+        id=me.id, role=UserRole.PROWADZACY
+    )
+
+    related = client.get("/change_requests/related")
+    pending = client.get("/change_requests/related", params={"status": "PENDING"})
+    first_page = client.get("/change_requests/related", params={"limit": 2})
+    next_page = client.get(
+        "/change_requests/related",
+        params={"limit": 2, "cursor": first_page.headers["X-Next-Cursor"]},
+    )
+    counts = client.get("/change_requests/related/counts")
+    crafted = client.get(
+        "/change_requests/related", params={"cursor": encode_cursor(["x"])}
+    )
+
+    assert [request["id"] for request in related.json()] == [1, 2, 3]
+    assert [request["id"] for request in pending.json()] == [1, 3]
+    assert [request["id"] for request in first_page.json()] == [1, 2]
+    assert [request["id"] for request in next_page.json()] == [3]
+    assert crafted.status_code == 400
+    assert counts.json() == {
+        "total": 3,
+        "by_status": {"PENDING": 2, "ACCEPTED": 1, "REJECTED": 0, "CANCELLED": 0},
+    }
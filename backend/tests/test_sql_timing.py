@@ -0,0 +1,51 @@
+"""Tests of the per-request SQL timing middleware."""
+
+import json
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sql_timing import SQL_REPEAT_THRESHOLD, SQLTimingMiddleware, instrument
+from sqlalchemy import create_engine, text
+
+engine = create_engine("sqlite://")
+instrument(engine)
+
+app = FastAPI()
+app.add_middleware(SQLTimingMiddleware)
+
+
+@app.get("/items/{count}")
+def run_queries(count: int) -> dict:
+    """Run ``count`` statements from a sync handler."""
+    # A sync handler runs in the threadpool, the statistics must still be found
+    with engine.connect() as conn:
+        for i in range(count):
+            conn.execute(text("SELECT :value"), {"value": i})
+    return {"ok": True}
+
+
+def test_server_timing_counts_statements(caplog: pytest.LogCaptureFixture) -> None:
+    """The header and the log line report the statements of a request."""
+    client = TestClient(app)
+    with caplog.at_level(logging.INFO, logger="booking.sql"):
+        response = client.get("/items/3")
+
+    assert 'desc="3 statements"' in response.headers["server-timing"]
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["path"] == "/items/{count}"
+    assert record["statements"] == 3
+    assert caplog.records[-1].levelno == logging.INFO
+
+
+def test_repeated_statement_is_flagged(caplog: pytest.LogCaptureFixture) -> None:
+    """A statement repeated past the threshold is logged as a warning."""
+    client = TestClient(app)
+    with caplog.at_level(logging.INFO, logger="booking.sql"):
+        client.get(f"/items/{SQL_REPEAT_THRESHOLD + 1}")
+
+    assert caplog.records[-1].levelno == logging.WARNING
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["repeated_count"] == SQL_REPEAT_THRESHOLD + 1
+    assert record["repeated_statement"] == "SELECT ?"
@@ -0,0 +1,217 @@
+"""Tests of the bulk timetable import."""
+
+import io
+from datetime import date, time
+
+from model import (
+    Base,
+    Course,
+    CourseEvent,
+    CourseSeries,
+    Group,
+    Room,
+    RoomUnavailability,
+    TimeSlots,
+    User,
+    UserRole,
+)
+from occupancy import occupancy_index
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from timetable_import import TimetableImporter, read_records
+
+TIMETABLE = """course,teacher_email,group,room,day,start_time,end_time,room_capacity
+Analiza,teacher@example.com,Grupa 1,Sala 1,2025-03-03,08:00,09:30,30
+Algebra,teacher@example.com,Grupa 1,Sala 1,2025-03-03,09:45,11:15,
+Fizyka,teacher@example.com,Grupa 1,Sala 1,2025-03-03,08:00,09:30,
+Chemia,nobody@example.com,Grupa 1,Sala 2,2025-03-03,08:00,09:30,
+Analiza,teacher@example.com,Grupa 1,Sala 2,2025-03-10,not a time,09:30,
+"""
+
+
+def test_import_skips_conflicts_and_creates_missing_objects() -> None:
+    """Conflicting and invalid records are skipped, missing objects created."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        teacher = User(
+            email="teacher@example.com",
+            password="x",
+            name="John",
+            surname="Smith",
+            role=UserRole.PROWADZACY,
+        )
+        db.add(teacher)
+        db.flush()
+        db.add(Group(name="Grupa 1", leader_id=teacher.id))
+        db.commit()
+        occupancy_index.load(db)
+
+        importer = TimetableImporter(db, chunk_size=1)
+        report = importer.run(read_records(io.StringIO(TIMETABLE), "csv")).as_dict()
+
+        assert report["imported"] == 2
+        assert report["skipped"] == 3
+        assert [error["line"] for error in report["errors"]] == [4, 5, 6]
+        assert report["created_rooms"] == 1
+        assert report["created_slots"] == 2
+        assert report["created_courses"] == 2
+        assert db.scalar(select(func.count(CourseEvent.id))) == 2
+        assert db.scalar(select(Room.capacity).where(Room.name == "Sala 1")) == 30
+
+        room_id = db.scalar(select(Room.id).where(Room.name == "Sala 1"))
+        assert occupancy_index.is_slot_busy(room_id, importer.taken.pop().day, 1)
+        occupancy_index.load(db)
+
+
+def test_import_skips_slots_booked_behind_the_index_and_non_teachers() -> None:
+    """Slots taken by another process and non-teachers are rejected."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        teacher = User(
+            email="teacher@example.com",
+            password="x",
+            name="John",
+            surname="Smith",
+            role=UserRole.PROWADZACY,
+        )
+        leader = User(
+            email="leader@example.com",
+            password="x",
+            name="Anna",
+            surname="Nowak",
+            role=UserRole.STAROSTA,
+        )
+        db.add_all([teacher, leader])
+        db.flush()
+        group = Group(name="Grupa 1", leader_id=leader.id)
+        room = Room(name="Sala 1", capacity=30)
+        slot = TimeSlots(start_time=time(8), end_time=time(9, 30))
+        db.add_all([group, room, slot])
+        db.flush()
+        course = Course(name="Analiza", teacher_id=teacher.id, group_id=group.id)
+        db.add(course)
+        db.flush()
+        occupancy_index.load(db)
+        # Booked by another process, so this process's index does not know it
+        db.add(
+            CourseEvent(course=course, room=room, day=date(2025, 3, 3), slot_id=slot)
+        )
+        db.commit()
+
+        timetable = (
+            "course,teacher_email,group,room,day,start_time,end_time\n"
+            "Analiza,teacher@example.com,Grupa 1,Sala 1,2025-03-10,08:00,09:30\n"
+            "Analiza,teacher@example.com,Grupa 1,Sala 1,2025-03-03,08:00,09:30\n"
+            "Algebra,leader@example.com,Grupa 1,Sala 2,2025-03-03,08:00,09:30\n"
+        )
+        importer = TimetableImporter(db, chunk_size=2)
+        report = importer.run(read_records(io.StringIO(timetable), "csv")).as_dict()
+
+        assert (report["imported"], report["skipped"]) == (1, 2)
+        assert report["errors"] == [
+            {"line": 4, "reason": "User leader@example.com is not a teacher"},
+            {"line": 3, "reason": "Event time is taken by another event"},
+        ]
+        assert report["created_rooms"] == 0
+        assert db.scalar(select(func.count(CourseEvent.id))) == 2
+        occupancy_index.load(db)
+
+
+def test_weekly_records_are_imported_as_series() -> None:
+    """Weekly runs of a record become series, lone days stay events."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        teacher = User(
+            email="teacher@example.com",
+            password="x",
+            name="John",
+            surname="Smith",
+            role=UserRole.PROWADZACY,
+        )
+        db.add(teacher)
+        db.flush()
+        db.add(Group(name="Grupa 1", leader_id=teacher.id))
+        db.commit()
+        occupancy_index.load(db)
+
+        # Four Mondays with a week off, one Wednesday
+        days = ["2025-03-03", "2025-03-10", "2025-03-24", "2025-03-31", "2025-03-05"]
+        header = "course,teacher_email,group,room,day,start_time,end_time\n"
+        timetable = header + "".join(
+            f"Analiza,teacher@example.com,Grupa 1,Sala 1,{day},08:00,09:30\n"
+            for day in days
+        )
+        importer = TimetableImporter(db, chunk_size=1)
+        report = importer.run(read_records(io.StringIO(timetable), "csv")).as_dict()
+
+        assert (report["imported"], report["created_series"]) == (5, 2)
+        series = db.execute(
+            select(CourseSeries.start_date, CourseSeries.end_date).order_by(
+                CourseSeries.start_date
+            )
+        ).all()
+        assert series == [
+            (date(2025, 3, 3), date(2025, 3, 10)),
+            (date(2025, 3, 24), date(2025, 3, 31)),
+        ]
+        assert db.scalars(select(CourseEvent.day)).all() == [date(2025, 3, 5)]
+        room_id = db.scalar(select(Room.id))
+        occupancy_index.load(db)
+        assert all(
+            occupancy_index.is_slot_busy(room_id, date.fromisoformat(day), 1)
+            for day in days
+        )
+
+
+def test_import_skips_days_of_room_unavailability() -> None:
+    """Days inside a room unavailability period, ends included, are skipped."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        teacher = User(
+            email="teacher@example.com",
+            password="x",
+            name="John",
+            surname="Smith",
+            role=UserRole.PROWADZACY,
+        )
+        room = Room(name="Sala 1", capacity=30)
+        db.add_all([teacher, room])
+        db.flush()
+        db.add(Group(name="Grupa 1", leader_id=teacher.id))
+        # A one-day block and a block starting on the day of an event
+        db.add_all(
+            [
+                RoomUnavailability(
+                    room=room,
+                    start_datetime=date(2025, 3, 3),
+                    end_datetime=date(2025, 3, 3),
+                ),
+                RoomUnavailability(
+                    room=room,
+                    start_datetime=date(2025, 3, 5),
+                    end_datetime=date(2025, 3, 7),
+                ),
+            ]
+        )
+        db.commit()
+        occupancy_index.load(db)
+
+        days = ["2025-03-03", "2025-03-05", "2025-03-07", "2025-03-04"]
+        header = "course,teacher_email,group,room,day,start_time,end_time\n"
+        timetable = header + "".join(
+            f"Analiza,teacher@example.com,Grupa 1,Sala 1,{day},08:00,09:30\n"
+            for day in days
+        )
+        importer = TimetableImporter(db, chunk_size=10)
+        report = importer.run(read_records(io.StringIO(timetable), "csv")).as_dict()
+
+        assert (report["imported"], report["skipped"]) == (1, 3)
+        assert {error["reason"] for error in report["errors"]} == {
+            "Room unavailable in selected time"
+        }
+        assert db.scalars(select(CourseEvent.day)).all() == [date(2025, 3, 4)]
+        occupancy_index.load(db)
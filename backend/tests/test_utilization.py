@@ -0,0 +1,135 @@
+"""Tests of the weekly room utilization aggregates and report."""
+
+from collections.abc import Callable
+from datetime import date, time
+
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from model import Room, RoomType, RoomWeekUsage, TimeSlots
+from sqlalchemy.orm import Session
+from utilization import rebuild
+
+MONDAY = date(2025, 3, 3)
+
+pytestmark = pytest.mark.usefixtures("fresh_index")
+
+
+def add_lecture_hall(db: Session) -> None:
+    """Add a room and a time slot next to the ones of ``seed_course``."""
+    db.add_all(
+        [
+            TimeSlots(start_time=time(8), end_time=time(9, 30)),
+            Room(name="Aula", capacity=90, type=RoomType.LECTURE_HALL),
+        ]
+    )
+    db.commit()
+
+
+def usage(db: Session) -> list[tuple]:
+    """Return the non-empty usage rows as tuples."""
+    db.expire_all()
+    return [
+        (row.room_id, row.week, row.booked_slots, row.canceled_slots)
+        for row in db.query(RoomWeekUsage).order_by(
+            RoomWeekUsage.room_id, RoomWeekUsage.week
+        )
+        if row.booked_slots or row.canceled_slots
+    ]
+
+
+def test_incremental_aggregates_match_a_rebuild(
+    db: Session, seed_course: Callable[[Session], dict]
+) -> None:
+    """The aggregates kept by the write paths equal a rebuild from scratch."""
+    ids = seed_course(db)
+    add_lecture_hall(db)
+    client = TestClient(app)
+
+    event = client.post("/courses/events", json={**ids, "day": "2025-03-04"}).json()
+    client.post("/courses/events", json={**ids, "day": "2025-03-05", "canceled": True})
+    client.put(
+        f"/courses/events/{event['id']}",
+        json={**ids, "room_id": 2, "day": "2025-03-11"},
+    )
+    series = client.post(
+        "/courses/series",
+        json={
+            **ids,
+            "weekday": 0,
+            "start_date": "2025-03-03",
+            "end_date": "2025-03-17",
+        },
+    ).json()
+    client.post(
+        f"/courses/series/{series['id']}/exceptions",
+        json={"day": "2025-03-10", "canceled": True},
+    )
+    incremental = usage(db)
+    rebuild(db)
+    db.commit()
+
+    assert incremental == usage(db)
+    assert incremental == [
+        (1, MONDAY, 1, 1),
+        (1, date(2025, 3, 10), 0, 1),
+        (1, date(2025, 3, 17), 1, 0),
+        (2, date(2025, 3, 10), 1, 0),
+    ]
+
+    client.delete(f"/courses/series/{series['id']}")
+    assert usage(db) == [(1, MONDAY, 0, 1), (2, date(2025, 3, 10), 1, 0)]
+
+
+def test_report_reads_weekly_aggregates(
+    db: Session, seed_course: Callable[[Session], dict]
+) -> None:
+    """The report is computed from the weekly aggregates."""
+    seed_course(db)
+    add_lecture_hall(db)
+    db.add_all(
+        [
+            RoomWeekUsage(room_id=1, week=MONDAY, booked_slots=5, canceled_slots=1),
+            RoomWeekUsage(room_id=2, week=date(2025, 3, 10), booked_slots=2),
+        ]
+    )
+    db.commit()
+    client = TestClient(app)
+    params = {"start": "2025-03-05", "end": "2025-03-12"}
+
+    report = client.get("/reports/utilization", params=params).json()
+    weekly = client.get("/reports/utilization/weekly", params=params).json()
+    halls = client.get(
+        "/reports/utilization", params={**params, "type": "LECTURE_HALL"}
+    )
+
+    # Two slots on five days over two weeks, for each of the two rooms
+    assert (report["start"], report["end"], report["slots_per_week"]) == (
+        "2025-03-03",
+        "2025-03-16",
+        10,
+    )
+    assert report["rooms"][0]["utilization"] == 0.25
+    assert report["rooms"][1]["seat_slots"] == 180
+    assert report["utilization"] == 0.175
+    assert report["weighted_utilization"] == round((150 + 180) / (20 * 120), 4)
+    assert [week["booked_slots"] for week in weekly] == [5, 2]
+    assert weekly[0]["canceled_slots"] == 1
+    assert [room["name"] for room in halls.json()["rooms"]] == ["Aula"]
+
+
+def test_deleting_a_room_or_group_drops_its_usage(
+    db: Session, seed_course: Callable[[Session], dict]
+) -> None:
+    """Deleting a room or a group removes its usage rows."""
+    ids = seed_course(db)
+    add_lecture_hall(db)
+    client = TestClient(app)
+    client.post("/courses/events", json={**ids, "day": "2025-03-04"})
+    client.post("/courses/events", json={**ids, "room_id": 2, "day": "2025-03-05"})
+
+    assert client.delete("/rooms/2").status_code == 204
+    assert usage(db) == [(1, MONDAY, 1, 0)]
+    assert db.query(RoomWeekUsage).filter(RoomWeekUsage.room_id == 2).count() == 0
+    assert client.delete("/groups/1").status_code == 204
+    assert usage(db) == []
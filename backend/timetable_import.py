@@ -0,0 +1,481 @@
+"""
+Bulk import of a semester timetable.
+
+Every record describes one class: course name, teacher email, group name, room
+name, day and slot start/end time (plus optional room capacity and type).
+Courses, rooms and time slots that do not exist yet are created for accepted
+records; teachers and groups must already exist. Records come from CSV (header
+row with the field names) or JSON lines and are processed as a stream.
+
+Conflicts are checked in memory against the occupancy index and against the
+records already accepted from the same file, so the database is only touched
+to create missing courses/rooms/slots and to insert the accepted classes in
+chunks. Records of a course that meet in the same room and slot on the same
+weekday in consecutive weeks are stored as one ``CourseSeries``; the others
+become course events. The index only knows the writes of its own process, so
+the days of every series are checked against the stored events first, and
+events it misses are caught by the unique slot index when a chunk is inserted.
+Invalid records are skipped and reported; the rest is committed in one
+transaction.
+
+Usage (from the ``backend`` directory):
+    python -m timetable_import semester.csv
+    python -m timetable_import semester.jsonl --format jsonl --dry-run
+"""
+
+import argparse
+import csv
+import json
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from datetime import date
+from datetime import time as clock
+
+from calendar_feed import touch_groups
+from catalog_cache import bump_versions
+from database import SessionLocal
+from model import (
+    Course,
+    CourseEvent,
+    CourseSeries,
+    Group,
+    Room,
+    RoomType,
+    TimeSlots,
+    User,
+    UserRole,
+)
+from occupancy import EventSlot, occupancy_index
+from series import weekly_runs
+from sqlalchemy import insert, not_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from utilization import record_usage
+
+FORMATS = ("csv", "jsonl")
+DEFAULT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportReport:
+    """Progress and outcome of a timetable import."""
+
+    def __init__(self) -> None:
+        """Start an empty report and its clock."""
+        self.records = 0
+        self.imported = 0
+        self.skipped = 0
+        self.created_courses = 0
+        self.created_rooms = 0
+        self.created_slots = 0
+        self.created_series = 0
+        self.errors: list[dict] = []
+        self.started = time.perf_counter()
+
+    def reject(self, line: int, reason: str) -> None:
+        """
+        Count a skipped record and keep its reason if there is room for it.
+
+        Args:
+            line (int): Line number of the record in the source file
+            reason (str): Why the record was skipped
+        """
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "reason": reason})
+
+    def as_dict(self) -> dict:
+        """
+        Return the report as a JSON-serializable dictionary.
+
+        Returns:
+            dict: Counters, elapsed time and the first errors
+        """
+        return {
+            "records": self.records,
+            "imported": self.imported,
+            "skipped": self.skipped,
+            "created_courses": self.created_courses,
+            "created_rooms": self.created_rooms,
+            "created_slots": self.created_slots,
+            "created_series": self.created_series,
+            "elapsed_s": round(time.perf_counter() - self.started, 3),
+            "errors": self.errors,
+        }
+
+
+def read_records(lines: Iterable[str], fmt: str) -> Iterator[tuple[int, dict | None]]:
+    """
+    Stream records from CSV or JSON-lines text.
+
+    Args:
+        lines (Iterable[str]): Lines of the source file
+        fmt (str): ``csv`` or ``jsonl``
+
+    Raises:
+        ValueError: If the format is not supported
+
+    Returns:
+        Iterator[tuple[int, dict | None]]: Line numbers with their records, None
+            for a line that is not a JSON object
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == "jsonl":
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield line_number, record if isinstance(record, dict) else None
+    else:
+        raise ValueError(f"Unsupported format {fmt!r}, expected one of {FORMATS}")
+
+
+class TimetableImporter:
+    """
+    Validate timetable records and insert them as series and events in chunks.
+
+    Lookups of teachers, groups, rooms, slots and courses are loaded once up
+    front and extended as new objects are created.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        on_progress: Callable[[ImportReport], None] | None = None,
+    ) -> None:
+        """
+        Load the lookups of existing objects.
+
+        Args:
+            db (Session): Database session the records are written to
+            chunk_size (int, optional): Records validated and inserted per
+                transaction. Defaults to DEFAULT_CHUNK_SIZE.
+            on_progress (Callable[[ImportReport], None] | None, optional): Called
+                with the report after every chunk. Defaults to None.
+        """
+        self.db = db
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress
+        self.report = ImportReport()
+        self.users = {
+            email: (user_id, role)
+            for user_id, email, role in db.execute(
+                select(User.id, User.email, User.role)
+            )
+        }
+        self.groups: dict[str, int] = {}
+        for group_id, name in db.execute(
+            select(Group.id, Group.name).order_by(Group.id)
+        ):
+            self.groups.setdefault(name, group_id)
+        self.rooms: dict[str, int] = {}
+        for room_id, name in db.execute(select(Room.id, Room.name).order_by(Room.id)):
+            self.rooms.setdefault(name, room_id)
+        self.slots = {
+            (start, end): slot_id
+            for slot_id, start, end in db.execute(
+                select(TimeSlots.id, TimeSlots.start_time, TimeSlots.end_time)
+            )
+        }
+        self.courses = {
+            (name, group_id): course_id
+            for course_id, name, group_id in db.execute(
+                select(Course.id, Course.name, Course.group_id)
+            )
+        }
+        self.taken: set[EventSlot] = set()
+        self.touched_groups: set[int] = set()
+        # Line numbers of the accepted records with their event rows
+        self.pending: list[tuple[int, dict]] = []
+
+    def run(
+        self, records: Iterable[tuple[int, dict | None]], commit: bool = True
+    ) -> ImportReport:
+        """
+        Import all records and commit, or roll back for a dry run.
+
+        Args:
+            records (Iterable[tuple[int, dict | None]]): Output of ``read_records``
+            commit (bool, optional): Whether to commit the import. Defaults to True.
+
+        Returns:
+            ImportReport: Final report
+        """
+        try:
+            for line, record in records:
+                self.report.records += 1
+                if record is None:
+                    self.report.reject(line, "Malformed record")
+                    continue
+                try:
+                    self.add(record, line)
+                except KeyError as error:
+                    self.report.reject(line, f"Missing field {error}")
+                except (TypeError, ValueError) as error:
+                    self.report.reject(line, str(error))
+            series, events = self.fold()
+            self.insert_series(series, events)
+            for start in range(0, len(events), self.chunk_size):
+                self.insert_events(events[start : start + self.chunk_size])
+            touch_groups(self.db, self.touched_groups)
+            record_usage(self.db, added=self.taken)
+            if self.report.created_rooms:
+                bump_versions(self.db, "rooms")
+            if self.report.created_courses:
+                bump_versions(self.db, "courses")
+        except BaseException:
+            self.db.rollback()
+            raise
+
+        if not commit:
+            self.db.rollback()
+            return self.report
+        self.db.commit()
+        for slot in self.taken:
+            occupancy_index.add_event(slot)
+        return self.report
+
+    def add(self, record: dict, line: int) -> None:
+        """
+        Validate one record and queue it for insertion.
+
+        Args:
+            record (dict): Timetable record
+            line (int): Line number of the record, reported if its insertion fails
+
+        Raises:
+            KeyError: If a required field is missing
+            TypeError: If a field has the wrong type
+            ValueError: If a value is invalid or the room is not free
+        """
+        teacher_id, role = self.users.get(record["teacher_email"], (None, None))
+        if teacher_id is None:
+            raise ValueError(f"Teacher {record['teacher_email']} not found")
+        if role != UserRole.PROWADZACY:
+            raise ValueError(f"User {record['teacher_email']} is not a teacher")
+        group_id = self.groups.get(record["group"])
+        if group_id is None:
+            raise ValueError(f"Group {record['group']} not found")
+        day = date.fromisoformat(record["day"])
+        start = clock.fromisoformat(record["start_time"])
+        end = clock.fromisoformat(record["end_time"])
+        if start >= end:
+            raise ValueError("Slot must end after it starts")
+
+        # A room or slot that does not exist yet cannot be taken
+        room_id = self.rooms.get(record["room"])
+        new_room = self._new_room(record) if room_id is None else None
+        slot_id = self.slots.get((start, end))
+        if room_id is not None and slot_id is not None:
+            slot = EventSlot(room_id, day, slot_id, False)
+            if slot in self.taken or occupancy_index.is_slot_busy(*slot[:3]):
+                raise ValueError("Event time is taken by another event")
+        if room_id is not None and occupancy_index.is_unavailable_on(room_id, day):
+            raise ValueError("Room unavailable in selected time")
+
+        if new_room is not None:
+            room_id = self._create_room(new_room)
+        if slot_id is None:
+            slot_id = self._create_slot(start, end)
+        self.taken.add(EventSlot(room_id, day, slot_id, False))
+        self.touched_groups.add(group_id)
+        self.pending.append(
+            (
+                line,
+                {
+                    "course_id": self._course_id(
+                        record["course"], teacher_id, group_id
+                    ),
+                    "room_id": room_id,
+                    "time_slot_id": slot_id,
+                    "day": day,
+                    "canceled": False,
+                },
+            )
+        )
+
+    def fold(self) -> tuple[list[list[tuple[int, dict]]], list[tuple[int, dict]]]:
+        """
+        Split the accepted records into weekly runs and single events.
+
+        Returns:
+            tuple[list[list[tuple[int, dict]]], list[tuple[int, dict]]]: Runs of
+                at least two records of a course in the same room, slot and
+                weekday one week apart, and the remaining records
+        """
+        classes = defaultdict(dict)
+        for line, row in self.pending:
+            key = (row["course_id"], row["room_id"], row["time_slot_id"])
+            classes[key][row["day"]] = (line, row)
+        self.pending = []
+        series, events = [], []
+        for records in classes.values():
+            for run in weekly_runs(records):
+                if len(run) > 1:
+                    series.append([records[day] for day in run])
+                else:
+                    events.append(records[run[0]])
+        events.sort(key=lambda record: record[0])
+        return series, events
+
+    def insert_series(
+        self, series: list[list[tuple[int, dict]]], events: list[tuple[int, dict]]
+    ) -> None:
+        """
+        Insert weekly runs as series in chunks.
+
+        A run with a day taken by a stored event this process's occupancy index
+        does not know about is moved to ``events`` instead, where the unique
+        slot index rejects the conflicting records.
+
+        Args:
+            series (list[list[tuple[int, dict]]]): Runs returned by ``fold``
+            events (list[tuple[int, dict]]): Single events, extended in place
+        """
+        for start in range(0, len(series), self.chunk_size):
+            chunk = series[start : start + self.chunk_size]
+            rows = [row for run in chunk for _, row in run]
+            stored = set(
+                self.db.execute(
+                    select(
+                        CourseEvent.room_id, CourseEvent.day, CourseEvent.time_slot_id
+                    ).where(
+                        not_(CourseEvent.canceled),
+                        CourseEvent.room_id.in_({row["room_id"] for row in rows}),
+                        CourseEvent.day.between(
+                            min(row["day"] for row in rows),
+                            max(row["day"] for row in rows),
+                        ),
+                    )
+                ).all()
+            )
+            values = []
+            for run in chunk:
+                if any(
+                    (row["room_id"], row["day"], row["time_slot_id"]) in stored
+                    for _, row in run
+                ):
+                    events.extend(run)
+                    continue
+                first, last = run[0][1], run[-1][1]
+                values.append(
+                    {
+                        "course_id": first["course_id"],
+                        "room_id": first["room_id"],
+                        "time_slot_id": first["time_slot_id"],
+                        "weekday": first["day"].weekday(),
+                        "start_date": first["day"],
+                        "end_date": last["day"],
+                    }
+                )
+                self.report.imported += len(run)
+            if values:
+                self.db.execute(insert(CourseSeries), values)
+                self.report.created_series += len(values)
+            if self.on_progress:
+                self.on_progress(self.report)
+        events.sort(key=lambda record: record[0])
+
+    def insert_events(self, chunk: list[tuple[int, dict]]) -> None:
+        """
+        Insert events with one multi-row statement.
+
+        A chunk rejected by the unique slot index, because another process
+        booked a slot this process's occupancy index does not know about, is
+        inserted again row by row and the conflicting records are skipped.
+
+        Args:
+            chunk (list[tuple[int, dict]]): Line numbers with their event rows
+        """
+        if not chunk:
+            return
+        try:
+            with self.db.begin_nested():
+                self.db.execute(insert(CourseEvent), [row for _, row in chunk])
+            self.report.imported += len(chunk)
+        except IntegrityError:
+            for line, row in chunk:
+                try:
+                    with self.db.begin_nested():
+                        self.db.execute(insert(CourseEvent), row)
+                except IntegrityError:
+                    slot = (row["room_id"], row["day"], row["time_slot_id"], False)
+                    self.taken.discard(EventSlot(*slot))
+                    self.report.reject(line, "Event time is taken by another event")
+                else:
+                    self.report.imported += 1
+        if self.on_progress:
+            self.on_progress(self.report)
+
+    def _new_room(self, record: dict) -> dict:
+        room_type = record.get("room_type") or None
+        if room_type and room_type not in RoomType.__members__:
+            raise ValueError(f"Unknown room type {room_type}")
+        capacity = record.get("room_capacity") or None
+        return {
+            "name": record["room"],
+            "capacity": int(capacity) if capacity is not None else None,
+            "type": RoomType[room_type] if room_type else None,
+        }
+
+    def _create_room(self, values: dict) -> int:
+        room_id = self.db.execute(insert(Room).returning(Room.id), values).scalar_one()
+        self.rooms[values["name"]] = room_id
+        self.report.created_rooms += 1
+        return room_id
+
+    def _create_slot(self, start: clock, end: clock) -> int:
+        slot_id = self.db.execute(
+            insert(TimeSlots).returning(TimeSlots.id),
+            {"start_time": start, "end_time": end},
+        ).scalar_one()
+        self.slots[start, end] = slot_id
+        self.report.created_slots += 1
+        return slot_id
+
+    def _course_id(self, name: str, teacher_id: int, group_id: int) -> int:
+        if (name, group_id) not in self.courses:
+            self.courses[name, group_id] = self.db.execute(
+                insert(Course).returning(Course.id),
+                {"name": name, "teacher_id": teacher_id, "group_id": group_id},
+            ).scalar_one()
+            self.report.created_courses += 1
+        return self.courses[name, group_id]
+
+
+def main() -> None:
+    """Import a timetable file and print the report as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    fmt = args.format or (
+        "jsonl" if args.path.endswith((".jsonl", ".ndjson")) else "csv"
+    )
+
+    def progress(report: ImportReport) -> None:
+        elapsed = time.perf_counter() - report.started
+        print(
+            f"{report.imported} imported, {report.skipped} skipped"
+            f" ({report.records} records, {elapsed:.1f} s)"
+        )
+
+    with SessionLocal() as db, open(args.path, newline="", encoding="utf-8") as source:
+        occupancy_index.load(db)
+        importer = TimetableImporter(db, args.chunk_size, progress)
+        report = importer.run(read_records(source, fmt), commit=not args.dry_run)
+    print(json.dumps(report.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
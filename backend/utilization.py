@@ -0,0 +1,174 @@
+"""
+Per-room, per-week utilization aggregates.
+
+``room_week_usage`` holds, for every room and week, the number of booked and
+cancelled slots. Every write path of events and series passes the slots it
+adds and removes to ``record_usage``, which folds them into signed deltas and
+applies them with one upsert in the transaction of the change, so reports
+never scan ``course_events``. Weeks start on Monday.
+
+The table can always be recomputed from scratch, e.g. after loading data
+directly into the database or after upgrading to the migration that adds it.
+
+Usage (from the ``backend`` directory):
+    python -m utilization
+"""
+
+import argparse
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import date, timedelta
+
+from database import SessionLocal, upsert_insert
+from model import Course, CourseEvent, RoomWeekUsage
+from occupancy import EventSlot
+from series import Occurrence, exceptions_query, expand, series_query
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.orm import Session
+
+REBUILD_CHUNK_SIZE = 5000
+
+
+def week_of(day: date) -> date:
+    """
+    Return the Monday of the week of a day.
+
+    Args:
+        day (date): Any day
+
+    Returns:
+        date: Monday on or before ``day``
+    """
+    return day - timedelta(days=day.weekday())
+
+
+def course_slots(courses: Iterable[Course]) -> list[EventSlot | Occurrence]:
+    """
+    List the events and series occurrences of courses.
+
+    Args:
+        courses (Iterable[Course]): Courses, e.g. about to be deleted
+
+    Returns:
+        list[EventSlot | Occurrence]: Snapshots of all events and of the
+            occurrences not replaced by an exception
+    """
+    slots = []
+    for course in courses:
+        slots.extend(EventSlot.of(event) for event in course.events)
+        exceptions = {(event.series_id, event.series_day) for event in course.events}
+        slots.extend(expand(course.series, exceptions))
+    return slots
+
+
+def _deltas(added: Iterable, removed: Iterable) -> dict[tuple[int, date], list[int]]:
+    # (room ID, week) -> [booked, cancelled]
+    deltas = defaultdict(lambda: [0, 0])
+    for sign, slots in ((1, added), (-1, removed)):
+        for slot in slots:
+            if slot.room_id is not None:
+                deltas[slot.room_id, week_of(slot.day)][bool(slot.canceled)] += sign
+    return deltas
+
+
+def record_usage(db: Session, added: Iterable = (), removed: Iterable = ()) -> None:
+    """
+    Fold added and removed events or occurrences into the weekly aggregates.
+
+    Call it before committing the change so both are committed together. An
+    event that is modified is passed as removed (snapshot before the change)
+    and added (after the change).
+
+    Args:
+        db (Session): Database session
+        added (Iterable, optional): Events, ``EventSlot`` or ``Occurrence``
+            objects that now take a slot. Defaults to ().
+        removed (Iterable, optional): Snapshots of the ones that no longer do.
+            Defaults to ().
+    """
+    # Rows are sorted so concurrent writers lock them in the same order
+    rows = [
+        {
+            "room_id": room_id,
+            "week": week,
+            "booked_slots": booked,
+            "canceled_slots": canceled,
+        }
+        for (room_id, week), (booked, canceled) in sorted(
+            _deltas(added, removed).items()
+        )
+        if booked or canceled
+    ]
+    if not rows:
+        return
+    statement = upsert_insert(db, RoomWeekUsage).values(rows)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[RoomWeekUsage.room_id, RoomWeekUsage.week],
+            set_={
+                "booked_slots": RoomWeekUsage.booked_slots
+                + statement.excluded.booked_slots,
+                "canceled_slots": RoomWeekUsage.canceled_slots
+                + statement.excluded.canceled_slots,
+            },
+        )
+    )
+
+
+def rebuild(db: Session) -> int:
+    """
+    Recompute all aggregates from events and series.
+
+    Events are counted per room and day in the database and folded into weeks
+    here; series are expanded like in the occupancy index. The caller commits.
+
+    Args:
+        db (Session): Database session
+
+    Returns:
+        int: Number of room-week rows written
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        # Writers wait for the rebuild instead of updating rows it replaces
+        db.execute(text("LOCK TABLE room_week_usage IN EXCLUSIVE MODE"))
+    db.execute(delete(RoomWeekUsage))
+
+    totals = defaultdict(lambda: [0, 0])
+    for room_id, day, canceled, count in db.execute(
+        select(CourseEvent.room_id, CourseEvent.day, CourseEvent.canceled, func.count())
+        .where(CourseEvent.room_id.isnot(None))
+        .group_by(CourseEvent.room_id, CourseEvent.day, CourseEvent.canceled)
+    ):
+        totals[room_id, week_of(day)][bool(canceled)] += count
+    exceptions = set(db.execute(exceptions_query()).all())
+    for occurrence in expand(db.execute(series_query()).all(), exceptions):
+        totals[occurrence.room_id, week_of(occurrence.day)][0] += 1
+
+    rows = [
+        {
+            "room_id": room_id,
+            "week": week,
+            "booked_slots": booked,
+            "canceled_slots": canceled,
+        }
+        for (room_id, week), (booked, canceled) in sorted(totals.items())
+    ]
+    for start in range(0, len(rows), REBUILD_CHUNK_SIZE):
+        db.execute(insert(RoomWeekUsage), rows[start : start + REBUILD_CHUNK_SIZE])
+    return len(rows)
+
+
+def main() -> None:
+    """Rebuild the room week usage table from scratch."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.parse_args()
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        rows = rebuild(db)
+        db.commit()
+    print(f"{rows} room-week rows rebuilt in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -57,7 +57,8 @@ const ChangeRequestsPage = () => {
           const { start, end } = getSlotTimes(event.day, event.time_slot_id);
           allEvents.push({
             ...event,
-            id: `${course.id}-${event.id}`,
+            id: `${course.id}-${event.id ?? `s${event.series_id}-${event.day}`}`,
+            eventId: event.id,
             title: `Kurs ${course.name || course.id}`,
             start,
             end,
@@ -85,7 +86,8 @@ const ChangeRequestsPage = () => {
           const { start, end } = getSlotTimes(event.day, event.time_slot_id);
           allEvents.push({
             ...event,
-            id: `${course.id}-${event.id}`,
+            id: `${course.id}-${event.id ?? `s${event.series_id}-${event.day}`}`,
+            eventId: event.id,
             title: `Kurs ${course.name || course.id}`,
             start,
             end,
@@ -117,7 +119,8 @@ const ChangeRequestsPage = () => {
             const { start, end } = getSlotTimes(event.day, event.time_slot_id);
             allEvents.push({
               ...event,
-              id: `${course.id}-${event.id}`,
+              id: `${course.id}-${event.id ?? `s${event.series_id}-${event.day}`}`,
+              eventId: event.id,
               title: `Kurs ${course.name || course.id}`,
               start,
               end,
@@ -207,8 +210,12 @@ const ChangeRequestsPage = () => {
     try {
       if (!user) throw new Error("Brak danych użytkownika");
 
+      // Wystąpienie cyklu nie ma jeszcze własnego wydarzenia
+      const target = eventDetails.eventId
+        ? { course_event_id: eventDetails.eventId }
+        : { series_id: eventDetails.series_id, series_day: eventDetails.day };
       const changeRequestPayload = {
-        course_event_id: parseInt(eventDetails.id.split("-")[1], 10),
+        ...target,
         initiator_id: user.id,
         status: "PENDING",
         reason: formData.reason,
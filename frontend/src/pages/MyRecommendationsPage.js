@@ -1,4 +1,4 @@
-import React, { useContext, useEffect, useState } from "react";
+import React, { useContext, useEffect, useRef, useState } from "react";
 import {
     Box,
     Typography,
@@ -20,6 +20,7 @@ import {
 
 import Navbar from "../components/Navbar";
 import { apiRequest } from "../services/apiService";
+import { subscribeToNotifications } from "../services/notificationService";
 import { UserContext } from "../App";
 import { useNavigate } from "react-router-dom";
 
@@ -54,6 +55,40 @@ const MyRecommendationsPage = () => {
         }
     }, [loading, user, navigate, selectedStatus]);
 
+    // Zmiany statusów przychodzą ze strumienia powiadomień zamiast odpytywania
+    const changeRequestsRef = useRef(changeRequests);
+    changeRequestsRef.current = changeRequests;
+    useEffect(() => {
+        if (loading || !user) return undefined;
+
+        const refreshRecommendations = (data) => {
+            if (data.change_request_id === selectedRequestId) {
+                fetchRecommendations(selectedRequestId);
+            }
+        };
+        return subscribeToNotifications({
+            change_request: (data) => {
+                if (!changeRequestsRef.current.some((req) => req.id === data.id)) {
+                    fetchRelatedRequests();
+                    return;
+                }
+                setChangeRequests((prev) =>
+                    prev
+                        .map((req) => (req.id === data.id ? { ...req, status: data.status } : req))
+                        .filter((req) => !selectedStatus || req.status === selectedStatus)
+                );
+            },
+            change_request_deleted: (data) =>
+                setChangeRequests((prev) => prev.filter((req) => req.id !== data.id)),
+            proposal: refreshRecommendations,
+            proposal_deleted: refreshRecommendations,
+            resync: () => {
+                fetchRelatedRequests();
+                if (selectedRequestId) fetchRecommendations(selectedRequestId);
+            },
+        });
+    }, [loading, user, selectedStatus, selectedRequestId]);
+
     if (loading) {
         return;
     }
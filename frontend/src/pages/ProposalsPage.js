@@ -3,6 +3,7 @@ import { Box, Typography, Button, List, ListItem, ListItemText, Dialog, DialogTi
 import DeleteIcon from "@mui/icons-material/Delete";
 import Navbar from "../components/Navbar";
 import { apiRequest } from "../services/apiService";
+import { subscribeToNotifications } from "../services/notificationService";
 import { useNavigate } from "react-router-dom";
 import { format } from "date-fns";
 import { pl } from "date-fns/locale";
@@ -98,6 +99,20 @@ const ProposalsPage = () => {
       .catch((error) => console.error("Error fetching proposals:", error));
   }, [navigate]);
 
+  // Zmiany propozycji przychodzą ze strumienia powiadomień zamiast odpytywania
+  useEffect(() => {
+    const refresh = () =>
+      apiRequest("/proposals")
+        .then((data) => setProposals(data))
+        .catch((error) => console.error("Error fetching proposals:", error));
+    return subscribeToNotifications({
+      proposal: refresh,
+      proposal_deleted: (data) =>
+        setProposals((prev) => prev.filter((proposal) => proposal.id !== data.id)),
+      resync: refresh,
+    });
+  }, []);
+
   const handleOpen = async () => {
     // Pobierz user_id z /auth/me
     try {
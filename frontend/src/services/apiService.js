@@ -1,7 +1,7 @@
 // frontend/src/services/apiService.js
 import { ErrorContext } from "../App";
 
-const API_BASE_URL = "http://localhost:8000";
+export const API_BASE_URL = "http://localhost:8000";
 
 export const apiRequest = async (endpoint, options = {}) => {
   const token = localStorage.getItem("token");
@@ -0,0 +1,57 @@
+import { API_BASE_URL, apiRequest } from "./apiService";
+
+const EVENTS = [
+  "change_request",
+  "change_request_deleted",
+  "proposal",
+  "proposal_deleted",
+  "resync",
+];
+const RECONNECT_DELAY_MS = 3000;
+
+// Subskrybuje strumień powiadomień zamiast odpytywania list.
+// EventSource nie wysyła nagłówka Authorization, więc przy każdym połączeniu
+// pobierany jest nowy krótkotrwały token. Zwraca funkcję kończącą subskrypcję.
+export const subscribeToNotifications = (handlers) => {
+  let source = null;
+  let timer = null;
+  let closed = false;
+
+  const connect = async () => {
+    try {
+      const { token } = await apiRequest("/notifications/token", { method: "POST" });
+      if (closed) return;
+      source = new EventSource(
+        `${API_BASE_URL}/notifications/stream?token=${encodeURIComponent(token)}`
+      );
+      for (const name of EVENTS) {
+        if (handlers[name]) {
+          source.addEventListener(name, (event) => handlers[name](JSON.parse(event.data)));
+        }
+      }
+      source.onerror = () => {
+        // Token wygasł lub serwer zerwał połączenie: połącz ponownie i odśwież dane
+        source.close();
+        reconnect();
+      };
+    } catch (error) {
+      console.error("Błąd podczas łączenia ze strumieniem powiadomień:", error);
+      reconnect();
+    }
+  };
+
+  const reconnect = () => {
+    if (closed) return;
+    timer = setTimeout(async () => {
+      await connect();
+      if (handlers.resync) handlers.resync({});
+    }, RECONNECT_DELAY_MS);
+  };
+
+  connect();
+  return () => {
+    closed = true;
+    clearTimeout(timer);
+    if (source) source.close();
+  };
+};